@@ -0,0 +1,85 @@
+"""EchoCanceller.process: per-chunk bytes round-trips vs batched carry-over.
+
+Runs once with playback on the loopback and once with a silent loopback,
+where the batched canceller bypasses SpeexDSP.
+
+With ``--engine passthrough`` the SpeexDSP filter is replaced by an echo of
+the mic sub-frame, which isolates the wrapper overhead (and runs without
+speexdsp installed).
+
+Usage: python -m benchmarks.bench_aec [--frames 5000] [--engine speexdsp|passthrough]
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from media_assistant.audio import aec
+from media_assistant.audio.aec import EchoCanceller
+
+_FRAME = 512
+_CHUNK = 160
+
+
+class _Passthrough:
+    def process(self, mic, ref):
+        return bytes(mic)
+
+
+def _legacy(ec, mic_frame: np.ndarray, ref_frame: np.ndarray) -> np.ndarray:
+    """The original EchoCanceller.process loop."""
+    total = len(mic_frame)
+    output = np.empty(total, dtype=np.int16)
+    pos = 0
+    while pos < total:
+        end = min(pos + _CHUNK, total)
+        clean_bytes = ec.process(mic_frame[pos:end].tobytes(), ref_frame[pos:end].tobytes())
+        clean = np.frombuffer(clean_bytes, dtype=np.int16)
+        output[pos : pos + len(clean)] = clean
+        pos = end
+    return output
+
+
+def _fps(fn, mic: np.ndarray, ref: np.ndarray) -> float:
+    t0 = time.perf_counter()
+    for i in range(len(mic)):
+        fn(mic[i], ref[i])
+    return len(mic) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument(
+        "--engine",
+        choices=("speexdsp", "passthrough"),
+        default="speexdsp" if aec.speexdsp is not None else "passthrough",
+    )
+    args = parser.parse_args()
+
+    if args.engine == "passthrough":
+        aec.speexdsp = SimpleNamespace(
+            EchoCanceller=SimpleNamespace(create=lambda *a: _Passthrough())
+        )
+
+    rng = np.random.default_rng(0)
+    playback = (3000 * rng.standard_normal((args.frames, _FRAME))).astype(np.int16)
+    scenes = {"playback": playback, "silent loopback": np.zeros_like(playback)}
+
+    print(f"engine: {args.engine}, {_FRAME}-sample frames")
+    for scene, ref in scenes.items():
+        mic = (0.5 * ref + 300 * rng.standard_normal(ref.shape)).astype(np.int16)
+        legacy_ec = aec.speexdsp.EchoCanceller.create(_CHUNK, 1024, 16000)
+        legacy = _fps(lambda m, r: _legacy(legacy_ec, m, r), mic, ref)
+        canceller = EchoCanceller(_CHUNK, 1024, 16000)
+        batched = _fps(canceller.process, mic, ref)
+
+        print(f"{scene}:")
+        print(f"  legacy  {legacy:9.0f} frames/s")
+        print(f"  batched {batched:9.0f} frames/s ({batched / legacy:.2f}x), {canceller.stats}")
+
+
+if __name__ == "__main__":
+    main()
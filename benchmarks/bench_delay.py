@@ -0,0 +1,74 @@
+"""Echo-path delay estimation cost and accuracy, and AEC cost per filter length.
+
+Runs GCC-PHAT on a synthetic scene with a known echo delay for several
+history lengths. If speexdsp is installed, also times EchoCanceller with
+the estimated delay applied at shrinking filter lengths.
+
+Usage: python -m benchmarks.bench_delay [--delay-ms 40] [--seconds 8]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from media_assistant.audio import aec
+from media_assistant.audio.delay import DelayEstimator
+from media_assistant.audio.replay import SyntheticAudioCapture
+
+_RATE = 16000
+_FRAME = 512
+
+
+def _scene(seconds: float, delay_ms: float) -> tuple[np.ndarray, np.ndarray]:
+    capture = SyntheticAudioCapture(
+        seconds=seconds, loopback_rms=3000, echo_gain=0.4, echo_delay_ms=delay_ms
+    )
+    capture.start()
+    frames = []
+    while (frame := capture.read_frame()) is not None:
+        frames.append(frame)
+    mic = np.concatenate([f.mic for f in frames])
+    ref = np.concatenate([f.loopback for f in frames])
+    return mic, ref
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay-ms", type=float, default=40.0)
+    parser.add_argument("--seconds", type=float, default=8.0)
+    args = parser.parse_args()
+
+    mic, ref = _scene(args.seconds, args.delay_ms)
+    print(f"true delay {args.delay_ms:.1f} ms")
+    estimator = None
+    for history in (1.0, 2.0, 4.0):
+        estimator = DelayEstimator(history_seconds=history)
+        for start in range(0, len(mic), _FRAME):
+            estimator.push(mic[start : start + _FRAME], ref[start : start + _FRAME])
+        t0 = time.perf_counter()
+        estimator.estimate()
+        ms = (time.perf_counter() - t0) * 1000
+        print(
+            f"  history {history:.0f} s: {estimator.delay_ms:6.1f} ms "
+            f"(confidence {estimator.confidence:.2f}), {ms:6.1f} ms per estimate"
+        )
+
+    if aec.speexdsp is None:
+        print("speexdsp not installed: skipping filter-length timing")
+        return
+    frames = len(mic) // _FRAME
+    for filter_length in (1024, 512, 256, 128):
+        canceller = aec.EchoCanceller(
+            filter_length=filter_length, delay_estimator=estimator, bypass_silence=False
+        )
+        t0 = time.perf_counter()
+        for i in range(frames):
+            block = slice(i * _FRAME, (i + 1) * _FRAME)
+            canceller.process(mic[block], ref[block])
+        fps = frames / (time.perf_counter() - t0)
+        print(f"  filter_length {filter_length:5d}: {fps:8.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
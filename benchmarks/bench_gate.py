@@ -0,0 +1,60 @@
+"""Energy pre-gate: share of model runs saved and cost per frame.
+
+Feeds a synthetic room (stationary noise with speech-like bursts) through
+EnergyGate and reports the hit rate (frames answered without the model),
+how many speech frames still reach the model, and the gate's own cost.
+Use --frame 512 for the VAD gate and --frame 1280 for the wake word cascade;
+--burst-period 30 approximates a mostly silent room.
+
+Usage: python -m benchmarks.bench_gate [--seconds 30] [--frame 512] [--noise-rms 200]
+       [--speech-rms 2000] [--burst-period 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from media_assistant.audio.gate import EnergyGate
+from media_assistant.audio.replay import SyntheticAudioCapture
+
+_RATE = 16000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--noise-rms", type=float, default=200.0)
+    parser.add_argument("--speech-rms", type=float, default=2000.0)
+    parser.add_argument("--frame", type=int, default=512, help="gate frame (1280 = wake word hop)")
+    parser.add_argument("--burst-period", type=float, default=3.0, help="seconds between bursts")
+    args = parser.parse_args()
+
+    capture = SyntheticAudioCapture(
+        seconds=args.seconds,
+        frame_size=args.frame,
+        noise_rms=args.noise_rms,
+        speech_rms=args.speech_rms,
+        burst_period=args.burst_period,
+    )
+    capture.start()
+    frames = []
+    while (frame := capture.read_frame()) is not None:
+        frames.append(frame.mic)
+
+    gate = EnergyGate(frame_size=args.frame)
+    t0 = time.perf_counter()
+    passed = np.array([gate.passes(frame) for frame in frames])
+    per_frame_us = (time.perf_counter() - t0) / len(frames) * 1e6
+
+    # SyntheticAudioCapture speaks for the first 0.8 s of every burst period
+    t = np.arange(len(frames)) * args.frame / _RATE
+    speech = (t % args.burst_period) < 0.8
+    print(f"gate hit rate  : {gate.hit_rate:6.1%} of frames skip the model")
+    print(f"speech passed  : {passed[speech].mean():6.1%}")
+    print(f"silence passed : {passed[~speech].mean():6.1%} (hangover and floor warm-up)")
+    print(f"gate cost      : {per_frame_us:6.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Noise suppression cost: DeepFilterNet (per-frame, streaming) vs the spectral gate.
+
+Real-time factor is processing time divided by audio duration (lower is
+better; above 1.0 the stage cannot keep up), and RTF x 100 is the share of
+one core the stage needs. Also reports the noise reduction on the noise-only
+part of the scene. DeepFilterNet rows are skipped if it is not installed.
+
+Usage: python -m benchmarks.bench_noise [--seconds 10]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from media_assistant.audio import noise as noise_mod
+from media_assistant.audio.noise import NoiseSuppressor, SpectralGate
+from media_assistant.audio.replay import SyntheticAudioCapture
+
+_FRAME = 512
+_RATE = 16000
+
+
+def _frames(seconds: float) -> list[np.ndarray]:
+    capture = SyntheticAudioCapture(seconds=seconds, noise_rms=300, speech_rms=3000)
+    capture.start()
+    frames = []
+    while (frame := capture.read_frame()) is not None:
+        frames.append(frame.mic)
+    return frames
+
+
+def _run(suppressor, frames: list[np.ndarray]) -> tuple[float, np.ndarray]:
+    suppressor.warm()
+    t0 = time.process_time()
+    out = [suppressor.process(frame) for frame in frames]
+    rtf = (time.process_time() - t0) / (len(frames) * _FRAME / _RATE)
+    return rtf, np.concatenate(out)[suppressor.latency_samples :]
+
+
+def _rms(x: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(x.astype(np.float64) ** 2)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10.0, help="at least 6")
+    args = parser.parse_args()
+
+    frames = _frames(args.seconds)
+    # Speech bursts fill the first 0.8 s of every 3 s; measure the gaps after the first
+    audio = np.concatenate(frames)
+    t = np.arange(len(audio)) / _RATE
+    gaps = (t >= 3.0) & (t % 3.0 >= 1.0) & (t % 3.0 < 2.8)
+    backends = {"spectral gate": SpectralGate}
+    if hasattr(noise_mod.df_mod, "init_df"):
+        backends["deepfilternet per-frame"] = NoiseSuppressor
+        backends["deepfilternet streaming"] = lambda: NoiseSuppressor(streaming=True)
+    else:
+        print("deepfilternet not installed: timing the spectral gate only")
+    for name, make in backends.items():
+        suppressor = make()
+        rtf, out = _run(suppressor, frames)
+        reduction = 20 * np.log10(_rms(audio[gaps]) / max(_rms(out[gaps[: len(out)]]), 1e-9))
+        print(
+            f"{name:24s}: RTF {rtf:.4f} ({rtf * 100:5.2f}% of a core), "
+            f"latency {suppressor.latency_samples / _RATE * 1e3:3.0f} ms, "
+            f"noise -{reduction:.1f} dB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Steady-state DSP cost: every stage on every frame vs the per-state pipeline.
+
+Times Orchestrator._run_pipeline in each state with the real AEC and noise
+suppressor (speexdsp and DeepFilterNet must be installed), then weights
+the per-frame cost by a duty cycle to estimate CPU use of one core.
+
+Usage: python -m benchmarks.bench_pipeline [--frames 500] [--idle 0.95] [--listening 0.04]
+"""
+
+import argparse
+import time
+
+from media_assistant.audio.aec import create_echo_canceller
+from media_assistant.audio.noise import NoiseSuppressor
+from media_assistant.audio.replay import SyntheticAudioCapture
+from media_assistant.config import AECConfig
+from media_assistant.orchestrator import DEFAULT_PIPELINE, Orchestrator, State
+
+_FRAME = 512
+_RATE = 16000
+
+
+def _frames(count: int) -> list:
+    capture = SyntheticAudioCapture(
+        seconds=count * _FRAME / _RATE + 1, speech_rms=2000, loopback_rms=3000
+    )
+    capture.start()
+    return [capture.read_frame() for _ in range(count)]
+
+
+def _cost(orch: Orchestrator, state: State, frames: list) -> float:
+    """Mean seconds per frame of the stages run in ``state``."""
+    orch.state = state
+    t0 = time.process_time()
+    for frame in frames:
+        orch._run_pipeline(frame)
+    return (time.process_time() - t0) / len(frames)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--idle", type=float, default=0.95, help="fraction of time in IDLE")
+    parser.add_argument("--listening", type=float, default=0.04)
+    args = parser.parse_args()
+
+    try:
+        aec, noise = create_echo_canceller(AECConfig()), NoiseSuppressor()
+    except (AttributeError, ImportError) as e:
+        raise SystemExit(f"needs speexdsp and deepfilternet installed: {e}")
+    orch = Orchestrator(None, aec, noise, *[None] * 8)
+    frames = _frames(args.frames)
+    noise.warm()
+
+    duty = {
+        State.IDLE: args.idle,
+        State.LISTENING: args.listening,
+        State.PROCESSING: max(0.0, 1 - args.idle - args.listening),
+    }
+    everything = {state: ("aec", "noise") for state in State}
+    frame_seconds = _FRAME / _RATE
+    for name, pipeline in (("all stages", everything), ("per state", DEFAULT_PIPELINE)):
+        orch._pipeline = pipeline
+        costs = {state: _cost(orch, state, frames) for state in duty}
+        cpu = sum(duty[s] * costs[s] for s in duty) / frame_seconds * 100
+        per_state = ", ".join(f"{s.value} {costs[s] * 1e3:.2f} ms" for s in duty)
+        print(f"{name:10s}: {cpu:5.1f}% of a core ({per_state})")
+
+
+if __name__ == "__main__":
+    main()
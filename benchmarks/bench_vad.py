@@ -0,0 +1,93 @@
+"""Silero VAD startup time, memory and per-frame latency: torch vs ONNX Runtime.
+
+Each backend is measured in a fresh interpreter so import cost and resident
+memory are not shared between them. Backends whose runtime (torch,
+onnxruntime) or cached model file is missing are reported as skipped.
+
+Usage: python -m benchmarks.bench_vad [--frames 2000] [--cache-dir models]
+"""
+
+import argparse
+import importlib.util
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from media_assistant.config import VADConfig
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 2**20
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10
+
+
+def _child(backend: str, cache_dir: str, frames: int) -> dict:
+    """Measure one backend in this (fresh) process."""
+    runtime = "torch" if backend == "torch" else "onnxruntime"
+    if importlib.util.find_spec(runtime) is None:
+        return {"skipped": f"{runtime} not installed"}
+    t0 = time.perf_counter()
+    from media_assistant.audio import vad
+
+    try:
+        config = VADConfig(backend=backend, cache_dir=cache_dir, lazy_load=False)
+        detector = vad.create_voice_activity_detector(config)
+    except Exception as e:  # noqa: BLE001 - report and move on (offline hub, missing file)
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    startup = time.perf_counter() - t0
+
+    rng = np.random.default_rng(0)
+    audio = rng.normal(0, 1000, (frames, 512)).astype(np.int16)
+    latencies = []
+    for frame in audio:
+        t = time.perf_counter()
+        detector.is_speech(frame)
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+    return {
+        "startup_s": startup,
+        "rss_mb": _peak_rss_mb(),
+        "median_ms": statistics.median(latencies) * 1e3,
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1e3,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--cache-dir", default=VADConfig().cache_dir, help="holds the Silero models")
+    parser.add_argument("--child", choices=["torch", "onnx"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(args.child, args.cache_dir, args.frames)))
+        return
+
+    for backend in ("torch", "onnx"):
+        cmd = [sys.executable, "-m", "benchmarks.bench_vad", "--child", backend]
+        cmd += ["--frames", str(args.frames), "--cache-dir", args.cache_dir]
+        result = json.loads(subprocess.run(cmd, capture_output=True, text=True, check=True).stdout)
+        if "skipped" in result:
+            print(f"{backend:5s}: skipped ({result['skipped']})")
+            continue
+        rss = "n/a" if result["rss_mb"] is None else f"{result['rss_mb']:.0f} MB"
+        print(
+            f"{backend:5s}: startup {result['startup_s']:.2f} s, peak RSS {rss}, "
+            f"{result['median_ms']:.3f} ms/frame (p99 {result['p99_ms']:.3f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
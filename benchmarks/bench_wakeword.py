@@ -0,0 +1,84 @@
+"""Wake word CPU: shared-front-end bank vs separate models, and the energy cascade.
+
+Scores synthetic audio in 1280-sample hops with an openwakeword bank of the
+first 1..N models, and with N independent models (each recomputing the
+melspectrogram and embedding), and prints the share of a core each needs.
+Then runs WakeWordDetector with and without its EnergyGate on a mostly
+silent room (one utterance every --burst-period seconds) and reports the
+gate pass rate and the CPU saved.
+
+Usage: python -m benchmarks.bench_wakeword --models jarvis.onnx alisa.onnx [--seconds 20]
+       [--burst-period 30]
+"""
+
+import argparse
+import time
+
+from media_assistant.audio.gate import EnergyGate
+from media_assistant.audio.replay import SyntheticAudioCapture
+from media_assistant.wakeword import detector
+
+_HOP = 1280
+_RATE = 16000
+
+
+def _chunks(seconds: float, burst_period: float = 3.0) -> list:
+    capture = SyntheticAudioCapture(
+        seconds=seconds, frame_size=_HOP, noise_rms=200, speech_rms=2000, burst_period=burst_period
+    )
+    capture.start()
+    chunks = []
+    while (frame := capture.read_frame()) is not None:
+        chunks.append(frame.mic)
+    return chunks
+
+
+def _cpu_share(models: list, chunks: list) -> float:
+    """Fraction of one core spent scoring ``chunks`` with every model in ``models``."""
+    t0 = time.process_time()
+    for chunk in chunks:
+        for model in models:
+            model.predict(chunk)
+    return (time.process_time() - t0) / (len(chunks) * _HOP / _RATE)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", nargs="+", required=True, help="wake word model files")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--burst-period", type=float, default=30.0, help="cascade scene")
+    args = parser.parse_args()
+
+    oww = detector.openwakeword
+    if oww is None:
+        raise SystemExit("needs openwakeword installed")
+    chunks = _chunks(args.seconds)
+
+    previous = 0.0
+    for count in range(1, len(args.models) + 1):
+        paths = args.models[:count]
+        bank = _cpu_share([oww.Model(wakeword_models=paths)], chunks)
+        separate = _cpu_share([oww.Model(wakeword_models=[p]) for p in paths], chunks)
+        print(
+            f"{count} word(s): bank {bank:6.2%} of a core (+{bank - previous:6.2%}), "
+            f"separate models {separate:6.2%}"
+        )
+        previous = bank
+
+    room = _chunks(max(args.seconds, args.burst_period * 2), args.burst_period)
+    ungated = detector.WakeWordDetector(args.models)
+    gated = detector.WakeWordDetector(args.models, gate=EnergyGate(frame_size=_HOP))
+    costs = {}
+    for name, wake in (("no gate", ungated), ("cascade", gated)):
+        t0 = time.process_time()
+        for chunk in room:
+            wake.process_frame(chunk)
+        costs[name] = (time.process_time() - t0) / (len(room) * _HOP / _RATE)
+    print(
+        f"silent room: no gate {costs['no gate']:6.2%}, cascade {costs['cascade']:6.2%} of a core; "
+        f"gate passed {1 - gated.gate.hit_rate:6.1%} of hops, {gated.replays} replays"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,49 @@
 """Echo cancellation via SpeexDSP adaptive filter."""
 
+from dataclasses import dataclass
+
 import numpy as np
 
+from media_assistant.audio.delay import DelayEstimator, DelayLine
+from media_assistant.config import AECConfig
+
 try:
     import speexdsp
 except ImportError:
     speexdsp = None  # type: ignore[assignment]  # Mocked in tests on non-Windows
 
 
+@dataclass
+class AECStats:
+    """SpeexDSP sub-frames run through the filter vs passed straight through."""
+
+    processed_frames: int = 0
+    bypassed_frames: int = 0
+    delay_ms: float = 0.0  # reference delay applied ahead of the filter
+    delay_confidence: float = 0.0  # GCC-PHAT peak of the estimate in use
+
+
 class EchoCanceller:
     """Remove echo from microphone using loopback as reference signal.
 
-    Handles chunking of larger frames into SpeexDSP's required frame_size.
+    SpeexDSP only accepts whole ``frame_size`` sub-frames, so input is
+    appended to a carry-over buffer and only complete sub-frames are
+    processed; the remainder waits for the next call. Cleaned samples go
+    through an output FIFO primed with ``frame_size - 1`` samples of
+    silence, so every call returns exactly as many samples as it was given
+    at a fixed latency of ``latency_samples``.
+
+    With ``bypass_silence`` a sub-frame whose reference RMS is below
+    ``silence_rms`` skips the filter and the mic passes through untouched —
+    but only once ``filter_length`` silent reference samples have already
+    been filtered, so SpeexDSP's reference history is silence and it
+    resumes with its converged filter as soon as playback starts.
+
+    With a ``delay_estimator`` the reference is delayed by the estimated
+    echo-path delay (less ``delay_margin`` samples of slack) before the
+    filter, so ``filter_length`` only has to cover the room response, not
+    the playback latency. Estimates within the margin of the applied delay
+    are ignored, so small jitter does not disturb the adapted filter.
     """
 
     def __init__(
@@ -19,6 +51,10 @@ class EchoCanceller:
         frame_size: int = 160,
         filter_length: int = 1024,
         sample_rate: int = 16000,
+        bypass_silence: bool = True,
+        silence_rms: float = 1.0,
+        delay_estimator: DelayEstimator | None = None,
+        delay_margin: int = 64,
     ):
         self._frame_size = frame_size
         self._filter_length = filter_length
@@ -26,32 +62,194 @@ class EchoCanceller:
         self._ec = speexdsp.EchoCanceller.create(
             frame_size, filter_length, sample_rate
         )
+        self.latency_samples = frame_size - 1
+        self.stats = AECStats()
+        self._bypass_silence = bypass_silence
+        self._silence_energy = silence_rms**2 * frame_size
+        # A sub-frame holding one sample this loud cannot be silent
+        self._loud_sample = np.sqrt(self._silence_energy)
+        self._ones = np.ones(frame_size, dtype=np.float32)  # row sums as a matmul
+        # Silent reference samples seen in a row; the filter starts out flushed
+        self._silent_run = filter_length
+        self._delay_estimator = delay_estimator
+        self._delay_margin = delay_margin
+        self._applied_delay = 0
+        self._delay_line = (
+            DelayLine(delay_estimator.max_delay) if delay_estimator is not None else None
+        )
+        # Pass sub-frames as memoryviews until the binding rejects them
+        self._zero_copy = True
+        # Input carry-over [_in_start, _in_end) and output FIFO
+        # [_out_start, _out_end); both compacted only when the tail is full
+        self._mic = np.zeros(0, dtype=np.int16)
+        self._ref = np.zeros(0, dtype=np.int16)
+        self._out = np.zeros(self.latency_samples, dtype=np.int16)  # primed silence
+        self._in_start = self._in_end = 0
+        self._out_start, self._out_end = 0, self.latency_samples
+        self._compact(8 * frame_size)
 
     def process(self, mic_frame: np.ndarray, ref_frame: np.ndarray) -> np.ndarray:
-        """Cancel echo: mic - reference -> clean signal.
+        """Cancel echo: mic - reference -> clean signal, delayed by ``latency_samples``."""
+        if self._delay_estimator is not None:
+            ref_frame = self._align_reference(mic_frame, ref_frame)
+        count = len(mic_frame)
+        size = self._frame_size
+        if self._in_end + count > len(self._mic) or self._out_end + count + size > len(self._out):
+            self._compact(count)
 
-        Chunks input into frame_size sub-frames for SpeexDSP processing.
-        """
-        total = len(mic_frame)
-        output = np.empty(total, dtype=np.int16)
-        pos = 0
-
-        while pos < total:
-            end = min(pos + self._frame_size, total)
-            chunk_mic = mic_frame[pos:end]
-            chunk_ref = ref_frame[pos:end]
-
-            clean_bytes = self._ec.process(
-                chunk_mic.tobytes(), chunk_ref.tobytes()
-            )
-            clean = np.frombuffer(clean_bytes, dtype=np.int16)
-            output[pos : pos + len(clean)] = clean
-            pos = end
+        end = self._in_end + count
+        self._mic[self._in_end : end] = mic_frame
+        self._ref[self._in_end : end] = ref_frame
 
+        # Only whole sub-frames; SpeexDSP output is written straight into the FIFO
+        pos, queued = self._in_start, self._out_end
+        chunks = (end - pos) // size
+        silent = self._silent_chunks(pos, chunks)
+        if silent is False:
+            # Playback: every sub-frame is filtered, no per-sub-frame bookkeeping
+            for _ in range(chunks):
+                self._out_bytes[2 * queued : 2 * (queued + size)] = self._cancel(pos, pos + size)
+                pos += size
+                queued += size
+            self._silent_run = 0
+            self.stats.processed_frames += chunks
+        elif silent is True and self._silent_run >= self._filter_length:
+            # Flushed filter, still no playback: pass the whole span through at once
+            n = chunks * size
+            self._out[queued : queued + n] = self._mic[pos : pos + n]
+            pos, queued = pos + n, queued + n
+            self._silent_run += n
+            self.stats.bypassed_frames += chunks
+        else:
+            for is_silent in [silent] * chunks if isinstance(silent, bool) else silent:
+                if self._bypassed(is_silent):
+                    self._out[queued : queued + size] = self._mic[pos : pos + size]
+                    self.stats.bypassed_frames += 1
+                else:
+                    self._out_bytes[2 * queued : 2 * (queued + size)] = self._cancel(pos, pos + size)
+                    self.stats.processed_frames += 1
+                pos += size
+                queued += size
+        self._in_start, self._in_end, self._out_end = pos, end, queued
+
+        output = self._out[self._out_start : self._out_start + count].copy()
+        self._out_start += count
         return output
 
+    def start(self) -> None:
+        """Start background delay estimation, if enabled."""
+        if self._delay_estimator is not None:
+            self._delay_estimator.start()
+
+    def stop(self) -> None:
+        if self._delay_estimator is not None:
+            self._delay_estimator.stop()
+
+    def warm(self) -> None:
+        """Resume after frames were skipped: drop stale carry-over, keep the filter."""
+        self._in_start = self._in_end = 0
+        self._out_start, self._out_end = 0, self.latency_samples
+        self._out[: self.latency_samples] = 0
+
     def reset(self) -> None:
         """Reset adaptive filter state by recreating the internal EC."""
         self._ec = speexdsp.EchoCanceller.create(
             self._frame_size, self._filter_length, self._sample_rate
         )
+        self.warm()
+        self._silent_run = self._filter_length
+
+    def _align_reference(self, mic_frame: np.ndarray, ref_frame: np.ndarray) -> np.ndarray:
+        estimator = self._delay_estimator
+        estimator.push(mic_frame, ref_frame)
+        target = max(0, estimator.delay_samples - self._delay_margin)
+        if abs(target - self._applied_delay) > self._delay_margin // 2:
+            self._applied_delay = target
+            self.stats.delay_ms = target * 1000 / self._sample_rate
+            self.stats.delay_confidence = estimator.confidence
+        return self._delay_line.process(ref_frame, self._applied_delay)
+
+    def _silent_chunks(self, start: int, count: int) -> bool | list[bool]:
+        """Per sub-frame: is the reference silent? A bool if all agree.
+
+        The exact energy pass costs several numpy calls, as much as the
+        batching saves, so the two steady states are settled without it:
+        during playback one sample per sub-frame at or above the silence
+        amplitude proves every sub-frame loud, and a silent loopback is
+        usually all zeros. Anything else gets one vectorized energy pass.
+        """
+        if not self._bypass_silence:
+            return False
+        size = self._frame_size
+        end = start + count * size
+        probes = self._ref[start + size // 2 : end : size].tolist()
+        if probes and min(map(abs, probes)) >= self._loud_sample:
+            return False
+        ref = self._ref[start:end]
+        if not ref.any():
+            return True
+        ref = ref.astype(np.float32)
+        energy = (ref * ref).reshape(count, size) @ self._ones
+        return (energy < self._silence_energy).tolist()
+
+    def _bypassed(self, silent: bool) -> bool:
+        """Hysteresis: bypass only after a full filter length of silence."""
+        if not silent:
+            self._silent_run = 0
+            return False
+        flushed = self._silent_run >= self._filter_length
+        self._silent_run += self._frame_size
+        return flushed
+
+    def _cancel(self, start: int, stop: int) -> bytes:
+        if self._zero_copy:
+            try:
+                return self._ec.process(
+                    self._mic_bytes[2 * start : 2 * stop], self._ref_bytes[2 * start : 2 * stop]
+                )
+            except TypeError:
+                self._zero_copy = False  # binding wants bytes
+        return self._ec.process(
+            self._mic[start:stop].tobytes(), self._ref[start:stop].tobytes()
+        )
+
+    def _compact(self, count: int) -> None:
+        """Move pending data to the buffer fronts, growing them to fit ``count`` more."""
+        pending = self._in_end - self._in_start
+        queued = self._out_end - self._out_start
+        capacity = max(len(self._mic), 2 * (pending + count))
+        if capacity > len(self._mic):
+            mic, ref = np.zeros(capacity, dtype=np.int16), np.zeros(capacity, dtype=np.int16)
+            out = np.zeros(capacity + queued + self._frame_size, dtype=np.int16)
+        else:
+            mic, ref, out = self._mic, self._ref, self._out
+        mic[:pending] = self._mic[self._in_start : self._in_end]
+        ref[:pending] = self._ref[self._in_start : self._in_end]
+        out[:queued] = self._out[self._out_start : self._out_end]
+        self._mic, self._ref, self._out = mic, ref, out
+        self._in_start, self._in_end = 0, pending
+        self._out_start, self._out_end = 0, queued
+        # Byte views: handed to SpeexDSP and written by it without copies
+        self._mic_bytes = memoryview(mic).cast("B")
+        self._ref_bytes = memoryview(ref).cast("B")
+        self._out_bytes = memoryview(out).cast("B")
+
+
+def create_echo_canceller(config: AECConfig, sample_rate: int = 16000) -> EchoCanceller:
+    """Build an EchoCanceller (and its delay estimator) from ``config``."""
+    estimator = None
+    if config.delay_estimation:
+        estimator = DelayEstimator(
+            sample_rate=sample_rate,
+            history_seconds=config.delay_history_seconds,
+            max_delay_ms=config.max_delay_ms,
+            interval_seconds=config.delay_interval_seconds,
+        )
+    return EchoCanceller(
+        filter_length=config.filter_length,
+        sample_rate=sample_rate,
+        bypass_silence=config.bypass_silence,
+        silence_rms=config.silence_rms,
+        delay_estimator=estimator,
+        delay_margin=int(config.delay_margin_ms * sample_rate / 1000),
+    )
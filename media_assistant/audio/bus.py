@@ -0,0 +1,334 @@
+"""Shared-memory audio bus — run capture and inference in separate processes.
+
+The capture process publishes AudioFrames into a ring of fixed-size slots
+in ``multiprocessing.shared_memory``; inference processes map the same
+block and read frames as zero-copy views. A multiprocessing Condition
+wakes readers when a frame lands, and a small control queue carries
+commands back to the capture process.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import threading
+import uuid
+from dataclasses import dataclass, replace
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.process import BaseProcess
+from multiprocessing.queues import Queue as ProcessQueue
+from multiprocessing.synchronize import Condition
+from queue import Empty
+
+import numpy as np
+
+from media_assistant.audio.capture import AudioCapture, AudioFrame, create_audio_capture
+from media_assistant.config import AudioConfig
+
+logger = logging.getLogger(__name__)
+
+_HEADER_FIELDS = 2  # write_seq, slots
+
+
+@dataclass
+class BusHandle:
+    """Everything a process needs to attach to a bus. Picklable."""
+
+    name: str
+    slots: int
+    frame_size: int
+    ready: Condition
+    control: ProcessQueue
+    owner_pid: int
+
+
+class AudioBus:
+    """One mapping of the shared frame ring.
+
+    Layout: an int64 header (write sequence, slot count), per-slot int64
+    sequence numbers and float64 timestamps, then the mic and loopback
+    sample planes of shape ``(slots, frame_size)``.
+    """
+
+    def __init__(self, handle: BusHandle, create: bool = False):
+        self.handle = handle
+        slots, size = handle.slots, handle.frame_size
+        self._shm = shared_memory.SharedMemory(
+            name=handle.name, create=create, size=_bus_bytes(slots, size)
+        )
+        self._owner = create
+        if os.name == "posix" and os.getpid() != handle.owner_pid:
+            # Only the creator may unlink; stop the tracker doing it at our exit
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        buf = self._shm.buf
+        offset = 0
+
+        def plane(dtype, shape):
+            nonlocal offset
+            array = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            offset += array.nbytes
+            return array
+
+        self._header = plane(np.int64, (_HEADER_FIELDS,))
+        self._seqs = plane(np.int64, (slots,))
+        self._timestamps = plane(np.float64, (slots,))
+        self._mic = plane(np.int16, (slots, size))
+        self._loopback = plane(np.int16, (slots, size))
+        if create:
+            self._header[:] = (0, slots)
+            self._seqs[:] = -1
+
+    @classmethod
+    def create(
+        cls, slots: int = 256, frame_size: int = 512, context=None
+    ) -> "AudioBus":
+        """Allocate a new bus. The creator owns (and unlinks) the memory."""
+        context = context or mp.get_context("spawn")
+        name = f"alice-bus-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        handle = BusHandle(
+            name, slots, frame_size, context.Condition(), context.Queue(), os.getpid()
+        )
+        return cls(handle, create=True)
+
+    @property
+    def write_seq(self) -> int:
+        """Sequence number the next published frame will get."""
+        return int(self._header[0])
+
+    def publish(self, frame: AudioFrame) -> None:
+        """Copy a frame into the next slot and wake readers."""
+        seq = int(self._header[0])
+        slot = seq % self.handle.slots
+        self._seqs[slot] = -1  # mark torn while writing
+        self._mic[slot] = frame.mic
+        self._loopback[slot] = frame.loopback
+        self._timestamps[slot] = frame.timestamp
+        self._seqs[slot] = seq
+        self._header[0] = seq + 1
+        with self.handle.ready:
+            self.handle.ready.notify_all()
+
+    def holds(self, seq: int) -> bool:
+        """Whether frame ``seq`` is in its slot, whole and not yet overwritten."""
+        return bool(self._seqs[seq % self.handle.slots] == seq)
+
+    def frame_at(self, seq: int, copy: bool = False) -> AudioFrame | None:
+        """Frame ``seq``, or None if it was overwritten.
+
+        By default a zero-copy view, checked only when taken: re-check
+        ``holds(seq)`` after using it. With ``copy=True`` the sequence is
+        re-checked after copying (the read side of a seqlock), so a frame
+        the publisher lapped mid-copy is reported as overwritten.
+        """
+        slot = seq % self.handle.slots
+        if self._seqs[slot] != seq:
+            return None
+        frame = AudioFrame(
+            mic=self._mic[slot],
+            loopback=self._loopback[slot],
+            timestamp=float(self._timestamps[slot]),
+        )
+        if copy:
+            frame = AudioFrame(frame.mic.copy(), frame.loopback.copy(), frame.timestamp)
+            if self._seqs[slot] != seq:
+                return None
+        return frame
+
+    def close(self) -> None:
+        """Unmap the bus. Frames read from it must not be used afterwards."""
+        # Drop our views first so the mapping can be released
+        del self._header, self._seqs, self._timestamps, self._mic, self._loopback
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def _bus_bytes(slots: int, frame_size: int) -> int:
+    return 8 * (_HEADER_FIELDS + 2 * slots) + 2 * 2 * slots * frame_size
+
+
+class BusSubscriber:
+    """Reads every frame in order; skips (and counts) frames it fell behind on."""
+
+    def __init__(self, bus: AudioBus, from_start: bool = False):
+        self._bus = bus
+        self._next = 0 if from_start else bus.write_seq
+        self.missed_frames = 0
+
+    def read(self, timeout: float = 1.0, copy: bool = False) -> AudioFrame | None:
+        """Next frame as a view into shared memory, or None on timeout.
+
+        Views stay valid until the publisher wraps around the ring or the
+        bus is closed; ``intact()`` tells whether that has happened yet.
+        With ``copy=True`` the frame is copied and verified instead, and a
+        frame lapped mid-copy is skipped and counted as missed.
+        """
+        ready = self._bus.handle.ready
+        with ready:
+            if not ready.wait_for(lambda: self._bus.write_seq > self._next, timeout):
+                return None
+        while True:
+            write_seq = self._bus.write_seq
+            oldest = write_seq - self._bus.handle.slots
+            if self._next < oldest:
+                self.missed_frames += oldest - self._next
+                self._next = oldest
+            frame = self._bus.frame_at(self._next, copy)
+            if frame is not None or self._next >= write_seq:
+                self._next += 1
+                return frame
+            self.missed_frames += 1  # overwritten between the checks
+            self._next += 1
+
+    def intact(self) -> bool:
+        """Whether the last frame read has not been overwritten since.
+
+        Check after using a view; if False, the view may be torn.
+        """
+        return self._bus.holds(self._next - 1)
+
+
+class BusAudioCapture(AudioCapture):
+    """AudioCapture that consumes frames from a bus instead of a sound card.
+
+    A reader thread forwards bus frames through the normal delivery path, so
+    ``read_frame``, ``frames()``, the drop policy and ``stats`` all behave
+    exactly as with local capture. Frames are copied off the bus, so like
+    local frames they stay valid however long they are held.
+    """
+
+    def __init__(
+        self,
+        handle: BusHandle | None,
+        sample_rate: int = 16000,
+        max_queued_frames: int = 32,
+    ):
+        frame_size = handle.frame_size if handle is not None else 512
+        super().__init__(
+            sample_rate=sample_rate, frame_size=frame_size, max_queued_frames=max_queued_frames
+        )
+        self._handle = handle
+        self._bus: AudioBus | None = None
+        self._attached = False  # whether stop() should close self._bus
+        self._subscriber: BusSubscriber | None = None
+        self._missed_seen = 0
+
+    def start(self) -> None:
+        if self._bus is None:
+            self._bus = AudioBus(self._handle)
+            self._attached = True
+        self._subscriber = BusSubscriber(self._bus)
+        self._running = True
+        self._sync_thread = threading.Thread(target=self._bus_reader, daemon=True)
+        self._sync_thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._sync_thread is not None:
+            self._sync_thread.join(timeout=1.0)
+            self._sync_thread = None
+        self._deliver(None)
+        if self._attached:
+            self._bus.close()
+            self._bus = None
+            self._attached = False
+
+    def recent_audio(self, ms: float) -> tuple[np.ndarray, np.ndarray]:
+        """Copies of the newest ``ms`` milliseconds held on the bus."""
+        count = max(1, int(np.ceil(ms * self._sample_rate / 1000 / self._frame_size)))
+        end = self._bus.write_seq
+        frames = [self._bus.frame_at(seq, copy=True) for seq in range(max(0, end - count), end)]
+        frames = [f for f in frames if f is not None]
+        if not frames:
+            empty = np.zeros(0, dtype=np.int16)
+            return empty, empty
+        length = int(ms * self._sample_rate / 1000)
+        mic = np.concatenate([f.mic for f in frames])[-length:]
+        loopback = np.concatenate([f.loopback for f in frames])[-length:]
+        return mic, loopback
+
+    def _bus_reader(self) -> None:
+        while self._running:
+            frame = self._subscriber.read(timeout=0.2, copy=True)
+            missed = self._subscriber.missed_frames
+            if missed != self._missed_seen:
+                # Lapped on the bus: counted like drops from the local queue
+                self.stats.dropped_frames += missed - self._missed_seen
+                self._missed_seen = missed
+            if frame is not None:
+                self._deliver(frame)
+
+
+class ProcessAudioCapture(BusAudioCapture):
+    """Spawn the capture process on ``start`` and consume its bus.
+
+    Drop-in for ``AudioCapture`` when ``audio.separate_process`` is set.
+    """
+
+    def __init__(self, config: AudioConfig):
+        super().__init__(None, config.sample_rate, config.max_queued_frames)
+        self._frame_size = config.frame_size
+        self._config = config
+        self._process: BaseProcess | None = None
+
+    def start(self) -> None:
+        self._process, self._bus = start_capture_process(self._config, self._config.bus_slots)
+        self._handle = self._bus.handle
+        super().start()
+
+    def stop(self) -> None:
+        super().stop()
+        if self._process is not None:
+            stop_capture_process(self._process, self._bus)
+            self._process = None
+            self._bus = None
+
+
+def run_capture_process(handle: BusHandle, config: AudioConfig) -> None:
+    """Entry point of the capture process: capture and publish until told to stop."""
+    bus = AudioBus(handle)
+    capture = create_audio_capture(config)
+    capture.start()
+    try:
+        while True:
+            try:
+                if handle.control.get_nowait() == "stop":
+                    break
+            except Empty:
+                pass
+            frame = capture.read_frame(timeout=0.2)
+            if frame is not None:
+                bus.publish(frame)
+            elif not capture.is_running:
+                break
+    finally:
+        capture.stop()
+        bus.close()
+
+
+def start_capture_process(
+    config: AudioConfig, slots: int = 256
+) -> tuple[BaseProcess, AudioBus]:
+    """Create a bus and spawn the capture process publishing into it."""
+    context = mp.get_context("spawn")
+    bus = AudioBus.create(slots=slots, frame_size=config.frame_size, context=context)
+    # The child builds the real backend in-process
+    local = replace(config, separate_process=False)
+    process = context.Process(
+        target=run_capture_process,
+        args=(bus.handle, local),
+        name="audio-capture",
+        daemon=True,
+    )
+    process.start()
+    return process, bus
+
+
+def stop_capture_process(process: BaseProcess, bus: AudioBus, timeout: float = 2.0) -> None:
+    """Ask the capture process to exit, then release the bus."""
+    bus.handle.control.put("stop")
+    process.join(timeout)
+    if process.is_alive():
+        logger.warning("Capture process did not stop, terminating")
+        process.terminate()
+    bus.close()
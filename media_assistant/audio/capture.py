@@ -1,9 +1,10 @@
 """Audio capture with microphone and WASAPI loopback via PyAudioWPatch."""
 
+import asyncio
 import time
 import threading
-from collections import deque
-from dataclasses import dataclass
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
 from queue import Queue, Empty
 
 import numpy as np
@@ -12,14 +13,37 @@ try:
 except ImportError:
     pyaudio = None  # type: ignore[assignment]  # Mocked in tests on non-Windows
 
+from media_assistant.config import AudioConfig
+from media_assistant.audio.drift import StreamClock, drift_ratio
+from media_assistant.audio.resample import StreamingResampler
+from media_assistant.audio.ring import RingBuffer
+
 
 @dataclass
 class AudioFrame:
-    """Synchronized audio frame from mic and loopback."""
+    """Synchronized audio frame from mic and loopback.
+
+    Frames own their samples, so they may be queued or held for any time.
+    Only ``recent_audio`` returns zero-copy views into the capture rings.
+    """
 
     mic: np.ndarray  # int16, mono, 16kHz
     loopback: np.ndarray  # int16, mono, 16kHz
-    timestamp: float
+    timestamp: float  # wall-clock capture time of the first mic sample
+
+
+@dataclass
+class CaptureStats:
+    """Counters for lost or late audio."""
+
+    input_overflows: int = 0  # PortAudio reported an input overflow
+    queue_overflows: int = 0  # a frame arrived while the queue was full
+    dropped_frames: int = 0  # oldest frames discarded by the drop policy
+    unpaired_frames: int = 0  # mic frames discarded: their loopback was not held
+    max_queue_depth: int = 0
+    overflows_by_stream: dict[str, int] = field(
+        default_factory=lambda: {"mic": 0, "loopback": 0}
+    )
 
 
 class AudioCapture:
@@ -31,43 +55,73 @@ class AudioCapture:
         frame_size: int = 512,
         mic_device: str | None = None,
         buffer_seconds: float = 2.0,
+        drift_compensation: bool = True,
+        max_queued_frames: int = 32,
     ):
         self._sample_rate = sample_rate
         self._frame_size = frame_size
         self._mic_device = mic_device
         self._buffer_seconds = buffer_seconds
+        self._drift_compensation = drift_compensation
 
         self._pa: pyaudio.PyAudio | None = None
         self._mic_stream = None
         self._loopback_stream = None
         self._running = False
 
-        self._mic_buffer: deque[np.ndarray] = deque(
-            maxlen=int(buffer_seconds * sample_rate / frame_size)
-        )
-        self._loopback_buffer: deque[np.ndarray] = deque(
-            maxlen=int(buffer_seconds * sample_rate / frame_size)
-        )
+        capacity = max(int(buffer_seconds * sample_rate), 2 * frame_size)
+        self._mic_buffer = RingBuffer(capacity, sample_rate)
+        self._loopback_buffer = RingBuffer(capacity, sample_rate)
+        # Soft bound: past it the oldest frame is dropped if drops are allowed
         self._frame_queue: Queue[AudioFrame] = Queue()
+        self._max_queued_frames = max_queued_frames
+        self._drop_allowed = True
+        self.stats = CaptureStats()
+        # Set while a frames() consumer is attached; frames then go to its loop
+        self._async_sink: tuple[asyncio.AbstractEventLoop, asyncio.Queue] | None = None
+        # Signalled by the stream callbacks whenever a buffer receives data;
+        # also guards the choice between _frame_queue and _async_sink
+        self._data_ready = threading.Condition()
+
+        # Capture clocks of both streams, in 16 kHz output samples
+        self._mic_clock = StreamClock(sample_rate)
+        self._loopback_clock = StreamClock(sample_rate)
+        self._loopback_pos: float | None = None  # next aligned loopback index
+        self._resync_samples = 0.02 * sample_rate
+        self._frame_offsets = np.arange(frame_size, dtype=np.float64)
+        self._wall_offset = time.time() - time.monotonic()
 
         self._loopback_rate: float = 0.0
         self._loopback_channels: int = 0
+        self._resampler: StreamingResampler | None = None
 
-        self._mic_thread: threading.Thread | None = None
-        self._loopback_thread: threading.Thread | None = None
         self._sync_thread: threading.Thread | None = None
 
     @property
     def is_running(self) -> bool:
         return self._running
 
+    @property
+    def drift_ppm(self) -> float:
+        """Estimated loopback clock drift relative to the mic, in ppm."""
+        return (drift_ratio(self._mic_clock, self._loopback_clock) - 1.0) * 1e6
+
     def start(self) -> None:
-        """Start mic + loopback capture threads."""
+        """Open mic + loopback streams in callback mode and start the synchronizer.
+
+        PortAudio calls ``_mic_callback``/``_loopback_callback`` with every
+        block it captured, together with status flags, so an input overflow
+        is counted while the block itself is kept. Blocking reads can only
+        report an overflow by raising, which discards the block.
+        """
         self._pa = pyaudio.PyAudio()
 
         loopback_device = self._pa.get_wasapi_loopback()
         self._loopback_rate = loopback_device["defaultSampleRate"]
         self._loopback_channels = loopback_device["maxInputChannels"]
+        self._resampler = StreamingResampler(
+            self._loopback_rate, self._sample_rate, self._loopback_channels
+        )
 
         # Calculate loopback frame size to match time duration of mic frame
         duration_per_frame = self._frame_size / self._sample_rate
@@ -81,6 +135,8 @@ class AudioCapture:
             rate=self._sample_rate,
             input=True,
             frames_per_buffer=self._frame_size,
+            start=False,
+            stream_callback=self._mic_callback,
         )
 
         self._loopback_stream = self._pa.open(
@@ -90,23 +146,22 @@ class AudioCapture:
             input=True,
             input_device_index=loopback_device["index"],
             frames_per_buffer=loopback_frame_samples,
+            start=False,
+            stream_callback=self._loopback_callback,
         )
 
         self._running = True
-
-        self._mic_thread = threading.Thread(target=self._mic_reader, daemon=True)
-        self._loopback_thread = threading.Thread(
-            target=self._loopback_reader, daemon=True
-        )
         self._sync_thread = threading.Thread(target=self._synchronizer, daemon=True)
-
-        self._mic_thread.start()
-        self._loopback_thread.start()
         self._sync_thread.start()
+        self._mic_stream.start_stream()
+        self._loopback_stream.start_stream()
 
     def stop(self) -> None:
         """Stop capture, release resources."""
         self._running = False
+        with self._data_ready:
+            self._data_ready.notify_all()
+        self._deliver(None)
 
         if self._mic_stream is not None:
             self._mic_stream.stop_stream()
@@ -129,64 +184,262 @@ class AudioCapture:
         except Empty:
             return None
 
-    def _mic_reader(self) -> None:
-        """Read mic data into ring buffer."""
-        while self._running:
-            try:
-                data = self._mic_stream.read(
-                    self._frame_size, exception_on_overflow=False
-                )
-                frame = np.frombuffer(data, dtype=np.int16)
-                self._mic_buffer.append(frame)
-            except Exception:
-                if not self._running:
+    async def frames(self) -> AsyncIterator[AudioFrame]:
+        """Yield synchronized frames without blocking the event loop.
+
+        The synchronizer thread hands frames to the consuming loop with
+        ``call_soon_threadsafe``, so awaiting the next frame never parks the
+        loop thread. Iteration ends when capture is stopped.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[AudioFrame | None] = asyncio.Queue()
+        with self._data_ready:
+            while not self._frame_queue.empty():
+                queue.put_nowait(self._frame_queue.get_nowait())
+            self._async_sink = (loop, queue)
+        try:
+            while self._running or not queue.empty():
+                frame = await queue.get()
+                if frame is None:
                     break
-
-    def _loopback_reader(self) -> None:
-        """Read loopback data into ring buffer, resample to mono 16kHz."""
-        duration_per_frame = self._frame_size / self._sample_rate
-        loopback_frame_samples = int(
-            self._loopback_rate * duration_per_frame * self._loopback_channels
-        )
-        while self._running:
+                yield frame
+        finally:
+            with self._data_ready:
+                self._async_sink = None
+
+    def set_drop_allowed(self, allowed: bool) -> None:
+        """Choose whether a full queue drops its oldest frame or keeps growing.
+
+        Call from the consuming thread (the event loop when using frames()).
+        Allowing drops also trims any backlog down to the bound right away.
+        """
+        self._drop_allowed = allowed
+        if not allowed:
+            return
+        sink = self._async_sink
+        queue = sink[1] if sink is not None else self._frame_queue
+        while queue.qsize() > self._max_queued_frames:
             try:
-                data = self._loopback_stream.read(
-                    loopback_frame_samples, exception_on_overflow=False
-                )
-                raw = np.frombuffer(data, dtype=np.int16)
-                resampled = self._resample_to_mono_16k(raw)
-                self._loopback_buffer.append(resampled)
-            except Exception:
-                if not self._running:
-                    break
-
-    def _resample_to_mono_16k(self, raw: np.ndarray) -> np.ndarray:
-        """Convert raw loopback audio to mono 16kHz int16."""
-        samples = raw.copy()
+                queue.get_nowait()
+            except (Empty, asyncio.QueueEmpty):
+                break
+            self.stats.dropped_frames += 1
+
+    def recent_audio(self, ms: float) -> tuple[np.ndarray, np.ndarray]:
+        """Views of the newest ``ms`` milliseconds of mic and loopback audio."""
+        return self._mic_buffer.last_ms(ms), self._loopback_buffer.last_ms(ms)
+
+    def _mic_callback(self, data: bytes, frame_count: int, time_info: dict, status: int):
+        """PortAudio callback: copy a captured mic block into the ring buffer."""
+        if status & pyaudio.paInputOverflow:
+            # Samples before this block were lost; the block itself is intact
+            self._count_overflow("mic")
+        self._push_mic(np.frombuffer(data, dtype=np.int16), time.monotonic())
+        return None, pyaudio.paContinue
+
+    def _loopback_callback(self, data: bytes, frame_count: int, time_info: dict, status: int):
+        """PortAudio callback: resample loopback to mono 16kHz into the ring buffer."""
+        if status & pyaudio.paInputOverflow:
+            self._count_overflow("loopback")
+        # Resampled samples lag the capture by the filter's group delay
+        captured_at = time.monotonic() - self._resampler.delay_seconds
+        self._push_loopback(
+            self._resampler.process(np.frombuffer(data, dtype=np.int16)), captured_at
+        )
+        return None, pyaudio.paContinue
+
+    def _count_overflow(self, stream: str) -> None:
+        self.stats.input_overflows += 1
+        self.stats.overflows_by_stream[stream] += 1
+
+    def _push_mic(self, samples: np.ndarray, captured_at: float | None = None) -> None:
+        """Copy a mic block into the ring and wake the synchronizer.
+
+        ``captured_at`` is the monotonic time the block was read, i.e. the
+        capture time of its last sample.
+        """
+        if captured_at is None:
+            captured_at = time.monotonic()
+        with self._data_ready:
+            self._mic_buffer.write(samples)
+            self._mic_clock.observe(self._mic_buffer.write_pos, captured_at)
+            self._data_ready.notify()
+
+    def _push_loopback(
+        self, samples: np.ndarray, captured_at: float | None = None
+    ) -> None:
+        """Copy a loopback block into the ring and wake the synchronizer."""
+        if captured_at is None:
+            captured_at = time.monotonic()
+        with self._data_ready:
+            self._loopback_buffer.write(samples)
+            self._loopback_clock.observe(self._loopback_buffer.write_pos, captured_at)
+            self._data_ready.notify()
 
-        # Stereo → mono: average channels
-        if self._loopback_channels == 2:
-            samples = samples.reshape(-1, 2).mean(axis=1)
+    def _synchronizer(self) -> None:
+        """Combine mic + loopback buffers into AudioFrames.
+
+        Sleeps on a condition variable until both buffers hold a block,
+        so an idle capture costs no wakeups at all.
+        """
+        while True:
+            with self._data_ready:
+                self._data_ready.wait_for(self._pair_ready_or_stopped)
+                if not self._running:
+                    return
+                frame = self._take_frame()
+            if frame is not None:
+                self._deliver(frame)
+
+    def _deliver(self, frame: AudioFrame | None) -> None:
+        """Route a frame to the async consumer, or to read_frame().
+
+        The destination is chosen, and a frame for read_frame() queued,
+        under ``_data_ready``: frames() drains the queue and installs its
+        sink under the same lock, so no frame lands in the queue after
+        the drain.
+        """
+        with self._data_ready:
+            sink = self._async_sink
+            if sink is None:
+                if frame is not None:
+                    self._enqueue(self._frame_queue, frame)
+                return
+        loop, queue = sink
+        try:
+            if frame is None:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+            else:
+                # Applied on the loop thread, where the queue depth is exact
+                loop.call_soon_threadsafe(self._enqueue, queue, frame)
+        except RuntimeError:
+            pass  # Consumer loop already closed
+
+    def _enqueue(self, queue: Queue | asyncio.Queue, frame: AudioFrame) -> None:
+        """Put a frame, applying the drop policy at the soft bound."""
+        if queue.qsize() >= self._max_queued_frames:
+            self.stats.queue_overflows += 1
+            if self._drop_allowed:
+                try:
+                    queue.get_nowait()
+                    self.stats.dropped_frames += 1
+                except (Empty, asyncio.QueueEmpty):
+                    pass
+        queue.put_nowait(frame)
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, queue.qsize())
+
+    def _pair_ready_or_stopped(self) -> bool:
+        if not self._running:
+            return True
+        if self._mic_buffer.available < self._frame_size:
+            return False
+        if not self._drift_compensation:
+            return self._loopback_buffer.available >= self._frame_size
+        mic_start = max(
+            self._mic_buffer.read_pos,
+            self._mic_buffer.write_pos - self._mic_buffer.capacity,
+        )
+        start = self._loopback_start(self._mic_clock.time_of(mic_start))
+        return self._loopback_end(start) <= self._loopback_buffer.write_pos
+
+    def _take_frame(self) -> AudioFrame | None:
+        """Pop the next mic frame and pair it with loopback audio.
+
+        Samples are copied out of the rings: a frame may sit in the queue
+        (drops are disallowed outside IDLE) or in the speech buffer for
+        longer than ``buffer_seconds``, and a view would then be overwritten.
+        """
+        mic = self._mic_buffer.read(self._frame_size).copy()
+        captured_at = self._mic_clock.time_of(
+            self._mic_buffer.read_pos - self._frame_size
+        )
+        if self._drift_compensation:
+            loopback = self._read_aligned_loopback(captured_at)
+            if loopback is None:
+                self.stats.unpaired_frames += 1
+                return None
+        else:
+            loopback = self._loopback_buffer.read(self._frame_size).copy()
+        return AudioFrame(
+            mic=mic, loopback=loopback, timestamp=captured_at + self._wall_offset
+        )
 
-        # Resample if rate differs
-        if self._loopback_rate != self._sample_rate:
-            target_len = self._frame_size
-            indices = np.linspace(0, len(samples) - 1, target_len)
-            samples = np.interp(indices, np.arange(len(samples)), samples)
+    def _loopback_start(self, captured_at: float) -> float:
+        """Fractional loopback index captured together with a mic frame.
+
+        Follows the running position so the reference advances smoothly at
+        the drift-corrected rate; falls back to the timestamp mapping on
+        the first frame or when the two disagree by more than 20 ms.
+        """
+        # Rounded so float error cannot push an exact index below zero
+        target = round(self._loopback_clock.index_at(captured_at), 6)
+        pos = self._loopback_pos
+        if pos is None or abs(pos - target) > self._resync_samples:
+            return target
+        return pos
+
+    def _loopback_end(self, start: float) -> int:
+        """Absolute index one past the last sample needed from ``start``."""
+        ratio = drift_ratio(self._mic_clock, self._loopback_clock)
+        return int(np.ceil(start + (self._frame_size - 1) * ratio)) + 1
+
+    def _read_aligned_loopback(self, captured_at: float) -> np.ndarray | None:
+        """Loopback frame aligned to ``captured_at``, resampled for drift.
+
+        Returns None when that stretch of loopback is not held (the mic frame
+        predates loopback capture, or the consumer fell too far behind).
+        """
+        ratio = drift_ratio(self._mic_clock, self._loopback_clock)
+        start = self._loopback_start(captured_at)
+        base = int(np.floor(start))
+        length = self._loopback_end(start) - base
+        oldest = self._loopback_buffer.write_pos - self._loopback_buffer.capacity
+        if base < max(oldest, 0) or base + length > self._loopback_buffer.write_pos:
+            self._loopback_pos = None
+            return None
 
-        return samples.astype(np.int16)
+        self._loopback_pos = start + self._frame_size * ratio
+        if start == base and ratio == 1.0:
+            return self._loopback_buffer.window(base, self._frame_size).copy()
+
+        window = self._loopback_buffer.window(base, length)
+        positions = (start - base) + self._frame_offsets * ratio
+        aligned = np.interp(positions, np.arange(length), window)
+        return np.rint(aligned).astype(np.int16)
+
+
+def create_audio_capture(config: AudioConfig):
+    """Build the capture backend selected by ``config.backend``."""
+    if config.separate_process:
+        from media_assistant.audio.bus import ProcessAudioCapture
+
+        return ProcessAudioCapture(config)
+    if config.backend == "wasapi":
+        return AudioCapture(
+            sample_rate=config.sample_rate,
+            frame_size=config.frame_size,
+            mic_device=config.mic_device,
+            drift_compensation=config.drift_compensation,
+            max_queued_frames=config.max_queued_frames,
+        )
 
-    def _synchronizer(self) -> None:
-        """Combine mic + loopback buffers into AudioFrames."""
-        while self._running:
-            if self._mic_buffer and self._loopback_buffer:
-                mic = self._mic_buffer.popleft()
-                loopback = self._loopback_buffer.popleft()
-                frame = AudioFrame(
-                    mic=mic,
-                    loopback=loopback,
-                    timestamp=time.time(),
-                )
-                self._frame_queue.put(frame)
-            else:
-                time.sleep(0.001)
+    from media_assistant.audio.replay import FileAudioCapture, SyntheticAudioCapture
+
+    if config.backend == "file":
+        if not config.replay_path:
+            raise ValueError("audio.replay_path is required for backend=file")
+        return FileAudioCapture(
+            config.replay_path,
+            config.replay_loopback_path,
+            sample_rate=config.sample_rate,
+            frame_size=config.frame_size,
+            realtime=config.replay_realtime,
+        )
+    if config.backend == "synthetic":
+        return SyntheticAudioCapture(
+            sample_rate=config.sample_rate,
+            frame_size=config.frame_size,
+            realtime=config.replay_realtime,
+            loop=True,
+        )
+    raise ValueError(f"Unknown audio backend: {config.backend!r}")
@@ -0,0 +1,124 @@
+"""Echo-path delay estimation (GCC-PHAT) and a reference delay line."""
+
+import logging
+import threading
+
+import numpy as np
+
+from media_assistant.audio.ring import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+
+def gcc_phat(mic: np.ndarray, ref: np.ndarray, max_delay: int) -> tuple[int, float]:
+    """Delay of ``ref`` inside ``mic`` in samples, and the PHAT peak height.
+
+    The cross-spectrum is whitened to unit magnitude, so the correlation
+    peak depends on phase alignment only and is not smeared by the
+    spectral colour of music. The peak height is 1.0 for a pure delay and
+    falls towards 0 as the echo is buried in noise, which makes it usable
+    as a confidence. Only lags in ``[0, max_delay]`` are searched: the
+    echo can only arrive after the loopback.
+    """
+    n = len(mic) + len(ref)
+    nfft = 1 << (n - 1).bit_length()
+    spectrum = np.fft.rfft(mic, nfft) * np.conj(np.fft.rfft(ref, nfft))
+    spectrum /= np.abs(spectrum) + 1e-12
+    cc = np.fft.irfft(spectrum, nfft)[: max_delay + 1]
+    lag = int(np.argmax(cc))
+    return lag, float(cc[lag])
+
+
+class DelayEstimator:
+    """Track the loopback -> mic delay from a few seconds of history.
+
+    ``push`` only copies the newest samples into two ring buffers; a
+    background thread runs GCC-PHAT every ``interval_seconds`` and
+    publishes ``delay_samples`` when the peak clears ``min_confidence``.
+    Windows where the loopback is silent are skipped.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        history_seconds: float = 4.0,
+        max_delay_ms: float = 250.0,
+        interval_seconds: float = 2.0,
+        min_confidence: float = 0.05,
+        min_ref_rms: float = 30.0,
+    ):
+        self._sample_rate = sample_rate
+        self._history = int(history_seconds * sample_rate)
+        self.max_delay = int(max_delay_ms * sample_rate / 1000)
+        self._interval = interval_seconds
+        self._min_confidence = min_confidence
+        self._min_ref_rms = min_ref_rms
+
+        self._mic = RingBuffer(self._history, sample_rate)
+        self._ref = RingBuffer(self._history, sample_rate)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.delay_samples = 0
+        self.confidence = 0.0  # of the last accepted estimate
+        self.estimates = 0  # accepted estimates so far
+
+    @property
+    def delay_ms(self) -> float:
+        return self.delay_samples * 1000 / self._sample_rate
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def push(self, mic: np.ndarray, ref: np.ndarray) -> None:
+        """Add one block of time-aligned mic and raw (undelayed) loopback."""
+        with self._lock:
+            self._mic.write(mic)
+            self._ref.write(ref)
+
+    def estimate(self) -> bool:
+        """Run one estimate over the current history; True if it was accepted."""
+        with self._lock:
+            if self._mic.write_pos < self._history:
+                return False
+            mic = self._mic.latest(self._history).astype(np.float32)
+            ref = self._ref.latest(self._history).astype(np.float32)
+        if np.sqrt(np.mean(ref**2)) < self._min_ref_rms:
+            return False  # nothing playing, nothing to correlate
+        lag, peak = gcc_phat(mic, ref, self.max_delay)
+        if peak < self._min_confidence:
+            return False
+        if lag != self.delay_samples:
+            logger.info("Echo path delay %.1f ms (confidence %.2f)", lag * 1000 / self._sample_rate, peak)
+        self.delay_samples, self.confidence = lag, peak
+        self.estimates += 1
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.estimate()
+
+
+class DelayLine:
+    """Delay a stream by a variable number of samples (up to ``max_delay``)."""
+
+    def __init__(self, max_delay: int, max_block: int = 4096):
+        self._max_delay = max_delay
+        self._ring = RingBuffer(max_delay + max_block)
+        self._ring.write(np.zeros(max_delay, dtype=np.int16))
+
+    def process(self, samples: np.ndarray, delay: int) -> np.ndarray:
+        """Append ``samples`` and return the block ``delay`` samples earlier (a view)."""
+        delay = min(max(delay, 0), self._max_delay)
+        self._ring.write(samples)
+        return self._ring.window(self._ring.write_pos - delay - len(samples), len(samples))
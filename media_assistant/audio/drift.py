@@ -0,0 +1,59 @@
+"""Capture-clock tracking for aligning mic and loopback streams."""
+
+
+class StreamClock:
+    """Map absolute sample indices of one stream to capture times.
+
+    Each observation is the index one past the newest sample of a block and
+    the monotonic time that block was read. The effective sample rate is the
+    slope from the first observation (the anchor), so reader wake-up jitter
+    averages out as the span grows. A block arriving far from its predicted
+    time (a dropped buffer, a device restart) re-anchors the clock.
+    """
+
+    def __init__(
+        self,
+        nominal_rate: float,
+        min_span_seconds: float = 5.0,
+        resync_seconds: float = 0.1,
+    ):
+        self._nominal_rate = float(nominal_rate)
+        self._min_span = min_span_seconds
+        self._resync = resync_seconds
+        self._anchor_index: int | None = None
+        self._anchor_time = 0.0
+        self._rate = self._nominal_rate
+
+    @property
+    def rate(self) -> float:
+        """Measured samples per second (nominal until enough data is seen)."""
+        return self._rate
+
+    def observe(self, end_index: int, t: float) -> None:
+        """Record that samples up to ``end_index`` had been captured at ``t``."""
+        if self._anchor_index is None:
+            self._anchor_index, self._anchor_time = end_index, t
+            return
+        if abs(t - self.time_of(end_index)) > self._resync:
+            self._anchor_index, self._anchor_time = end_index, t
+            return
+        span = t - self._anchor_time
+        if span >= self._min_span:
+            self._rate = (end_index - self._anchor_index) / span
+
+    def time_of(self, index: float) -> float:
+        """Capture time of the sample at absolute ``index``."""
+        if self._anchor_index is None:
+            return 0.0
+        return self._anchor_time + (index - self._anchor_index) / self._rate
+
+    def index_at(self, t: float) -> float:
+        """Fractional absolute index of the sample captured at time ``t``."""
+        if self._anchor_index is None:
+            return 0.0
+        return self._anchor_index + (t - self._anchor_time) * self._rate
+
+
+def drift_ratio(reference: StreamClock, other: StreamClock) -> float:
+    """Samples of ``other`` elapsed per sample of ``reference``."""
+    return other.rate / reference.rate
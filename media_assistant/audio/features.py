@@ -0,0 +1,60 @@
+"""Per-frame features computed once and shared by every consumer."""
+
+from functools import cached_property
+
+import numpy as np
+
+
+class FrameFeatures:
+    """One int16 frame (and optionally its loopback) with lazily cached features.
+
+    Each property does its pass over the data on first access only, so a
+    frame handed through several consumers (energy gate, VAD, verifier) is
+    converted to float32 and reduced to an RMS once. ``float32`` is scaled
+    to [-1, 1); ``rms`` and ``peak`` are in int16 units. The arrays must not
+    be modified while the features are in use.
+    """
+
+    def __init__(self, pcm: np.ndarray, reference: np.ndarray | None = None):
+        self.pcm = pcm
+        self.reference = reference
+
+    @classmethod
+    def of(cls, frame: "np.ndarray | FrameFeatures") -> "FrameFeatures":
+        """``frame`` itself if it already is a FrameFeatures, else a new one."""
+        return frame if isinstance(frame, FrameFeatures) else cls(frame)
+
+    def __len__(self) -> int:
+        return len(self.pcm)
+
+    @cached_property
+    def float32(self) -> np.ndarray:
+        return np.multiply(self.pcm, np.float32(1 / 32768), dtype=np.float32)
+
+    @cached_property
+    def rms(self) -> float:
+        return _rms(self.float32)
+
+    @cached_property
+    def peak(self) -> int:
+        if not len(self.pcm):
+            return 0
+        return max(int(self.pcm.max()), -int(self.pcm.min()))
+
+    @cached_property
+    def reference_rms(self) -> float:
+        """RMS of the loopback reference (0.0 without one)."""
+        if self.reference is None:
+            return 0.0
+        return _rms(np.multiply(self.reference, np.float32(1 / 32768), dtype=np.float32))
+
+    @cached_property
+    def energy_ratio(self) -> float:
+        """Mic RMS over loopback RMS: large when a person, not the speakers, is loud."""
+        return self.rms / (self.reference_rms + 1e-10)
+
+
+def _rms(samples: np.ndarray) -> float:
+    if not len(samples):
+        return 0.0
+    return float(np.sqrt(np.dot(samples, samples) / len(samples))) * 32768.0
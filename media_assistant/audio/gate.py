@@ -0,0 +1,91 @@
+"""Energy and zero-crossing pre-gate that spares the neural VAD on silent frames."""
+
+import numpy as np
+
+from media_assistant.audio.features import FrameFeatures
+
+
+class EnergyGate:
+    """Decide cheaply whether a frame can be speech at all.
+
+    ``passes(frame)`` is False only for frames that are plainly room
+    silence; True means "ambiguous, ask the model". A frame passes when its
+    RMS is ``open_db`` above the adaptive noise floor. Once open, the gate
+    stays open down to ``close_db`` above the floor (hysteresis) and for
+    ``hangover_frames`` after that, so word tails and soft consonants still
+    reach the model. Between the two thresholds a closed gate also opens for
+    frames with a low zero-crossing rate: a voiced onset rather than a
+    broadband noise bump.
+
+    The floor drops to any quieter frame at once and rises by at most
+    ``floor_rise_db`` per second, so it follows the pauses between words
+    and slowly adapts to louder rooms. It starts at ``min_rms``, which
+    keeps the gate permissive until it has heard the room; it is kept
+    across ``reset()`` because it describes the room, not the utterance.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_size: int = 512,
+        open_db: float = 9.0,
+        close_db: float = 5.0,
+        hangover_frames: int = 8,
+        voiced_zcr: float = 0.25,
+        floor_rise_db: float = 6.0,
+        min_rms: float = 10.0,
+    ):
+        self._open = 10 ** (open_db / 20)
+        self._close = 10 ** (close_db / 20)
+        self._hangover = hangover_frames
+        self._voiced_zcr = voiced_zcr
+        self._rise = 10 ** (floor_rise_db / 20 * frame_size / sample_rate)
+        self._min_rms = min_rms
+        self.floor_rms = min_rms
+        self._is_open = False
+        self._hold = 0  # hangover frames left
+        self.frames = 0  # frames seen
+        self.rejected = 0  # frames answered without the model
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of frames the gate rejected, i.e. model runs saved."""
+        return self.rejected / self.frames if self.frames else 0.0
+
+    def passes(self, frame: np.ndarray | FrameFeatures) -> bool:
+        """False if ``frame`` is definitely not speech; updates the floor."""
+        features = FrameFeatures.of(frame)
+        rms = features.rms
+        floor = self.floor_rms
+
+        if rms >= floor * self._open:
+            active = True
+        elif rms >= max(floor * self._close, self._min_rms):
+            active = self._is_open or self._zcr(features.pcm) < self._voiced_zcr
+        else:
+            active = False
+
+        if active:
+            self._hold = self._hangover
+            self._is_open = True
+        elif self._hold:
+            self._hold -= 1
+            self._is_open = True
+        else:
+            self._is_open = False
+
+        self.floor_rms = max(min(rms, floor * self._rise), self._min_rms)
+        self.frames += 1
+        self.rejected += not self._is_open
+        return self._is_open
+
+    def reset(self) -> None:
+        """Close the gate between utterances, keeping the noise floor."""
+        self._is_open = False
+        self._hold = 0
+
+    @staticmethod
+    def _zcr(frame: np.ndarray) -> float:
+        """Fraction of adjacent sample pairs that change sign."""
+        negative = np.signbit(frame)
+        return int(np.count_nonzero(negative[1:] != negative[:-1])) / (len(frame) - 1)
@@ -1,25 +1,337 @@
-"""Noise suppression via DeepFilterNet."""
+"""Noise suppression: DeepFilterNet, or a lightweight numpy spectral gate."""
+
+from math import ceil
 
 import numpy as np
 
+from media_assistant.audio.features import FrameFeatures
+from media_assistant.audio.resample import StreamingResampler
+from media_assistant.config import NoiseConfig
+
 try:
     from df import enhance as df_mod
 except ImportError:
     df_mod = None  # type: ignore[assignment]  # Mocked in tests on non-Windows
 
+try:
+    import torch
+except ImportError:
+    torch = None  # type: ignore[assignment]  # Mocked in tests on non-Windows
+
+# libdf's initial normalization states (MEAN_NORM_INIT, UNIT_NORM_INIT)
+_ERB_NORM_INIT = (-60.0, -90.0)
+_UNIT_NORM_INIT = (0.001, 0.0001)
+
 
 class NoiseSuppressor:
-    """Suppress background noise from audio frames using DeepFilterNet."""
+    """Suppress background noise from audio frames using DeepFilterNet.
 
-    def __init__(self):
+    By default every frame is enhanced on its own with ``df.enhance``. With
+    ``streaming=True`` frames go through a ``StreamingDeepFilter`` instead,
+    which keeps STFT and model context across calls and delays the output
+    by a fixed ``latency_samples``.
+    """
+
+    def __init__(
+        self,
+        streaming: bool = False,
+        context_hops: int = 4,
+        lookahead_hops: int = 2,
+    ):
         model, df_state, sr = df_mod.init_df()
         self._model = model
         self._df_state = df_state
         self._sample_rate = sr
+        self._warmed = False
+        self._stream: StreamingDeepFilter | None = None
+        self.latency_samples = 0
+        if streaming:
+            self._stream = StreamingDeepFilter(
+                model, df_state, context_hops=context_hops, lookahead_hops=lookahead_hops
+            )
+            self.latency_samples = self._stream.latency_samples
+
+    def warm(self) -> None:
+        """Run the model once on silence so its first real frame is not slow.
+
+        In streaming mode this also drops context left over from the last
+        time the stage ran.
+        """
+        if not self._warmed:
+            self.process(np.zeros(512, dtype=np.int16))
+            self._warmed = True
+        if self._stream is not None:
+            self._stream.reset()
 
-    def process(self, frame: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
+    def process(self, frame: np.ndarray | FrameFeatures, sample_rate: int = 16000) -> np.ndarray:
         """Suppress noise, return clean frame as int16."""
-        audio_float = frame.astype(np.float32) / 32768.0
-        clean_float = df_mod.enhance(self._model, self._df_state, audio_float)
+        features = FrameFeatures.of(frame)
+        if self._stream is not None:
+            return self._stream.process(features.pcm)
+        clean_float = df_mod.enhance(self._model, self._df_state, features.float32)
         clean = np.clip(clean_float * 32768.0, -32768, 32767).astype(np.int16)
         return clean
+
+
+class StreamingDeepFilter:
+    """DeepFilterNet over a continuous stream, in frames of any size.
+
+    Audio is resampled to the model rate with stateful resamplers and
+    split into whole STFT hops; ``df_state.analysis``/``synthesis`` keep
+    their overlap memory between calls, so there are no frame-edge
+    artifacts. The ERB and unit normalizations run here rather than in
+    ``df_features``, with their running means kept on the instance, so
+    new hops are normalized exactly as in one long offline pass.
+
+    The PyTorch model does not expose its GRU or convolution state, so it
+    is re-run over the last ``context_hops`` spectral frames plus the new
+    ones, and only output hops that have seen ``lookahead_hops`` of future
+    are emitted. That is the cost of streaming: each call runs the model
+    over ``context_hops + lookahead_hops`` hops on top of the new ones,
+    about 3x the model work per emitted hop with the defaults and 32 ms
+    frames (~3 new hops). Larger contexts give the GRUs a longer warm-up
+    at proportionally higher cost.
+
+    Output goes through a FIFO primed with silence, so each call returns as
+    many samples as it was given. ``latency_samples`` (at ``sample_rate``)
+    is the priming plus the STFT and resampler delays, and is constant.
+    """
+
+    def __init__(
+        self,
+        model,
+        df_state,
+        sample_rate: int = 16000,
+        context_hops: int = 4,
+        lookahead_hops: int = 2,
+    ):
+        self._model = model
+        self._df_state = df_state
+        self._rate = sample_rate
+        self._df_rate = int(df_state.sr())
+        self._hop = int(df_state.hop_size())
+        self._context = context_hops
+        self._lookahead = lookahead_hops
+        self._nb_df = getattr(model, "nb_df", getattr(model, "df_bins", 96))
+        self._erb_widths = df_state.erb_widths()
+        self._norm_alpha = df_mod.get_norm_alpha(False)
+
+        # Output is short of input by at most the unfinished hop plus the
+        # held-back lookahead hops (and resampler rounding)
+        ratio = sample_rate / self._df_rate
+        self._priming = ceil((lookahead_hops + 1) * self._hop * ratio) + 2
+        stft_delay = (int(df_state.fft_size()) - self._hop) / self._df_rate
+        self.reset()
+        resample_delay = self._up.delay_seconds + self._down.delay_seconds
+        self.latency_samples = self._priming + round((stft_delay + resample_delay) * sample_rate)
+
+    def reset(self) -> None:
+        """Forget all context and restart the output FIFO."""
+        self._up = StreamingResampler(self._rate, self._df_rate)
+        self._down = StreamingResampler(self._df_rate, self._rate)
+        self._pending = np.zeros(0, dtype=np.float32)  # model-rate samples short of a hop
+        self._features: tuple[np.ndarray, ...] | None = None  # spec, erb, spec_feat context
+        self._held = 0  # newest hops in the context not yet emitted
+        # Running means of the feature normalizations, updated in place by libdf
+        self._erb_norm = np.linspace(*_ERB_NORM_INIT, len(self._erb_widths), dtype=np.float32)[None]
+        self._unit_norm = np.linspace(*_UNIT_NORM_INIT, self._nb_df, dtype=np.float32)[None]
+        self._out = np.zeros(self._priming, dtype=np.int16)
+
+    def process(self, frame: np.ndarray) -> np.ndarray:
+        audio = np.concatenate((self._pending, self._up.process(frame).astype(np.float32)))
+        hops = len(audio) // self._hop
+        self._pending = audio[hops * self._hop :]
+        if hops:
+            enhanced = self._enhance(audio[: hops * self._hop] / 32768.0, hops)
+            if len(enhanced):
+                self._out = np.concatenate((self._out, self._down.process(enhanced)))
+        clean, self._out = self._out[: len(frame)], self._out[len(frame) :]
+        return clean
+
+    def _enhance(self, audio: np.ndarray, hops: int) -> np.ndarray:
+        """Run the model over context + ``hops`` new hops; int16 of the finished hops."""
+        features = self._analyze(audio)
+        if self._features is not None:
+            features = tuple(
+                np.concatenate((old, new), axis=2) for old, new in zip(self._features, features)
+            )
+        features = _newest(features, self._context + self._held + hops)
+
+        if hasattr(self._model, "reset_h0"):
+            self._model.reset_h0(batch_size=1, device="cpu")
+        with torch.no_grad():
+            # Copies: the model may modify its spectrum input in place
+            spec, erb, spec_feat = (torch.as_tensor(f.copy()) for f in features)
+            out = np.asarray(self._model(spec, erb, spec_feat)[0])
+
+        ready = max(0, self._held + hops - self._lookahead)
+        total = out.shape[2]
+        start = total - self._held - hops
+        finished = out[:, 0, start : start + ready]  # [1, T, F, 2]
+        self._held = self._held + hops - ready
+        self._features = _newest(features, self._context + self._held)
+        if not ready:
+            return np.zeros(0, dtype=np.int16)
+
+        spectrum = (finished[..., 0] + 1j * finished[..., 1]).astype(np.complex64)
+        samples = np.asarray(self._df_state.synthesis(spectrum))[0]
+        return np.clip(np.rint(samples * 32768.0), -32768, 32767).astype(np.int16)
+
+    def _analyze(self, audio: np.ndarray) -> tuple[np.ndarray, ...]:
+        """``df_features`` for new hops, continuing the normalization states.
+
+        ``df_features`` restarts both normalizations from libdf's initial
+        state on every call; the libdf functions (re-exported by
+        ``df.enhance``) take the state arrays and update them in place.
+        """
+        spec = self._df_state.analysis(audio[None].astype(np.float32))  # [1, T, F] complex
+        erb = df_mod.erb_norm(df_mod.erb(spec, self._erb_widths), self._norm_alpha, self._erb_norm)
+        low = spec[..., : self._nb_df].copy()
+        spec_feat = df_mod.unit_norm(low, self._norm_alpha, self._unit_norm)
+        return _as_real(spec), np.asarray(erb, dtype=np.float32)[:, None], _as_real(spec_feat)
+
+
+def _as_real(spec: np.ndarray) -> np.ndarray:
+    """[C, T, F] complex -> [C, 1, T, F, 2] float32, the model's input layout."""
+    spec = np.asarray(spec)
+    return np.stack((spec.real, spec.imag), axis=-1).astype(np.float32)[:, None]
+
+
+def _newest(features: tuple[np.ndarray, ...], hops: int) -> tuple[np.ndarray, ...]:
+    """The last ``hops`` time steps (axis 2) of each feature array."""
+    return tuple(f[:, :, max(0, f.shape[2] - hops) :] for f in features)
+
+
+class SpectralGate:
+    """Lightweight noise suppression: a per-bin spectral gate in pure numpy.
+
+    Audio is cut into 50%-overlapping sqrt-Hann windows of ``fft_size``
+    samples; every whole hop available in a call is transformed in one
+    batched ``rfft``. Each bin's noise floor follows the smoothed power
+    down quickly and creeps up by at most ``floor_rise_db`` per second, so
+    it tracks steady noise but not speech. Bins more than ``threshold_db``
+    above the floor pass; the rest are attenuated by ``reduction_db``. The
+    gain is smoothed across neighbouring bins and over time (fast attack,
+    slow release) to avoid musical noise, then the hops are overlap-added.
+
+    Window tail, noise floor and gains carry across calls. Output is
+    delayed by a constant ``latency_samples``: one hop, plus ``hop - 1``
+    samples of priming when frames are not a multiple of the hop. Priming
+    follows ``frame_size``, and is added on the first frame after
+    ``warm()`` if that frame shows the guess was wrong, so every call
+    returns a frame of its input's length.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_size: int = 512,
+        fft_size: int = 512,
+        threshold_db: float = 6.0,
+        reduction_db: float = 18.0,
+        floor_rise_db: float = 5.0,
+        attack_ms: float = 5.0,
+        release_ms: float = 80.0,
+    ):
+        if fft_size % 2:
+            raise ValueError("fft_size must be even")
+        self._hop = fft_size // 2
+        self._window = np.sqrt(np.hanning(fft_size + 1)[:-1]).astype(np.float32)
+        self._threshold = np.float32(10 ** (threshold_db / 10))
+        self._min_gain = np.float32(10 ** (-reduction_db / 20))
+        hops_per_second = sample_rate / self._hop
+        self._floor_rise = np.float32(10 ** (floor_rise_db / 10 / hops_per_second))
+        self._attack = np.float32(np.exp(-1000 / (attack_ms * hops_per_second)))
+        self._release = np.float32(np.exp(-1000 / (release_ms * hops_per_second)))
+        self._priming = 0 if frame_size % self._hop == 0 else self._hop - 1
+        self.latency_samples = self._hop + self._priming
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the noise floor as well as the queued audio."""
+        self._power: np.ndarray | None = None  # smoothed per-bin power
+        self._floor: np.ndarray | None = None
+        self.warm()
+
+    def warm(self) -> None:
+        """Restart the stream on silence, keeping the learned noise floor.
+
+        The floor describes the room, not the last utterance, so it stays;
+        audio queued from the last time the stage ran is dropped.
+        """
+        self._input = np.zeros(self._hop, dtype=np.float32)  # last hop + samples short of a hop
+        self._tail = np.zeros(self._hop, dtype=np.float32)  # second half of the last window
+        self._gain = np.ones(self._hop + 1, dtype=np.float32)
+        self._out = np.zeros(self._priming, dtype=np.int16)
+        self._fresh = True  # nothing emitted since the stream (re)started
+
+    def process(self, frame: np.ndarray | FrameFeatures, sample_rate: int = 16000) -> np.ndarray:
+        """Suppress noise, return a frame of the same length as int16."""
+        hop = self._hop
+        if self._fresh:
+            self._fresh = False
+            if len(frame) % hop and not self._priming:
+                self._priming = hop - 1
+                self.latency_samples = hop + self._priming
+                self._out = np.zeros(self._priming, dtype=np.int16)
+        audio = np.concatenate((self._input, FrameFeatures.of(frame).float32))
+        hops = (len(audio) - hop) // hop
+        if hops:
+            windows = np.lib.stride_tricks.sliding_window_view(audio[: (hops + 1) * hop], 2 * hop)[::hop]
+            spectrum = np.fft.rfft(windows * self._window, axis=1)
+            power = spectrum.real**2 + spectrum.imag**2
+            spectrum *= self._gains(power.astype(np.float32))
+            blocks = np.fft.irfft(spectrum, axis=1).astype(np.float32) * self._window
+            # Overlap-add: each hop is this window's first half + the previous window's second half
+            tails = np.concatenate((self._tail[None], blocks[:-1, hop:]))
+            clean = (blocks[:, :hop] + tails).reshape(-1)
+            self._tail = blocks[-1, hop:].copy()
+            self._out = np.concatenate(
+                (self._out, np.clip(np.rint(clean * 32768.0), -32768, 32767).astype(np.int16))
+            )
+            self._input = audio[hops * hop :]
+        else:
+            self._input = audio
+        out, self._out = self._out[: len(frame)], self._out[len(frame) :]
+        return out
+
+    def _gains(self, power: np.ndarray) -> np.ndarray:
+        """Smoothed gate gains for a [hops, bins] power array (updates state)."""
+        if self._floor is None:
+            self._power = power[0].copy()
+            self._floor = power[0].copy()
+        gains = np.empty_like(power)
+        # The floor and the time smoothing are recursive, so only this loop runs per hop
+        for i, p in enumerate(power):
+            self._power = 0.5 * self._power + 0.5 * p  # tames the spread of noise-only bins
+            falling = self._power < self._floor
+            self._floor = np.where(
+                falling, 0.9 * self._floor + 0.1 * self._power, self._floor * self._floor_rise
+            )
+            np.maximum(self._floor, 1e-12, out=self._floor)  # ~-120 dBFS
+            target = np.where(self._power > self._floor * self._threshold, np.float32(1.0), self._min_gain)
+            target[1:-1] = 0.25 * target[:-2] + 0.5 * target[1:-1] + 0.25 * target[2:]
+            coef = np.where(target > self._gain, self._attack, self._release)
+            self._gain = coef * self._gain + (1 - coef) * target
+            gains[i] = self._gain
+        return gains
+
+
+def create_noise_suppressor(
+    config: NoiseConfig, sample_rate: int = 16000, frame_size: int = 512
+) -> NoiseSuppressor | SpectralGate:
+    """Build the noise suppression backend selected by ``config.backend``."""
+    if config.backend == "deepfilternet":
+        return NoiseSuppressor(
+            streaming=config.streaming,
+            context_hops=config.context_hops,
+            lookahead_hops=config.lookahead_hops,
+        )
+    if config.backend == "spectral_gate":
+        return SpectralGate(
+            sample_rate=sample_rate,
+            frame_size=frame_size,
+            threshold_db=config.gate_threshold_db,
+            reduction_db=config.gate_reduction_db,
+        )
+    raise ValueError(f"Unknown noise backend: {config.backend!r}")
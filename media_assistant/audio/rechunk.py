@@ -0,0 +1,65 @@
+"""Re-cut the frame stream into each stage's native hop and window."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from media_assistant.audio.ring import RingBuffer
+
+
+@dataclass
+class Chunk:
+    """One stage-sized window of the stream."""
+
+    samples: np.ndarray  # read-only view into the rechunker's ring
+    timestamp: float  # capture time of samples[0]
+
+
+class Rechunker:
+    """Feed a stage ``window``-sample windows every ``hop`` samples.
+
+    Frames of any size are appended to a ring buffer; every window that
+    becomes complete is returned as a zero-copy view of the ring, stamped
+    with the capture time of its first sample (derived from the frame
+    timestamps). Overlapping windows (``window > hop``) share the same
+    samples. Views stay valid until the next ``push``, which may not be
+    longer than ``max_push`` samples.
+    """
+
+    def __init__(
+        self,
+        hop: int,
+        window: int | None = None,
+        sample_rate: int = 16000,
+        max_push: int = 4096,
+    ):
+        self.hop = hop
+        self.window = window or hop
+        if self.window < hop:
+            raise ValueError("window must be at least one hop")
+        self._sample_rate = sample_rate
+        self._max_push = max_push
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop buffered audio; the next window starts with the next push."""
+        self._ring = RingBuffer(self.window + self._max_push, self._sample_rate)
+        self._next_end = self.window  # absolute end of the next window
+        self._anchor = (0, 0.0)  # (position, timestamp) of the last push
+
+    def push(self, samples: np.ndarray, timestamp: float) -> list[Chunk]:
+        """Append one frame captured at ``timestamp``; return completed windows."""
+        if len(samples) > self._max_push:
+            raise ValueError(f"push of {len(samples)} samples exceeds max_push={self._max_push}")
+        self._anchor = (self._ring.write_pos, timestamp)
+        self._ring.write(samples)
+        chunks = []
+        while self._next_end <= self._ring.write_pos:
+            start = self._next_end - self.window
+            chunks.append(Chunk(self._ring.window(start, self.window), self._time(start)))
+            self._next_end += self.hop
+        return chunks
+
+    def _time(self, position: int) -> float:
+        anchor_pos, anchor_time = self._anchor
+        return anchor_time + (position - anchor_pos) / self._sample_rate
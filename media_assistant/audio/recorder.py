@@ -0,0 +1,221 @@
+"""Session recorder — tap the frame stream into memory-mapped segment files.
+
+Each segment is a directory of ``.npy`` files (raw mic, loopback, clean
+audio and per-frame metadata) plus a ``segment.json`` manifest. A session
+directory of segments can be replayed with ``FileAudioCapture``.
+"""
+
+import json
+import logging
+import shutil
+import threading
+from pathlib import Path
+from queue import Queue
+
+import numpy as np
+
+from media_assistant.audio.capture import AudioFrame
+from media_assistant.config import RecorderConfig
+
+logger = logging.getLogger(__name__)
+
+META_DTYPE = np.dtype(
+    [
+        ("timestamp", "f8"),
+        ("state", "u1"),
+        ("wake_score", "f4"),
+        ("vad_prob", "f4"),
+    ]
+)
+
+_CHANNELS = ("mic", "loopback", "clean")
+
+
+class SessionRecorder:
+    """Record frames without blocking the caller.
+
+    ``record`` copies the frame into a preallocated staging slot and hands
+    the slot index to a writer thread. When every slot is taken the frame
+    is dropped and counted in ``dropped_frames`` instead of waiting.
+    The writer fills memory-mapped segments of ``segment_seconds`` each and
+    deletes the oldest once more than ``max_segments`` exist.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: int = 16000,
+        frame_size: int = 512,
+        segment_seconds: float = 60.0,
+        max_segments: int = 30,
+        pending_frames: int = 256,
+        states: list[str] | None = None,
+    ):
+        self._directory = Path(directory)
+        self._sample_rate = sample_rate
+        self._frame_size = frame_size
+        self._segment_frames = max(1, int(segment_seconds * sample_rate / frame_size))
+        self._max_segments = max_segments
+        self._states = list(states or [])
+
+        self._audio = np.zeros((pending_frames, len(_CHANNELS), frame_size), np.int16)
+        self._meta = np.zeros(pending_frames, dtype=META_DTYPE)
+        self._next_slot = 0
+        # One slot is always owned by the writer, so at most n - 1 are queued
+        self._pending: Queue[int | None] = Queue(maxsize=pending_frames - 1)
+
+        self.recorded_frames = 0
+        self.dropped_frames = 0
+
+        self._segment_index = 0
+        self._segment: dict[str, np.memmap] | None = None
+        self._segment_dir: Path | None = None
+        self._segment_pos = 0
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        existing = sorted(self._directory.glob("seg-*"))
+        if existing:
+            self._segment_index = int(existing[-1].name[4:]) + 1
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush pending frames and finalize the current segment."""
+        if self._thread is None:
+            return
+        self._pending.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def record(
+        self,
+        frame: AudioFrame,
+        clean: np.ndarray | None,
+        state: str,
+        wake_score: float = 0.0,
+        vad_prob: float = 0.0,
+    ) -> None:
+        """Queue one frame for writing. Never blocks."""
+        slot = self._next_slot
+        # Single producer: if the queue has room now, put_nowait cannot fail
+        if self._pending.full():
+            self.dropped_frames += 1
+            return
+        audio = self._audio[slot]
+        audio[0] = frame.mic
+        audio[1] = frame.loopback
+        if clean is None:
+            audio[2] = 0
+        else:
+            audio[2] = clean
+        self._meta[slot] = (frame.timestamp, self._state_code(state), wake_score, vad_prob)
+        self._pending.put_nowait(slot)
+        self._next_slot = (slot + 1) % len(self._audio)
+
+    def _state_code(self, state: str) -> int:
+        if state not in self._states:
+            self._states.append(state)
+        return self._states.index(state)
+
+    def _writer(self) -> None:
+        while True:
+            slot = self._pending.get()
+            if slot is None:
+                break
+            if self._segment is None:
+                self._open_segment()
+            pos = self._segment_pos
+            for i, name in enumerate(_CHANNELS):
+                self._segment[name][pos] = self._audio[slot, i]
+            self._segment["meta"][pos] = self._meta[slot]
+            self._segment_pos += 1
+            self.recorded_frames += 1
+            if self._segment_pos == self._segment_frames:
+                self._close_segment()
+        self._close_segment()
+
+    def _open_segment(self) -> None:
+        self._segment_dir = self._directory / f"seg-{self._segment_index:05d}"
+        self._segment_dir.mkdir()
+        shape = (self._segment_frames, self._frame_size)
+        self._segment = {
+            name: np.lib.format.open_memmap(
+                self._segment_dir / f"{name}.npy", mode="w+", dtype=np.int16, shape=shape
+            )
+            for name in _CHANNELS
+        }
+        self._segment["meta"] = np.lib.format.open_memmap(
+            self._segment_dir / "meta.npy",
+            mode="w+",
+            dtype=META_DTYPE,
+            shape=(self._segment_frames,),
+        )
+        self._segment_pos = 0
+        self._segment_index += 1
+
+    def _close_segment(self) -> None:
+        if self._segment is None:
+            return
+        for array in self._segment.values():
+            array.flush()
+        manifest = {
+            "frames": self._segment_pos,
+            "sample_rate": self._sample_rate,
+            "frame_size": self._frame_size,
+            "states": self._states,
+        }
+        (self._segment_dir / "segment.json").write_text(json.dumps(manifest))
+        self._segment = None
+        self._rotate()
+
+    def _rotate(self) -> None:
+        segments = sorted(self._directory.glob("seg-*"))
+        for old in segments[: max(0, len(segments) - self._max_segments)]:
+            shutil.rmtree(old, ignore_errors=True)
+            logger.debug("Removed old recording segment %s", old)
+
+
+def create_session_recorder(
+    config: RecorderConfig, sample_rate: int = 16000, frame_size: int = 512
+) -> SessionRecorder | None:
+    """A recorder for ``config``, or None when recording is disabled."""
+    if not config.enabled:
+        return None
+    return SessionRecorder(
+        config.directory,
+        sample_rate=sample_rate,
+        frame_size=frame_size,
+        segment_seconds=config.segment_seconds,
+        max_segments=config.max_segments,
+    )
+
+
+def load_session(path: str) -> dict[str, np.ndarray]:
+    """Load one segment directory, or every segment of a session directory.
+
+    Returns flat ``mic``, ``loopback`` and ``clean`` sample arrays plus the
+    per-frame ``meta`` records, in recording order. Segments are opened
+    memory-mapped, so only the concatenation is copied.
+    """
+    root = Path(path)
+    segments = [root] if (root / "segment.json").exists() else sorted(root.glob("seg-*"))
+    parts: dict[str, list[np.ndarray]] = {name: [] for name in (*_CHANNELS, "meta")}
+    sample_rate = None
+    for segment in segments:
+        manifest_path = segment / "segment.json"
+        if not manifest_path.exists():
+            continue  # still being written
+        manifest = json.loads(manifest_path.read_text())
+        sample_rate = manifest["sample_rate"]
+        frames = manifest["frames"]
+        for name in _CHANNELS:
+            data = np.load(segment / f"{name}.npy", mmap_mode="r")
+            parts[name].append(data[:frames].reshape(-1))
+        parts["meta"].append(np.load(segment / "meta.npy", mmap_mode="r")[:frames])
+    if sample_rate is None:
+        raise FileNotFoundError(f"No finished recording segments in {path}")
+    session = {name: np.concatenate(arrays) for name, arrays in parts.items()}
+    session["sample_rate"] = np.int64(sample_rate)
+    return session
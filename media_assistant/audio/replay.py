@@ -0,0 +1,254 @@
+"""File-backed and synthetic AudioCapture backends for replay and benchmarks.
+
+These produce the same AudioFrame stream as the WASAPI capture without any
+audio hardware, so every downstream stage can be profiled and
+regression-tested headlessly (e.g. on Linux build hosts).
+"""
+
+import asyncio
+import time
+import wave
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import numpy as np
+
+from media_assistant.audio.capture import AudioFrame, CaptureStats
+from media_assistant.audio.recorder import load_session
+from media_assistant.audio.resample import StreamingResampler
+
+
+class ArrayAudioCapture:
+    """Serve AudioFrames from in-memory mic and loopback arrays.
+
+    With ``realtime=True`` frames are paced at the capture rate; otherwise
+    they are emitted as fast as the consumer reads them. Frames are views
+    into the source arrays, so replay itself allocates nothing per frame.
+    """
+
+    def __init__(
+        self,
+        mic: np.ndarray,
+        loopback: np.ndarray | None = None,
+        sample_rate: int = 16000,
+        frame_size: int = 512,
+        realtime: bool = False,
+        loop: bool = False,
+    ):
+        if loopback is None:
+            loopback = np.zeros_like(mic)
+        length = min(len(mic), len(loopback))
+        self._mic = np.ascontiguousarray(mic[:length], dtype=np.int16)
+        self._loopback = np.ascontiguousarray(loopback[:length], dtype=np.int16)
+        self._sample_rate = sample_rate
+        self._frame_size = frame_size
+        self._realtime = realtime
+        self._loop = loop
+
+        self._running = False
+        self._pos = 0  # next sample to emit
+        self._emitted = 0  # samples emitted since start, across loops
+        self._start_wall = 0.0
+        self._start_mono = 0.0
+        # Frames are pulled on demand, so nothing ever queues up or drops
+        self.stats = CaptureStats()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def drift_ppm(self) -> float:
+        return 0.0
+
+    def start(self) -> None:
+        """Rewind and start serving frames."""
+        self._pos = 0
+        self._emitted = 0
+        self._start_wall = time.time()
+        self._start_mono = time.monotonic()
+        self._running = True
+
+    def stop(self) -> None:
+        self._running = False
+
+    def set_drop_allowed(self, allowed: bool) -> None:
+        """No-op: replay has no queue to bound."""
+
+    def read_frame(self, timeout: float = 1.0) -> AudioFrame | None:
+        """Next frame, or None on timeout (realtime) or end of data."""
+        if self._realtime:
+            wait = self._due_in()
+            if wait > timeout:
+                time.sleep(timeout)
+                return None
+            if wait > 0:
+                time.sleep(wait)
+        return self._next_frame()
+
+    async def frames(self) -> AsyncIterator[AudioFrame]:
+        """Yield frames until the data runs out or capture is stopped.
+
+        Every frame awaits at least ``asyncio.sleep(0)``, so a fast replay
+        still lets other tasks on the loop run between frames.
+        """
+        while self._running:
+            wait = self._due_in() if self._realtime else 0.0
+            await asyncio.sleep(max(wait, 0.0))
+            frame = self._next_frame()
+            if frame is None:
+                return
+            yield frame
+
+    def recent_audio(self, ms: float) -> tuple[np.ndarray, np.ndarray]:
+        """Views of the last ``ms`` milliseconds served."""
+        length = min(int(ms * self._sample_rate / 1000), self._pos)
+        start = self._pos - length
+        return self._mic[start : self._pos], self._loopback[start : self._pos]
+
+    def _due_in(self) -> float:
+        """Seconds until the next frame would have been captured."""
+        due = self._start_mono + (self._emitted + self._frame_size) / self._sample_rate
+        return due - time.monotonic()
+
+    def _next_frame(self) -> AudioFrame | None:
+        if not self._running:
+            return None
+        end = self._pos + self._frame_size
+        if end > len(self._mic):
+            if not self._loop or len(self._mic) < self._frame_size:
+                self._running = False
+                return None
+            self._pos, end = 0, self._frame_size
+        frame = AudioFrame(
+            mic=self._mic[self._pos : end],
+            loopback=self._loopback[self._pos : end],
+            timestamp=self._start_wall + self._emitted / self._sample_rate,
+        )
+        self._pos = end
+        self._emitted += self._frame_size
+        return frame
+
+
+class FileAudioCapture(ArrayAudioCapture):
+    """Replay paired mic/loopback recordings.
+
+    ``mic_path`` may be an ``.npz`` with ``mic`` and ``loopback`` arrays (and
+    optionally ``sample_rate``), a SessionRecorder session or segment
+    directory, or a WAV file with ``loopback_path`` naming the matching
+    loopback WAV. WAV files at other rates or channel counts are
+    converted to mono ``sample_rate`` on load.
+    """
+
+    def __init__(
+        self,
+        mic_path: str,
+        loopback_path: str | None = None,
+        sample_rate: int = 16000,
+        frame_size: int = 512,
+        realtime: bool = False,
+        loop: bool = False,
+    ):
+        if Path(mic_path).is_dir():
+            session = load_session(mic_path)
+            _check_rate(mic_path, int(session["sample_rate"]), sample_rate)
+            mic, loopback = session["mic"], session["loopback"]
+        elif Path(mic_path).suffix == ".npz":
+            mic, loopback = _load_npz(mic_path, sample_rate)
+        else:
+            mic = _load_wav(mic_path, sample_rate)
+            loopback = _load_wav(loopback_path, sample_rate) if loopback_path else None
+        super().__init__(mic, loopback, sample_rate, frame_size, realtime, loop)
+
+
+class SyntheticAudioCapture(ArrayAudioCapture):
+    """Generate a reproducible mic/loopback scene.
+
+    The loopback carries a music-like mix of tones when ``loopback_rms`` is
+    non-zero. The mic hears that playback as a delayed, attenuated echo,
+    plus stationary noise and, optionally, speech-like harmonic bursts
+    (one ``burst_seconds`` burst every ``burst_period`` seconds).
+    """
+
+    def __init__(
+        self,
+        seconds: float = 10.0,
+        sample_rate: int = 16000,
+        frame_size: int = 512,
+        realtime: bool = False,
+        loop: bool = False,
+        noise_rms: float = 30.0,
+        speech_rms: float = 0.0,
+        loopback_rms: float = 0.0,
+        echo_gain: float = 0.5,
+        echo_delay_ms: float = 40.0,
+        burst_seconds: float = 0.8,
+        burst_period: float = 3.0,
+        seed: int = 0,
+    ):
+        rng = np.random.default_rng(seed)
+        n = int(seconds * sample_rate)
+        t = np.arange(n) / sample_rate
+
+        loopback = np.zeros(n)
+        if loopback_rms > 0:
+            for freq in (220.0, 330.0, 440.0, 660.0, 1250.0):
+                loopback += np.sin(2 * np.pi * freq * t + rng.uniform(0, 2 * np.pi))
+            loopback += 0.3 * rng.standard_normal(n)
+            loopback *= loopback_rms / np.sqrt(np.mean(loopback**2))
+
+        mic = noise_rms * rng.standard_normal(n)
+        if speech_rms > 0:
+            pitch = 140.0 * (1 + 0.1 * np.sin(2 * np.pi * 3 * t))
+            phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+            voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+            gate = (t % burst_period) < burst_seconds
+            voice *= gate * speech_rms / np.sqrt(np.mean(voice[gate] ** 2))
+            mic += voice
+        delay = int(echo_delay_ms * sample_rate / 1000)
+        if loopback_rms > 0 and delay < n:
+            mic[delay:] += echo_gain * loopback[: n - delay]
+
+        super().__init__(
+            _to_int16(mic),
+            _to_int16(loopback),
+            sample_rate,
+            frame_size,
+            realtime,
+            loop,
+        )
+
+
+def _to_int16(samples: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
+
+
+def _load_npz(path: str, sample_rate: int) -> tuple[np.ndarray, np.ndarray]:
+    with np.load(path) as data:
+        if "sample_rate" in data:
+            _check_rate(path, int(data["sample_rate"]), sample_rate)
+        return data["mic"].astype(np.int16), data["loopback"].astype(np.int16)
+
+
+def _check_rate(path: str, file_rate: int, sample_rate: int) -> None:
+    if file_rate != sample_rate:
+        raise ValueError(f"{path}: sample rate {file_rate}, expected {sample_rate}")
+
+
+def _load_wav(path: str, sample_rate: int) -> np.ndarray:
+    """Read, downmix and resample a WAV one second at a time.
+
+    The polyphase path builds an outputs x taps matrix per call, so a
+    whole session in one ``process`` call would need gigabytes; the
+    resampler's output does not depend on the chunking.
+    """
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        resampler = StreamingResampler(rate, sample_rate, channels)
+        blocks = []
+        while raw := wav.readframes(rate):
+            blocks.append(resampler.process(np.frombuffer(raw, dtype=np.int16)))
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.int16)
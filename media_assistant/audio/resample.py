@@ -0,0 +1,98 @@
+"""Streaming polyphase resampler for the WASAPI loopback stream."""
+
+from math import ceil, gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class StreamingResampler:
+    """Resample interleaved int16 audio to mono at another rate, block by block.
+
+    Uses a Kaiser-windowed sinc low-pass split into ``up`` polyphase
+    branches, so each output sample costs one short dot product. Filter
+    history and the output phase carry over between ``process`` calls,
+    which makes the result independent of how the input is chunked.
+    Integer decimation (e.g. 48 kHz -> 16 kHz) takes a single-branch path
+    and equal rates only downmix.
+    """
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int,
+        channels: int = 1,
+        zero_crossings: int = 16,
+        rolloff: float = 0.9,
+        kaiser_beta: float = 8.0,
+    ):
+        in_rate, out_rate = int(in_rate), int(out_rate)
+        g = gcd(in_rate, out_rate)
+        self._up = out_rate // g
+        self._down = in_rate // g
+        self._channels = channels
+        self._downmix = np.full(channels, 1.0 / channels, dtype=np.float32)
+
+        # Prototype low-pass at the virtual rate in_rate * up
+        cutoff = 0.5 / max(self._up, self._down) * rolloff
+        taps = ceil(2 * zero_crossings * max(self._up, self._down) / self._up)
+        if self._up == 1:
+            taps = ceil(taps / self._down) * self._down  # see _decimate
+        length = taps * self._up
+        n = np.arange(length) - (length - 1) / 2
+        proto = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, kaiser_beta)
+        proto *= self._up / proto.sum()  # unity DC gain on every branch
+
+        # Branch p holds proto[p::up]; reversed so windows dot directly
+        self._taps = taps
+        self._phases = np.ascontiguousarray(
+            proto.reshape(taps, self._up).T[:, ::-1], dtype=np.float32
+        )
+        self._history = np.zeros(taps - 1, dtype=np.float32)
+        # Virtual-rate position of the next output, relative to history start
+        self._pos = (taps - 1) * self._up
+        self.delay_seconds = (length - 1) / 2 / (in_rate * self._up)
+
+    def reset(self) -> None:
+        """Clear filter history, e.g. after the device restarts."""
+        self._history[:] = 0.0
+        self._pos = (self._taps - 1) * self._up
+
+    def process(self, raw: np.ndarray) -> np.ndarray:
+        """Downmix and resample one block of interleaved int16 samples."""
+        mono = raw.reshape(-1, self._channels) @ self._downmix
+        if self._up == self._down:
+            return np.clip(np.rint(mono), -32768, 32767).astype(np.int16)
+        buf = np.concatenate((self._history, mono))
+
+        count = (len(buf) * self._up - self._pos + self._down - 1) // self._down
+        if count <= 0:
+            out = np.empty(0, dtype=np.float32)
+        elif self._up == 1:
+            first = self._pos - (self._taps - 1)
+            span = (count - 1) * self._down + self._taps
+            out = self._decimate(buf[first : first + span])
+        else:
+            positions = self._pos + np.arange(count) * self._down
+            starts = positions // self._up - (self._taps - 1)
+            rows = sliding_window_view(buf, self._taps)[starts]
+            out = np.einsum("nt,nt->n", rows, self._phases[positions % self._up])
+
+        consumed = len(buf) - (self._taps - 1)
+        self._pos += count * self._down - consumed * self._up
+        self._history = buf[consumed:].copy()
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+    def _decimate(self, segment: np.ndarray) -> np.ndarray:
+        """Filter and keep every ``down``-th sample of ``segment``.
+
+        Splits the segment and the taps into ``down`` interleaved columns,
+        so the work is ``down`` short contiguous correlations instead of
+        one strided matrix product.
+        """
+        columns = segment.reshape(-1, self._down)
+        taps = self._phases[0].reshape(-1, self._down)
+        out = np.correlate(columns[:, 0], taps[:, 0], "valid")
+        for r in range(1, self._down):
+            out += np.correlate(columns[:, r], taps[:, r], "valid")
+        return out
@@ -0,0 +1,103 @@
+"""Fixed-capacity audio ring buffer with zero-copy window reads."""
+
+import numpy as np
+
+
+class RingBuffer:
+    """Single-producer, single-consumer ring buffer of int16 samples.
+
+    Every sample is stored twice, at ``i`` and ``i + capacity``, so any
+    window of up to ``capacity`` samples is one contiguous slice of the
+    backing array and can be returned as a view instead of a copy.
+
+    Positions are absolute sample counts since creation. Views stay valid
+    until the producer writes another ``capacity`` samples over them.
+    """
+
+    def __init__(self, capacity: int, sample_rate: int = 16000, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._capacity = capacity
+        self._sample_rate = sample_rate
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._write_pos = 0  # total samples written
+        self._read_pos = 0  # next unread sample for read()
+        self.overrun_samples = 0  # unread samples overwritten by the producer
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def write_pos(self) -> int:
+        """Absolute index one past the newest sample."""
+        return self._write_pos
+
+    @property
+    def read_pos(self) -> int:
+        """Absolute index of the next sample read() will return."""
+        return self._read_pos
+
+    @property
+    def available(self) -> int:
+        """Number of unread samples still held in the buffer."""
+        return min(self._write_pos - self._read_pos, self._capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append samples. Only the newest ``capacity`` are kept."""
+        n = len(samples)
+        if n == 0:
+            return
+        cap = self._capacity
+        if n > cap:
+            samples = samples[-cap:]
+        start = (self._write_pos + n - len(samples)) % cap
+        m = len(samples)
+        first = min(m, cap - start)
+        self._data[start : start + first] = samples[:first]
+        self._data[start + cap : start + cap + first] = samples[:first]
+        rest = m - first
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[cap : cap + rest] = samples[first:]
+        # Publish only after the data is in place (SPSC hand-off)
+        self._write_pos += n
+
+    def window(self, start: int, length: int) -> np.ndarray:
+        """Read-only view of ``length`` samples starting at absolute ``start``."""
+        oldest = self._write_pos - self._capacity
+        if length < 0 or start < max(oldest, 0) or start + length > self._write_pos:
+            raise IndexError(
+                f"window [{start}, {start + length}) outside "
+                f"[{max(oldest, 0)}, {self._write_pos})"
+            )
+        offset = start % self._capacity
+        view = self._data[offset : offset + length]
+        view.flags.writeable = False
+        return view
+
+    def latest(self, length: int) -> np.ndarray:
+        """View of the newest ``length`` samples."""
+        return self.window(self._write_pos - length, length)
+
+    def last_ms(self, ms: float) -> np.ndarray:
+        """View of the newest ``ms`` milliseconds, clipped to what is held."""
+        length = int(ms * self._sample_rate / 1000)
+        return self.latest(min(length, self._write_pos, self._capacity))
+
+    def read(self, length: int) -> np.ndarray | None:
+        """Consume the next ``length`` unread samples as a view.
+
+        Returns None if fewer than ``length`` samples are available. If the
+        consumer fell more than ``capacity`` behind, the lost samples are
+        skipped and counted in ``overrun_samples``.
+        """
+        oldest = self._write_pos - self._capacity
+        if self._read_pos < oldest:
+            self.overrun_samples += oldest - self._read_pos
+            self._read_pos = oldest
+        if self._write_pos - self._read_pos < length:
+            return None
+        view = self.window(self._read_pos, length)
+        self._read_pos += length
+        return view
@@ -1,27 +1,243 @@
-"""Voice Activity Detection via Silero VAD."""
+"""Voice Activity Detection via Silero VAD (torch or ONNX Runtime)."""
+
+import logging
+import os
+import time
 
 import numpy as np
 
+from media_assistant.audio.features import FrameFeatures
+from media_assistant.audio.gate import EnergyGate
+from media_assistant.config import VADConfig
+from media_assistant.models import resolve_model
+
+logger = logging.getLogger(__name__)
+
+# torch is imported on first use only: the ONNX backend must not pay seconds
+# of import time and hundreds of MB for it
+torch = None  # Mocked in tests on non-Windows
+
 try:
-    import torch
+    import onnxruntime as ort
 except ImportError:
-    torch = None  # type: ignore[assignment]  # Mocked in tests on non-Windows
+    ort = None  # type: ignore[assignment]  # Mocked in tests on non-Windows
 
 
 class VoiceActivityDetector:
-    """Detect speech in audio frames using Silero VAD."""
+    """Detect speech in audio frames using Silero VAD (TorchScript).
+
+    The model is loaded from ``model_path`` (see ``resolve_model``), never
+    from torch.hub. The file and its checksum are verified in the
+    constructor, so a bad cache fails at startup either way; with
+    ``lazy=True`` only importing torch and loading the model wait until
+    ``load()`` or the first ``is_speech``.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        threshold: float = 0.5,
+        sha256: str = "",
+        lazy: bool = False,
+    ):
+        self.threshold = threshold
+        self.last_confidence = 0.0
+        self._model_path = resolve_model(model_path, sha256)
+        self.model = None
+        if not lazy:
+            self.load()
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self) -> None:
+        """Import torch and load the model; no-op once loaded."""
+        if self.model is not None:
+            return
+        t0 = time.perf_counter()
+        _import_torch()
+        self.model = torch.jit.load(self._model_path)
+        self.model.eval()
+        logger.info("Silero VAD (torch) loaded in %.2f s", time.perf_counter() - t0)
+
+    def is_speech(self, frame: np.ndarray | FrameFeatures, sample_rate: int = 16000) -> bool:
+        """Return True if frame contains speech."""
+        self.load()
+        tensor = torch.from_numpy(FrameFeatures.of(frame).float32)
+        self.last_confidence = self.model(tensor, sample_rate).item()
+        return self.last_confidence > self.threshold
+
+    def reset(self) -> None:
+        """Reset internal state between utterances."""
+        if self.model is not None:
+            self.model.reset_states()
+
+
+def _import_torch() -> None:
+    global torch
+    if torch is None:
+        import torch as _torch
+
+        torch = _torch
+
+
+class OnnxVoiceActivityDetector:
+    """Silero VAD on ONNX Runtime, without torch.
 
-    def __init__(self, threshold: float = 0.5):
+    Same ``is_speech``/``reset``/``last_confidence`` API as
+    ``VoiceActivityDetector``. The recurrent state ([2, 1, 128]) is an
+    explicit array threaded through each run, and the session uses one
+    intra-op thread: a 512-sample frame is far too small to gain from a
+    thread pool. Silero v5 expects the last 64 samples of the previous
+    frame in front of each frame; input goes into one preallocated
+    buffer, so a frame costs no allocations besides the model's own.
+    The model is verified at construction and loading can be deferred like
+    ``VoiceActivityDetector``.
+    """
+
+    _CONTEXT = 64  # samples at 16 kHz (32 at 8 kHz)
+
+    def __init__(
+        self,
+        model_path: str,
+        threshold: float = 0.5,
+        sample_rate: int = 16000,
+        frame_size: int = 512,
+        sha256: str = "",
+        lazy: bool = False,
+    ):
         self.threshold = threshold
-        self.model, _ = torch.hub.load("snakers4/silero-vad", "silero_vad")
+        self.last_confidence = 0.0
+        self._model_path = resolve_model(model_path, sha256)
+        self._session = None
+        self._frame_size = frame_size
+        self._context = self._CONTEXT if sample_rate == 16000 else self._CONTEXT // 2
+        self._input = np.zeros((1, self._context + frame_size), dtype=np.float32)
+        self._samples = self._input[0, self._context :]
+        self._sr = np.array(sample_rate, dtype=np.int64)
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        if not lazy:
+            self.load()
+
+    @property
+    def loaded(self) -> bool:
+        return self._session is not None
 
-    def is_speech(self, frame: np.ndarray, sample_rate: int = 16000) -> bool:
+    def load(self) -> None:
+        """Create the inference session; no-op once loaded."""
+        if self._session is not None:
+            return
+        t0 = time.perf_counter()
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(
+            self._model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        logger.info("Silero VAD (onnx) loaded in %.2f s", time.perf_counter() - t0)
+
+    def is_speech(self, frame: np.ndarray | FrameFeatures, sample_rate: int = 16000) -> bool:
         """Return True if frame contains speech."""
-        audio_float = frame.astype(np.float32) / 32768.0
-        tensor = torch.FloatTensor(audio_float)
-        confidence = self.model(tensor, sample_rate)
-        return confidence.item() > self.threshold
+        self.load()
+        if len(frame) != self._frame_size:
+            raise ValueError(f"expected {self._frame_size} samples, got {len(frame)}")
+        # Last frame's tail becomes this frame's context, then the new samples follow
+        self._input[0, : self._context] = self._input[0, -self._context :]
+        if isinstance(frame, FrameFeatures):
+            self._samples[:] = frame.float32
+        else:
+            np.multiply(frame, np.float32(1 / 32768), out=self._samples, casting="unsafe")
+        out, self._state = self._session.run(
+            None, {"input": self._input, "state": self._state, "sr": self._sr}
+        )
+        self.last_confidence = float(out[0, 0])
+        return self.last_confidence > self.threshold
 
     def reset(self) -> None:
         """Reset internal state between utterances."""
-        self.model.reset_states()
+        self._state = np.zeros_like(self._state)
+        self._input[:] = 0.0
+
+
+class GatedVoiceActivityDetector:
+    """Any VAD behind an ``EnergyGate``: the model only sees ambiguous frames.
+
+    Frames the gate rejects are answered as non-speech with confidence 0.0
+    without running the model; ``gate.hit_rate`` is the share of model
+    runs saved.
+    """
+
+    def __init__(self, vad: VoiceActivityDetector | OnnxVoiceActivityDetector, gate: EnergyGate):
+        self.vad = vad
+        self.gate = gate
+        self.last_confidence = 0.0
+
+    def load(self) -> None:
+        self.vad.load()
+
+    def is_speech(self, frame: np.ndarray | FrameFeatures, sample_rate: int = 16000) -> bool:
+        """Return True if frame contains speech."""
+        features = FrameFeatures.of(frame)  # the gate's float32 pass is reused by the model
+        if not self.gate.passes(features):
+            self.last_confidence = 0.0
+            return False
+        speech = self.vad.is_speech(features, sample_rate)
+        self.last_confidence = self.vad.last_confidence
+        return speech
+
+    def reset(self) -> None:
+        """Reset internal state between utterances."""
+        if self.gate.frames:
+            logger.debug(
+                "VAD gate skipped the model on %d of %d frames (%.0f%%)",
+                self.gate.rejected, self.gate.frames, self.gate.hit_rate * 100,
+            )
+        self.gate.reset()
+        self.vad.reset()
+
+
+def create_voice_activity_detector(
+    config: VADConfig, sample_rate: int = 16000, frame_size: int = 512
+) -> VoiceActivityDetector | OnnxVoiceActivityDetector | GatedVoiceActivityDetector:
+    """Build the VAD backend selected by ``config.backend``.
+
+    The model file is ``config.model_file`` (or the backend's default name)
+    inside ``config.cache_dir``. With ``config.energy_gate`` the model is put
+    behind an ``EnergyGate``.
+    """
+    vad = _create_model(config, sample_rate, frame_size)
+    if not config.energy_gate:
+        return vad
+    gate = EnergyGate(
+        sample_rate=sample_rate,
+        frame_size=frame_size,
+        open_db=config.gate_open_db,
+        close_db=config.gate_close_db,
+        hangover_frames=config.gate_hangover_frames,
+    )
+    return GatedVoiceActivityDetector(vad, gate)
+
+
+def _create_model(
+    config: VADConfig, sample_rate: int, frame_size: int
+) -> VoiceActivityDetector | OnnxVoiceActivityDetector:
+    if config.backend == "torch":
+        return VoiceActivityDetector(
+            os.path.join(config.cache_dir, config.model_file or "silero_vad.jit"),
+            threshold=config.threshold,
+            sha256=config.sha256,
+            lazy=config.lazy_load,
+        )
+    if config.backend == "onnx":
+        return OnnxVoiceActivityDetector(
+            os.path.join(config.cache_dir, config.model_file or "silero_vad.onnx"),
+            threshold=config.threshold,
+            sample_rate=sample_rate,
+            frame_size=frame_size,
+            sha256=config.sha256,
+            lazy=config.lazy_load,
+        )
+    raise ValueError(f"Unknown VAD backend: {config.backend!r}")
@@ -8,6 +8,15 @@ class AudioConfig:
     sample_rate: int = 16000
     frame_size: int = 512
     mic_device: str | None = None  # None = default
+    drift_compensation: bool = True  # align loopback to mic capture clock
+    max_queued_frames: int = 32  # soft bound on frames waiting for the orchestrator
+    drop_states: list[str] = field(default_factory=lambda: ["idle"])  # may drop oldest
+    backend: str = "wasapi"  # wasapi | file | synthetic
+    replay_path: str | None = None  # .npz, or mic WAV for backend=file
+    replay_loopback_path: str | None = None  # loopback WAV for backend=file
+    replay_realtime: bool = True  # pace replay at capture rate
+    separate_process: bool = False  # capture in its own process, frames over shared memory
+    bus_slots: int = 256  # frames held on the shared-memory bus (~8 s at 512)
 
 
 @dataclass
@@ -15,13 +24,54 @@ class AECConfig:
     enabled: bool = True
     filter_length: int = 1024
     auto_mute_factor: float = 0.1  # reduce to 10% on wake
+    bypass_silence: bool = True  # skip the filter while the loopback is silent
+    silence_rms: float = 1.0  # loopback RMS below this counts as silence
+    delay_estimation: bool = False  # align loopback to the echo path (GCC-PHAT)
+    max_delay_ms: float = 250.0  # longest echo-path delay searched
+    delay_history_seconds: float = 4.0  # audio correlated per estimate
+    delay_interval_seconds: float = 2.0  # time between estimates
+    delay_margin_ms: float = 4.0  # filter slack kept ahead of the estimated delay
+
+
+@dataclass
+class NoiseConfig:
+    backend: str = "deepfilternet"  # or "spectral_gate" (numpy, for small always-on boxes)
+    streaming: bool = False  # keep STFT/model context across frames (fixed latency)
+    context_hops: int = 4  # 10 ms spectral frames re-run as model context (model work grows with it)
+    lookahead_hops: int = 2  # hops held back until the model has seen their future
+    gate_threshold_db: float = 6.0  # spectral_gate: bins this far above the noise floor pass
+    gate_reduction_db: float = 18.0  # spectral_gate: attenuation of gated bins
+
+
+@dataclass
+class VADConfig:
+    backend: str = "torch"  # or "onnx" (onnxruntime, no torch import)
+    threshold: float = 0.5
+    cache_dir: str = "models"  # local model cache; nothing is downloaded at runtime
+    model_file: str = ""  # "" = silero_vad.jit (torch) / silero_vad.onnx (onnx)
+    sha256: str = ""  # expected checksum of the model file; "" = not verified
+    lazy_load: bool = True  # load on the first LISTENING transition, not at startup
+    energy_gate: bool = True  # skip the model on frames that are plainly silence
+    gate_open_db: float = 9.0  # RMS above the noise floor that opens the gate
+    gate_close_db: float = 5.0  # an open gate stays open down to this
+    gate_hangover_frames: int = 8  # frames kept open after the energy drops
 
 
 @dataclass
 class WakeWordConfig:
     model_path: str = "media_assistant/wakeword/models/jarvis.onnx"
+    extra_model_paths: list[str] = field(default_factory=list)  # more words, same front-end
+    energy_gate: bool = True  # skip the model on plainly silent hops in IDLE
+    gate_replay_seconds: float = 1.5  # audio re-fed to the model when the gate reopens
     threshold: float = 0.8
     energy_ratio_threshold: float = 1.5
+    preroll_seconds: float = 0.8  # clean IDLE audio kept for the utterance start; 0 = off
+    preroll_onset: float = 0.5  # fraction of threshold marking the end of the wake word
+    score_window_hops: int = 1  # 80 ms hops averaged (or maxed) before peak picking
+    score_smoothing: str = "mean"  # mean | max
+    refractory_seconds: float = 2.0  # no new activation this long after one or after returning to IDLE
+    coherence_window_seconds: float = 1.5  # mic/loopback coherence check window; 0 = off
+    max_echo_fraction: float = 0.6  # reject if playback explains more than this share of the wake word segments
 
 
 @dataclass
@@ -40,13 +90,36 @@ class LLMFallbackConfig:
     model: str = "qwen3:4b"
 
 
+@dataclass
+class RecorderConfig:
+    enabled: bool = False
+    directory: str = "recordings"
+    segment_seconds: float = 60.0
+    max_segments: int = 30  # oldest segments are deleted beyond this
+
+
+@dataclass
+class PipelineConfig:
+    """DSP stages ("aec", "noise") run on each frame, per orchestrator state."""
+
+    idle: list[str] = field(default_factory=lambda: ["aec"])  # wake word only
+    listening: list[str] = field(default_factory=lambda: ["aec", "noise"])
+    processing: list[str] = field(default_factory=list)  # frames are ignored
+    responding: list[str] = field(default_factory=list)
+    confirming: list[str] = field(default_factory=lambda: ["aec", "noise"])
+
+
 @dataclass
 class MediaAssistantConfig:
     audio: AudioConfig = field(default_factory=AudioConfig)
     aec: AECConfig = field(default_factory=AECConfig)
+    noise: NoiseConfig = field(default_factory=NoiseConfig)
+    vad: VADConfig = field(default_factory=VADConfig)
     wake_word: WakeWordConfig = field(default_factory=WakeWordConfig)
     stt: STTConfig = field(default_factory=STTConfig)
     llm_fallback: LLMFallbackConfig = field(default_factory=LLMFallbackConfig)
+    recorder: RecorderConfig = field(default_factory=RecorderConfig)
+    pipeline: PipelineConfig = field(default_factory=PipelineConfig)
     browser_cdp_url: str = "http://localhost:9222"
 
 
@@ -0,0 +1,43 @@
+"""Local model cache: resolve model files offline and verify their checksums."""
+
+import hashlib
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_model(path: str | Path, sha256: str = "") -> str:
+    """Return ``path`` once the model file is known to exist and match ``sha256``.
+
+    Nothing is downloaded: a missing file raises ``FileNotFoundError``
+    naming where to put it, so an offline machine fails fast with a clear
+    message instead of hanging on the network. An empty ``sha256`` skips
+    verification; a mismatch raises ``ValueError``.
+    """
+    path = Path(path)
+    if not path.is_file():
+        raise FileNotFoundError(f"Model not found in cache: place it at {path}")
+    if sha256:
+        actual = file_sha256(path)
+        if actual != sha256.lower():
+            raise ValueError(f"{path}: sha256 {actual} does not match expected {sha256}")
+    else:
+        logger.info("No checksum configured for %s, loading unverified", path)
+    return str(path)
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m media_assistant.models FILE...: print checksums for the config
+    for arg in sys.argv[1:]:
+        print(f"{file_sha256(arg)}  {arg}")
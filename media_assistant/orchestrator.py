@@ -1,6 +1,5 @@
 """Orchestrator — state machine connecting all media assistant components."""
 
-import asyncio
 import logging
 from enum import Enum
 
@@ -8,9 +7,19 @@ import numpy as np
 
 from media_assistant.audio.capture import AudioCapture, AudioFrame
 from media_assistant.audio.aec import EchoCanceller
-from media_assistant.audio.noise import NoiseSuppressor
-from media_assistant.audio.vad import VoiceActivityDetector
+from media_assistant.audio.features import FrameFeatures
+from media_assistant.audio.noise import NoiseSuppressor, SpectralGate
+from media_assistant.audio.rechunk import Rechunker
+from media_assistant.audio.recorder import SessionRecorder
+from media_assistant.audio.vad import (
+    GatedVoiceActivityDetector,
+    OnnxVoiceActivityDetector,
+    VoiceActivityDetector,
+)
+from media_assistant.config import AudioConfig, PipelineConfig
 from media_assistant.wakeword.detector import WakeWordDetector
+from media_assistant.wakeword.preroll import PreRollBuffer
+from media_assistant.wakeword.scorer import WakeScorer
 from media_assistant.wakeword.verifier import WakeWordVerifier
 from media_assistant.stt.router import STTRouter
 from media_assistant.intents.types import Intent, IntentType
@@ -51,13 +60,57 @@ class State(Enum):
     CONFIRMING = "confirming"
 
 
+_STAGES = ("aec", "noise")
+
+# DSP stages run per state: IDLE only feeds the wake word model
+DEFAULT_PIPELINE: dict[State, tuple[str, ...]] = {
+    State.IDLE: ("aec",),
+    State.LISTENING: ("aec", "noise"),
+    State.PROCESSING: (),
+    State.RESPONDING: (),
+    State.CONFIRMING: ("aec", "noise"),
+}
+
+
+def pipeline_from_config(config: PipelineConfig) -> dict[State, tuple[str, ...]]:
+    """Per-state stage tuples from config; unknown stage names raise ValueError."""
+    pipeline = {}
+    for state in State:
+        stages = tuple(getattr(config, state.value))
+        unknown = set(stages) - set(_STAGES)
+        if unknown:
+            raise ValueError(f"Unknown pipeline stage(s) for {state.value}: {sorted(unknown)}")
+        pipeline[state] = stages
+    return pipeline
+
+
+def drop_states_from_config(config: AudioConfig) -> frozenset[State]:
+    """States named in ``audio.drop_states``; unknown names raise ValueError."""
+    names = {state.value: state for state in State}
+    unknown = set(config.drop_states) - set(names)
+    if unknown:
+        raise ValueError(f"Unknown drop state(s): {sorted(unknown)}")
+    return frozenset(names[name] for name in config.drop_states)
+
+
+def _chunker_for(stage: object, frame_size: int, sample_rate: int) -> Rechunker | None:
+    """A Rechunker if ``stage`` declares a native ``hop``/``window`` other than the frame."""
+    hop = getattr(stage, "hop", None)
+    if not isinstance(hop, int):
+        return None
+    window = getattr(stage, "window", hop)
+    if hop == window == frame_size:
+        return None
+    return Rechunker(hop, window, sample_rate, max_push=4 * frame_size)
+
+
 class Orchestrator:
     def __init__(
         self,
         audio: AudioCapture,
         aec: EchoCanceller,
-        noise: NoiseSuppressor,
-        vad: VoiceActivityDetector,
+        noise: NoiseSuppressor | SpectralGate,
+        vad: VoiceActivityDetector | OnnxVoiceActivityDetector | GatedVoiceActivityDetector,
         wake_word: WakeWordDetector,
         wake_verifier: WakeWordVerifier,
         stt_router: STTRouter,
@@ -68,6 +121,11 @@ class Orchestrator:
         max_listen_seconds: float = 5.0,
         frame_size: int = 512,
         sample_rate: int = 16000,
+        recorder: SessionRecorder | None = None,
+        drop_states: frozenset[State] = frozenset({State.IDLE}),
+        preroll: PreRollBuffer | None = None,
+        pipeline: dict[State, tuple[str, ...]] | None = None,
+        wake_scorer: WakeScorer | None = None,
     ):
         self.state = State.IDLE
 
@@ -82,6 +140,12 @@ class Orchestrator:
         self.llm_fallback = llm_fallback
         self.media = media
         self.feedback = feedback
+        self.recorder = recorder
+        self.preroll = preroll
+        self.wake_scorer = wake_scorer
+        # States where the capture queue may shed its oldest frames
+        self._drop_states = drop_states
+        self._pipeline = pipeline if pipeline is not None else DEFAULT_PIPELINE
 
         self._config_max_listen_seconds = max_listen_seconds
         self._config_frame_size = frame_size
@@ -91,43 +155,126 @@ class Orchestrator:
         self._speech_buffer: list[np.ndarray] = []
         self._silence_frames: int = 0
         self._pending_intent: Intent | None = None
+        self._last_wake_score: float = 0.0
+        self._wake_chunker = _chunker_for(wake_word, frame_size, sample_rate)
+        self._wake_fired = False  # the scorer activated on the current frame
+        self._last_vad_prob: float = 0.0
 
     async def run(self) -> None:
         """Main event loop."""
         self.audio.start()
+        self.aec.start()
+        if self.recorder is not None:
+            self.recorder.start()
         try:
-            while True:
-                frame = self.audio.read_frame()
-                if frame is None:
-                    await asyncio.sleep(0.01)
-                    continue
+            async for frame in self.audio.frames():
                 await self._process_frame(frame)
         finally:
             self.audio.stop()
+            self.aec.stop()
+            if self.recorder is not None:
+                self.recorder.stop()
+
+    def _set_state(self, state: State) -> None:
+        """Switch state, apply its capture drop policy and warm newly needed stages."""
+        previous, self.state = self.state, state
+        self.audio.set_drop_allowed(state in self._drop_states)
+        if state in (State.LISTENING, State.CONFIRMING):
+            self.vad.load()  # deferred VAD loads here once; a no-op afterwards
+            self.vad.reset()  # each utterance starts from clean recurrent/gate state
+        if state == State.IDLE:
+            # openwakeword's rolling features still hold the last wake word
+            self.wake_word.reset()
+            if self._wake_chunker is not None:
+                # Do not score (or hold a score from) audio from before the last wake
+                self._wake_chunker.reset()
+                self._last_wake_score = 0.0
+            if self.wake_scorer is not None:
+                self.wake_scorer.reset()
+        for name in self._pipeline[state]:
+            if name not in self._pipeline[previous]:
+                self._stage(name).warm()
+
+    def _stage(self, name: str) -> EchoCanceller | NoiseSuppressor | SpectralGate:
+        return self.aec if name == "aec" else self.noise
+
+    def _run_pipeline(self, frame: AudioFrame) -> np.ndarray:
+        """Run the current state's DSP stages over the mic signal."""
+        clean = frame.mic
+        for name in self._pipeline[self.state]:
+            if name == "aec":
+                clean = self.aec.process(clean, frame.loopback)
+            else:
+                clean = self.noise.process(clean)
+        return clean
 
     async def _process_frame(self, frame: AudioFrame) -> None:
-        clean = self.aec.process(frame.mic, frame.loopback)
-        clean = self.noise.process(clean)
+        clean = self._run_pipeline(frame)
+        state = self.state
 
-        if self.state == State.IDLE:
+        if state == State.IDLE:
             await self._handle_idle(clean, frame)
-        elif self.state == State.LISTENING:
+        elif state == State.LISTENING:
             await self._handle_listening(clean)
-        elif self.state == State.CONFIRMING:
+        elif state == State.CONFIRMING:
             await self._handle_confirming(clean)
 
-    async def _handle_idle(self, clean: np.ndarray, frame: AudioFrame) -> None:
-        confidence = self.wake_word.process_frame(clean)
-        mic_energy = float(np.sqrt(np.mean(frame.mic.astype(float) ** 2)))
-        loopback_energy = float(np.sqrt(np.mean(frame.loopback.astype(float) ** 2)))
+        if self.recorder is not None:
+            self.recorder.record(
+                frame, clean, state.value, self._last_wake_score, self._last_vad_prob
+            )
 
-        if self.wake_verifier.verify(mic_energy, loopback_energy, confidence):
+    async def _handle_idle(self, clean: np.ndarray, frame: AudioFrame) -> None:
+        confidence = self._wake_score(clean, frame.timestamp)
+        if self.preroll is not None:
+            self.preroll.push(clean, confidence)
+        if self.wake_scorer is not None:
+            if not self._wake_fired:
+                return
+            confidence = self.wake_scorer.peak  # verify the activation, not this hop's score
+        if (
+            self.wake_verifier.verify_frame(FrameFeatures(frame.mic, frame.loopback), confidence)
+            and self._verify_not_echo()
+        ):
+            logger.info("Wake word %r (%.2f)", self.wake_word.last_word, confidence)
             self.feedback.play_wake()
             self._auto_mute()
-            self.state = State.LISTENING
-            self._speech_buffer = []
+            self._set_state(State.LISTENING)
+            # Start the utterance with whatever was said after the wake word
+            self._speech_buffer = self.preroll.take() if self.preroll is not None else []
             self._silence_frames = 0
 
+    def _verify_not_echo(self) -> bool:
+        """Coherence stage of wake verification, over the recent raw capture."""
+        window_ms = self.wake_verifier.coherence_window_ms
+        if not window_ms:
+            return True
+        mic, loopback = self.audio.recent_audio(window_ms)
+        if self.wake_verifier.verify_coherence(mic, loopback):
+            return True
+        logger.info("Wake word rejected: mic coherent with playback")
+        return False
+
+    def _wake_score(self, clean: np.ndarray, timestamp: float) -> float:
+        """Wake word score for this frame.
+
+        With a rechunker the model runs once per completed native chunk and
+        its score holds for the frames until the next one. Each new score
+        also goes to the wake scorer, which sets ``_wake_fired``.
+        """
+        self._wake_fired = False
+        if self._wake_chunker is None:
+            self._observe_wake_score(self.wake_word.process_frame(clean), timestamp)
+        else:
+            for chunk in self._wake_chunker.push(clean, timestamp):
+                self._observe_wake_score(self.wake_word.process_frame(chunk.samples), chunk.timestamp)
+        return self._last_wake_score
+
+    def _observe_wake_score(self, score: float, timestamp: float) -> None:
+        self._last_wake_score = score
+        if self.wake_scorer is not None and self.wake_scorer.push(score, timestamp):
+            self._wake_fired = True
+
     async def _handle_listening(self, clean: np.ndarray) -> None:
         self._speech_buffer.append(clean)
 
@@ -135,12 +282,13 @@ class Orchestrator:
             self._silence_frames = 0
         else:
             self._silence_frames += 1
+        self._last_vad_prob = self.vad.last_confidence
 
         total_seconds = (
             len(self._speech_buffer) * self._config_frame_size / self._config_sample_rate
         )
         if self._silence_frames > _SILENCE_THRESHOLD or total_seconds > self._config_max_listen_seconds:
-            self.state = State.PROCESSING
+            self._set_state(State.PROCESSING)
             audio = np.concatenate(self._speech_buffer)
             text = self.stt_router.transcribe(audio, context="general")
             await self._route_intent(text)
@@ -152,6 +300,7 @@ class Orchestrator:
             self._silence_frames = 0
         else:
             self._silence_frames += 1
+        self._last_vad_prob = self.vad.last_confidence
 
         if self._silence_frames > _SILENCE_THRESHOLD:
             audio = np.concatenate(self._speech_buffer)
@@ -163,7 +312,7 @@ class Orchestrator:
             # Any other response (including "нет") → return to idle
             self._pending_intent = None
             self._auto_unmute()
-            self.state = State.IDLE
+            self._set_state(State.IDLE)
 
     async def _route_intent(self, text: str) -> None:
         self.feedback.play_searching()
@@ -172,13 +321,13 @@ class Orchestrator:
         if intent.type == IntentType.UNKNOWN and self.llm_fallback.is_available():
             intent = self.llm_fallback.route(text)
 
-        self.state = State.RESPONDING
+        self._set_state(State.RESPONDING)
         await self._execute_intent(intent)
 
         # Return to idle unless waiting for confirmation
         if self.state != State.CONFIRMING:
             self._auto_unmute()
-            self.state = State.IDLE
+            self._set_state(State.IDLE)
 
     async def _execute_intent(self, intent: Intent) -> None:
         match intent.type:
@@ -203,12 +352,12 @@ class Orchestrator:
             case IntentType.PREV_TRACK:
                 prev_track()
             case IntentType.SHUTDOWN:
-                self.state = State.CONFIRMING
+                self._set_state(State.CONFIRMING)
                 self._pending_intent = intent
                 self._speech_buffer = []
                 self._silence_frames = 0
             case IntentType.REBOOT:
-                self.state = State.CONFIRMING
+                self._set_state(State.CONFIRMING)
                 self._pending_intent = intent
                 self._speech_buffer = []
                 self._silence_frames = 0
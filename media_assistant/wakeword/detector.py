@@ -2,6 +2,10 @@
 
 import numpy as np
 
+from media_assistant.audio.gate import EnergyGate
+from media_assistant.audio.ring import RingBuffer
+from media_assistant.config import WakeWordConfig
+
 try:
     import openwakeword
 except ImportError:
@@ -9,21 +13,89 @@ except ImportError:
 
 
 class WakeWordDetector:
-    """Detect wake word in audio frames using OpenWakeWord."""
+    """Detect one or more wake words in audio frames using OpenWakeWord.
+
+    All wake word models live in a single ``openwakeword.Model``, so the
+    melspectrogram and speech embedding front-end runs once per hop and only
+    the small classifier head is added per word. ``last_word`` names the
+    word with the highest score on the last frame and ``last_scores`` holds
+    every word's score.
+
+    With a ``gate`` the model only runs on frames the ``EnergyGate`` passes;
+    skipped frames score 0.0. openwakeword keeps a rolling melspectrogram and
+    embedding history, so feeding it again after a gap would mix audio from
+    before and after the gap. Instead, when the gate reopens the model is
+    reset and re-fed the last ``replay_seconds`` of audio (gated or not),
+    which rebuilds its state from contiguous audio, wake word onset included.
+    The replay never reaches back past the last ``reset()``, so a wake word
+    that was already acted on is not scored again.
+    """
+
+    hop = 1280  # openwakeword scores 80 ms chunks; the orchestrator rechunks to this
 
-    def __init__(self, model_path: str, threshold: float = 0.8):
-        self.model = openwakeword.Model(wakeword_models=[model_path])
+    def __init__(
+        self,
+        model_path: str | list[str],
+        threshold: float = 0.8,
+        gate: EnergyGate | None = None,
+        replay_seconds: float = 1.5,
+        sample_rate: int = 16000,
+    ):
+        model_paths = [model_path] if isinstance(model_path, str) else list(model_path)
+        self.model = openwakeword.Model(wakeword_models=model_paths)
         self.threshold = threshold
+        self.gate = gate
+        self.last_word: str | None = None
+        self.last_scores: dict[str, float] = {}
+        self.replays = 0  # gate reopenings that rebuilt the model state
+        self._history = RingBuffer(max(self.hop, int(replay_seconds * sample_rate)), sample_rate)
+        self._history_start = 0  # write position of the last reset
+        self._skipping = False
 
     def process_frame(self, frame: np.ndarray) -> float:
-        """Return confidence score for wake word in frame (0.0-1.0)."""
-        scores = self.model.predict(frame)
-        return max(scores.values())
+        """Return the highest wake word confidence in frame (0.0-1.0)."""
+        if self.gate is None:
+            return self._predict(frame)
+        self._history.write(frame)
+        if not self.gate.passes(frame):
+            self._skipping = True
+            self.last_scores = dict.fromkeys(self.last_scores, 0.0)
+            return 0.0
+        if self._skipping:
+            self._skipping = False
+            self.replays += 1
+            self.model.reset()
+            held = min(self._history.write_pos - self._history_start, self._history.capacity)
+            return self._predict(self._history.latest(held - held % self.hop))
+        return self._predict(frame)
+
+    def _predict(self, audio: np.ndarray) -> float:
+        self.last_scores = self.model.predict(audio)
+        self.last_word = max(self.last_scores, key=self.last_scores.get)
+        return float(self.last_scores[self.last_word])
 
     def detected(self, frame: np.ndarray) -> bool:
         """Return True if wake word detected above threshold."""
         return self.process_frame(frame) >= self.threshold
 
     def reset(self) -> None:
-        """Reset detector state."""
+        """Reset detector state, forgetting the audio held for replay."""
         self.model.reset()
+        self._history_start = self._history.write_pos
+        self._skipping = False
+        if self.gate is not None:
+            self.gate.reset()
+
+
+def create_wake_word_detector(config: WakeWordConfig, sample_rate: int = 16000) -> WakeWordDetector:
+    """One detector bank for ``config.model_path`` plus ``config.extra_model_paths``."""
+    gate = None
+    if config.energy_gate:
+        gate = EnergyGate(sample_rate=sample_rate, frame_size=WakeWordDetector.hop)
+    return WakeWordDetector(
+        [config.model_path, *config.extra_model_paths],
+        config.threshold,
+        gate=gate,
+        replay_seconds=config.gate_replay_seconds,
+        sample_rate=sample_rate,
+    )
@@ -0,0 +1,84 @@
+"""Pre-roll buffer — keep recent IDLE audio so speech right after the wake word is kept."""
+
+import numpy as np
+
+from media_assistant.config import WakeWordConfig
+
+
+class PreRollBuffer:
+    """Ring of the last ``seconds`` of clean frames and their wake-word scores.
+
+    The wake-word score rises while the word is being spoken and crosses
+    the detection threshold a few hundred milliseconds after it ends. On
+    detection, ``take`` returns only the frames after the point where the
+    current run of scores first reached ``onset_score`` — roughly where the
+    wake word ends — so the word itself is trimmed and the speech that
+    followed it during detection latency is kept.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        onset_score: float,
+        frame_size: int = 512,
+        sample_rate: int = 16000,
+    ):
+        self._capacity = max(1, int(seconds * sample_rate / frame_size))
+        self._onset = onset_score
+        self._frames = np.zeros((self._capacity, frame_size), dtype=np.int16)
+        self._scores = np.zeros(self._capacity, dtype=np.float32)
+        self._count = 0  # total frames pushed since the last clear
+
+    def __len__(self) -> int:
+        return min(self._count, self._capacity)
+
+    def push(self, clean: np.ndarray, score: float) -> None:
+        """Store one frame (copied) and the wake score it produced."""
+        slot = self._count % self._capacity
+        self._frames[slot] = clean
+        self._scores[slot] = score
+        self._count += 1
+
+    def take(self) -> list[np.ndarray]:
+        """Frames that followed the wake word, oldest first; clears the buffer.
+
+        Trailing frames below the onset are skipped first: a peak-picking
+        scorer fires on the hop after the peak, when the score has already
+        fallen. From the newest frame at or above the onset the run is then
+        walked back, and the frames after the first one in that run are
+        returned.
+        """
+        held = len(self)
+        order = (np.arange(self._count - held, self._count)) % self._capacity
+        scores = self._scores[order]
+
+        first = held
+        while first > 0 and scores[first - 1] < self._onset:
+            first -= 1
+        while first > 0 and scores[first - 1] >= self._onset:
+            first -= 1
+        # A run reaching back to the oldest frame means the onset is out of
+        # the window, so the whole window may still be wake word; no run at
+        # all means the same
+        if first == 0:
+            first = held
+        head = [self._frames[slot].copy() for slot in order[first + 1 :]]
+        self.clear()
+        return head
+
+    def clear(self) -> None:
+        self._count = 0
+
+
+def create_preroll(
+    config: WakeWordConfig, sample_rate: int = 16000, frame_size: int = 512
+) -> PreRollBuffer | None:
+    """A pre-roll buffer for ``config``, or None when ``preroll_seconds`` is 0."""
+    if config.preroll_seconds <= 0:
+        return None
+    return PreRollBuffer(
+        config.preroll_seconds,
+        onset_score=config.preroll_onset * config.threshold,
+        frame_size=frame_size,
+        sample_rate=sample_rate,
+    )
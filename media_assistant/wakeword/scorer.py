@@ -0,0 +1,106 @@
+"""Temporal wake word scoring — smoothing, peak picking and a refractory period."""
+
+import numpy as np
+
+from media_assistant.config import WakeWordConfig
+
+
+class WakeScorer:
+    """Turn a stream of per-hop wake word scores into single activations.
+
+    Each score is smoothed with the mean (or max) of the last
+    ``window_hops`` scores. An activation fires on a local peak of the
+    smoothed score at or above ``threshold``: the hop before the current
+    one, once the current hop is lower, so each utterance fires once at its
+    best point, one hop late. After an activation nothing fires for
+    ``refractory_seconds`` of stream time, and ``reset`` (called on
+    re-entering IDLE) restarts that period from the next hop, so neither the
+    tail of the same word nor a command that outlasts the period can trigger
+    again once the command completes.
+
+    The last ``history_hops`` (timestamp, raw, smoothed, fired) rows are
+    kept for tuning; see ``history``.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        window_hops: int = 1,
+        mode: str = "mean",
+        refractory_seconds: float = 2.0,
+        history_hops: int = 1500,
+    ):
+        if mode not in ("mean", "max"):
+            raise ValueError(f"Unknown smoothing mode: {mode!r}")
+        self.threshold = threshold
+        self._window = np.zeros(max(1, window_hops), dtype=np.float32)
+        self._reduce = np.mean if mode == "mean" else np.max
+        self._refractory = refractory_seconds
+        self._history = np.zeros((history_hops, 4))
+        self._count = 0  # hops pushed in total
+        self._blocked_until = float("-inf")
+        self.peak = 0.0  # smoothed score of the last activation
+        self._clear_window()
+        self._rearm = False  # restart the refractory period on the next hop
+
+    def reset(self) -> None:
+        """Forget the smoothing window and restart the refractory period.
+
+        Called on re-entering IDLE: the refractory period then runs from the
+        first hop pushed after the reset, however long the command took.
+        The history is kept.
+        """
+        self._clear_window()
+        self._rearm = True
+
+    def _clear_window(self) -> None:
+        self._window[:] = 0.0
+        self._filled = 0
+        self._previous = (0.0, 0.0)  # smoothed score and timestamp of the last hop
+        self._rising = False
+
+    def push(self, score: float, timestamp: float) -> bool:
+        """Add one hop's score; True if an activation fires on it."""
+        if self._rearm:
+            self._rearm = False
+            self._blocked_until = max(self._blocked_until, timestamp + self._refractory)
+        self._window[self._filled % len(self._window)] = score
+        self._filled += 1
+        smoothed = float(self._reduce(self._window[: min(self._filled, len(self._window))]))
+
+        previous, previous_time = self._previous
+        fired = (
+            self._rising
+            and previous >= self.threshold
+            and smoothed < previous
+            and previous_time >= self._blocked_until
+        )
+        if fired:
+            self.peak = previous
+            self._blocked_until = previous_time + self._refractory
+        self._rising = smoothed > previous or (self._rising and smoothed == previous)
+        self._previous = (smoothed, timestamp)
+
+        self._history[self._count % len(self._history)] = (timestamp, score, smoothed, fired)
+        self._count += 1
+        return fired
+
+    def history(self) -> dict[str, np.ndarray]:
+        """The kept score time series, oldest first."""
+        held = min(self._count, len(self._history))
+        rows = self._history[(np.arange(self._count - held, self._count)) % len(self._history)]
+        return {
+            "timestamp": rows[:, 0],
+            "raw": rows[:, 1],
+            "smoothed": rows[:, 2],
+            "fired": rows[:, 3].astype(bool),
+        }
+
+
+def create_wake_scorer(config: WakeWordConfig) -> WakeScorer:
+    return WakeScorer(
+        threshold=config.threshold,
+        window_hops=config.score_window_hops,
+        mode=config.score_smoothing,
+        refractory_seconds=config.refractory_seconds,
+    )
@@ -1,16 +1,34 @@
-"""Wake word verification — energy-based false positive rejection."""
+"""Wake word verification — energy and coherence based false positive rejection."""
+
+import numpy as np
+
+from media_assistant.audio.delay import gcc_phat
+from media_assistant.audio.features import FrameFeatures
+from media_assistant.config import WakeWordConfig
 
 
 class WakeWordVerifier:
-    """Verify wake word is from a real person, not from speakers."""
+    """Verify wake word is from a real person, not from speakers.
+
+    The cheap energy ratio check (``verify_frame``) runs first. With a
+    ``coherence`` verifier, activations that pass it are also checked
+    against the loopback over the wake window (``verify_coherence``).
+    """
 
     def __init__(
         self,
         energy_ratio_threshold: float = 1.5,
         confidence_threshold: float = 0.8,
+        coherence: "CoherenceVerifier | None" = None,
     ):
         self.energy_ratio_threshold = energy_ratio_threshold
         self.confidence_threshold = confidence_threshold
+        self.coherence = coherence
+
+    @property
+    def coherence_window_ms(self) -> float:
+        """Audio ``verify_coherence`` wants, in ms; 0 when the check is off."""
+        return self.coherence.window_seconds * 1000 if self.coherence is not None else 0.0
 
     def verify(
         self, mic_energy: float, loopback_energy: float, oww_confidence: float
@@ -25,3 +43,100 @@ class WakeWordVerifier:
             oww_confidence >= self.confidence_threshold
             and energy_ratio >= self.energy_ratio_threshold
         )
+
+    def verify_frame(self, features: FrameFeatures, oww_confidence: float) -> bool:
+        """``verify`` for a raw mic frame with its loopback as the reference."""
+        return (
+            oww_confidence >= self.confidence_threshold
+            and features.energy_ratio >= self.energy_ratio_threshold
+        )
+
+    def verify_coherence(self, mic: np.ndarray, loopback: np.ndarray) -> bool:
+        """Second stage: False if the loopback explains the mic over the wake window."""
+        return self.coherence is None or self.coherence.verify(mic, loopback)
+
+
+class CoherenceVerifier:
+    """Reject activations whose mic energy is explained by the loopback.
+
+    The energy ratio fails when the TV is loud and the mic sits near the
+    speakers. Magnitude-squared coherence does not care about level: for
+    each frequency it measures how much of the mic is a linear function of
+    the loopback. The loopback is first aligned to the echo path with
+    GCC-PHAT, then MSC is estimated with Welch averaging (all Hann segments
+    in one batched rfft). The Welch cross-spectrum also gives the echo path
+    H = Sxy / Syy, so each segment splits into explained echo H·Y and an
+    incoherent residual X − H·Y.
+
+    Over the whole window the explained share is the coherence weighted by
+    mic power, but a wake word is short and the rest of the window is TV:
+    averaging over it rejects a real user who talks over loud playback.
+    ``echo_fraction`` is therefore measured over the ``speech_seconds`` of
+    segments with the most residual energy, i.e. where the wake word is if
+    there is one; above ``max_echo_fraction`` the activation is rejected.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        window_seconds: float = 1.5,
+        max_echo_fraction: float = 0.6,
+        speech_seconds: float = 0.5,
+        segment: int = 512,
+        max_delay_ms: float = 250.0,
+        min_ref_rms: float = 30.0,
+    ):
+        self.window_seconds = window_seconds
+        self.max_echo_fraction = max_echo_fraction
+        self._segment = segment
+        self._speech_segments = max(1, int(speech_seconds * sample_rate / (segment // 2)))
+        self._window = np.hanning(segment + 1)[:-1].astype(np.float32)
+        self._max_delay = int(max_delay_ms * sample_rate / 1000)
+        self._min_ref_rms = min_ref_rms
+        self.last_echo_fraction = 0.0
+
+    def verify(self, mic: np.ndarray, loopback: np.ndarray) -> bool:
+        """True (accept) unless the loopback explains most of the mic energy."""
+        self.last_echo_fraction = self.echo_fraction(mic, loopback)
+        return self.last_echo_fraction <= self.max_echo_fraction
+
+    def echo_fraction(self, mic: np.ndarray, loopback: np.ndarray) -> float:
+        """Share of mic energy explained by the (delay-aligned) loopback, 0..1.
+
+        Measured over the segments with the most unexplained energy, up to
+        ``speech_seconds`` of them (all segments for a shorter window).
+        """
+        n = min(len(mic), len(loopback))
+        mic = mic[-n:].astype(np.float32)
+        ref = loopback[-n:].astype(np.float32)
+        if n < 2 * self._segment or np.sqrt(np.mean(ref**2)) < self._min_ref_rms:
+            return 0.0  # nothing playing (or too little audio): nothing to explain
+        lag, _ = gcc_phat(mic, ref, min(self._max_delay, n - 2 * self._segment))
+        mic, ref = mic[lag:], ref[: n - lag]
+
+        hop = self._segment // 2
+        x = np.fft.rfft(_segments(mic, self._segment, hop) * self._window, axis=1)
+        y = np.fft.rfft(_segments(ref, self._segment, hop) * self._window, axis=1)
+        syy = np.mean(y.real**2 + y.imag**2, axis=0)
+        sxy = np.mean(x * np.conj(y), axis=0)
+        residual = x - (sxy / (syy + 1e-20)) * y
+        mic_power = np.sum(x.real**2 + x.imag**2, axis=1)
+        residual_power = np.sum(residual.real**2 + residual.imag**2, axis=1)
+        k = min(self._speech_segments, len(residual_power))
+        top = np.argpartition(residual_power, len(residual_power) - k)[-k:]
+        return float(1.0 - np.sum(residual_power[top]) / (np.sum(mic_power[top]) + 1e-20))
+
+
+def _segments(audio: np.ndarray, size: int, hop: int) -> np.ndarray:
+    return np.lib.stride_tricks.sliding_window_view(audio, size)[::hop]
+
+
+def create_wake_word_verifier(config: WakeWordConfig, sample_rate: int = 16000) -> WakeWordVerifier:
+    coherence = None
+    if config.coherence_window_seconds > 0:
+        coherence = CoherenceVerifier(
+            sample_rate,
+            window_seconds=config.coherence_window_seconds,
+            max_echo_fraction=config.max_echo_fraction,
+        )
+    return WakeWordVerifier(config.energy_ratio_threshold, config.threshold, coherence)
@@ -34,6 +34,8 @@ class TestEchoCancellerReducesReference:
         ).astype(np.int16)
         ref_frame = echo.copy()
 
+        ec.process(mic_frame, ref_frame)
+        # Second frame: past the carry-over latency, all samples are cancelled
         clean = ec.process(mic_frame, ref_frame)
 
         # Clean signal should be closer to voice than mic_frame was
@@ -63,10 +65,16 @@ class TestEchoCancellerPreservesVoice:
         voice = np.array([500, -500] * 256, dtype=np.int16)  # 512 samples
         silence = np.zeros(512, dtype=np.int16)
 
-        clean = ec.process(voice, silence)
+        first = ec.process(voice, silence)
+        second = ec.process(voice, silence)
 
-        assert len(clean) == 512
-        np.testing.assert_array_equal(clean, voice)
+        assert len(first) == len(second) == 512
+        # Output is the input delayed by the fixed carry-over latency
+        lat = ec.latency_samples
+        np.testing.assert_array_equal(first[:lat], 0)
+        np.testing.assert_array_equal(
+            np.concatenate([first, second])[lat:], np.concatenate([voice, voice])[:-lat]
+        )
 
 
 class TestEchoCancellerChunking:
@@ -89,10 +97,58 @@ class TestEchoCancellerChunking:
 
         clean = ec.process(mic, ref)
 
-        # 512 / 160 = 3 full chunks + 1 partial (32 samples) = 4 calls
-        assert mock_ec.process.call_count == 4
+        # 512 / 160 = 3 full chunks; the 32-sample remainder is carried over
+        assert mock_ec.process.call_count == 3
         assert len(clean) == 512
 
+    @patch("media_assistant.audio.aec.speexdsp")
+    def test_only_whole_subframes_reach_speexdsp(self, mock_speexdsp):
+        mock_ec = MagicMock()
+        mock_speexdsp.EchoCanceller.create.return_value = mock_ec
+        sizes = []
+
+        def fake_process(mic_bytes, ref_bytes):
+            sizes.append(len(np.frombuffer(mic_bytes, dtype=np.int16)))
+            return mic_bytes
+
+        mock_ec.process.side_effect = fake_process
+        ec = EchoCanceller(frame_size=160, filter_length=1024, sample_rate=16000)
+
+        # Irregular sizes, including one larger than the preallocated buffer
+        signal = np.arange(4000, dtype=np.int16)
+        outputs = []
+        pos = 0
+        for size in (512, 100, 37, 1000, 512, 1839):
+            chunk = signal[pos : pos + size]
+            outputs.append(ec.process(chunk, chunk))
+            pos += size
+
+        assert set(sizes) == {160}
+        assert sum(sizes) == 4000 // 160 * 160
+        out = np.concatenate(outputs)
+        np.testing.assert_array_equal(out[ec.latency_samples :], signal[: -ec.latency_samples])
+
+    @patch("media_assistant.audio.aec.speexdsp")
+    def test_falls_back_to_bytes_when_binding_rejects_views(self, mock_speexdsp):
+        mock_ec = MagicMock()
+        mock_speexdsp.EchoCanceller.create.return_value = mock_ec
+
+        def fake_process(mic_bytes, ref_bytes):
+            if not isinstance(mic_bytes, bytes):
+                raise TypeError("expected bytes")
+            return mic_bytes
+
+        mock_ec.process.side_effect = fake_process
+        ec = EchoCanceller(frame_size=160, filter_length=1024, sample_rate=16000)
+
+        voice = np.full(480, 7, dtype=np.int16)
+        ec.process(voice, voice)
+        clean = ec.process(voice, voice)
+
+        np.testing.assert_array_equal(clean, 7)
+        # One rejected view, then bytes for every sub-frame
+        assert mock_ec.process.call_count == 7
+
 
 class TestReset:
     @patch("media_assistant.audio.aec.speexdsp")
@@ -107,3 +163,137 @@ class TestReset:
 
         ec.reset()
         assert mock_speexdsp.EchoCanceller.create.call_count == 2
+
+    @patch("media_assistant.audio.aec.speexdsp")
+    def test_reset_drops_carried_over_audio(self, mock_speexdsp):
+        mock_ec = MagicMock()
+        mock_ec.process.side_effect = lambda mic, ref: mic
+        mock_speexdsp.EchoCanceller.create.return_value = mock_ec
+
+        ec = EchoCanceller(frame_size=160, filter_length=1024, sample_rate=16000)
+        ec.process(np.full(512, 9, dtype=np.int16), np.zeros(512, dtype=np.int16))
+        ec.reset()
+        clean = ec.process(np.ones(512, dtype=np.int16), np.zeros(512, dtype=np.int16))
+
+        np.testing.assert_array_equal(clean[: ec.latency_samples], 0)
+        np.testing.assert_array_equal(clean[ec.latency_samples :], 1)
+
+
+class TestSilenceBypass:
+    def _make(self, mock_speexdsp, **kwargs):
+        mock_ec = MagicMock()
+        mock_ec.process.side_effect = lambda mic, ref: bytes(len(mic))  # cancels to zero
+        mock_speexdsp.EchoCanceller.create.return_value = mock_ec
+        ec = EchoCanceller(frame_size=160, filter_length=320, sample_rate=16000, **kwargs)
+        return ec, mock_ec
+
+    @patch("media_assistant.audio.aec.speexdsp")
+    def test_silent_reference_passes_mic_through(self, mock_speexdsp):
+        ec, mock_ec = self._make(mock_speexdsp)
+        mic = np.full(480, 300, dtype=np.int16)
+
+        ec.process(mic, np.zeros(480, dtype=np.int16))
+        clean = ec.process(mic, np.zeros(480, dtype=np.int16))
+
+        assert mock_ec.process.call_count == 0
+        np.testing.assert_array_equal(clean, 300)
+        assert ec.stats.bypassed_frames == 6
+        assert ec.stats.processed_frames == 0
+
+    @patch("media_assistant.audio.aec.speexdsp")
+    def test_playback_resumes_filtering_immediately(self, mock_speexdsp):
+        ec, mock_ec = self._make(mock_speexdsp)
+        ref = np.zeros(480, dtype=np.int16)
+        ref[200] = 1000  # second sub-frame carries playback
+
+        ec.process(np.full(480, 300, dtype=np.int16), ref)
+
+        assert ec.stats.bypassed_frames == 1
+        assert ec.stats.processed_frames == 2
+
+    @patch("media_assistant.audio.aec.speexdsp")
+    def test_filter_is_flushed_with_silence_before_bypass(self, mock_speexdsp):
+        ec, mock_ec = self._make(mock_speexdsp)
+        mic = np.full(160, 300, dtype=np.int16)
+        ec.process(mic, np.full(160, 1000, dtype=np.int16))
+
+        # filter_length=320: two silent sub-frames still go through SpeexDSP
+        for _ in range(4):
+            ec.process(mic, np.zeros(160, dtype=np.int16))
+
+        assert ec.stats.processed_frames == 3
+        assert ec.stats.bypassed_frames == 2
+
+    @patch("media_assistant.audio.aec.speexdsp")
+    def test_quiet_reference_with_a_loud_probe_is_judged_by_energy(self, mock_speexdsp):
+        ec, mock_ec = self._make(mock_speexdsp)
+        mic = np.full(480, 300, dtype=np.int16)
+        quiet = np.zeros(480, dtype=np.int16)
+        quiet[::20] = 1  # nonzero but below the silence energy
+        quiet[400] = 1000  # only the last sub-frame's probe sample is loud
+
+        ec.process(mic, np.zeros(480, dtype=np.int16))
+        ec.process(mic, quiet)
+
+        assert ec.stats.processed_frames == 1
+        assert ec.stats.bypassed_frames == 5
+
+    @patch("media_assistant.audio.aec.speexdsp")
+    def test_bypass_can_be_disabled(self, mock_speexdsp):
+        ec, mock_ec = self._make(mock_speexdsp, bypass_silence=False)
+
+        ec.process(np.full(480, 300, dtype=np.int16), np.zeros(480, dtype=np.int16))
+
+        assert mock_ec.process.call_count == 3
+        assert ec.stats.bypassed_frames == 0
+
+
+class TestDelayAlignment:
+    @patch("media_assistant.audio.aec.speexdsp")
+    def test_reference_is_delayed_by_estimate_minus_margin(self, mock_speexdsp):
+        from media_assistant.audio.delay import DelayEstimator
+
+        mock_ec = MagicMock()
+        refs = []
+
+        def fake_process(mic_bytes, ref_bytes):
+            refs.append(np.frombuffer(ref_bytes, dtype=np.int16).copy())
+            return mic_bytes
+
+        mock_ec.process.side_effect = fake_process
+        mock_speexdsp.EchoCanceller.create.return_value = mock_ec
+        estimator = DelayEstimator(max_delay_ms=50)
+        estimator.delay_samples, estimator.confidence = 400, 0.4
+        ec = EchoCanceller(
+            frame_size=160,
+            filter_length=256,
+            bypass_silence=False,
+            delay_estimator=estimator,
+            delay_margin=80,
+        )
+
+        ref = np.arange(1, 1601, dtype=np.int16)
+        ec.process(np.ones(1600, dtype=np.int16), ref)
+
+        seen = np.concatenate(refs)
+        np.testing.assert_array_equal(seen[:320], 0)
+        np.testing.assert_array_equal(seen[320:], ref[: 1600 - 320])
+        assert ec.stats.delay_ms == pytest.approx(20.0)
+        assert ec.stats.delay_confidence == pytest.approx(0.4)
+
+
+class TestWarm:
+    @patch("media_assistant.audio.aec.speexdsp")
+    def test_warm_drops_stale_audio_but_keeps_filter(self, mock_speexdsp):
+        mock_ec = MagicMock()
+        mock_ec.process.side_effect = lambda mic, ref: mic
+        mock_speexdsp.EchoCanceller.create.return_value = mock_ec
+        ec = EchoCanceller(frame_size=160, filter_length=1024, bypass_silence=False)
+        ec.process(np.full(512, 9, dtype=np.int16), np.ones(512, dtype=np.int16))
+
+        ec.warm()
+        clean = ec.process(np.ones(512, dtype=np.int16), np.ones(512, dtype=np.int16))
+
+        assert mock_speexdsp.EchoCanceller.create.call_count == 1
+        np.testing.assert_array_equal(clean[: ec.latency_samples], 0)
+        np.testing.assert_array_equal(clean[ec.latency_samples :], 1)
@@ -0,0 +1,165 @@
+"""Tests for the shared-memory audio bus."""
+
+import numpy as np
+import pytest
+
+from media_assistant.audio.bus import (
+    AudioBus,
+    BusAudioCapture,
+    BusSubscriber,
+    ProcessAudioCapture,
+)
+from media_assistant.audio.capture import AudioFrame
+from media_assistant.config import AudioConfig
+
+
+def _frame(i: int, size: int = 64) -> AudioFrame:
+    return AudioFrame(
+        mic=np.full(size, i, dtype=np.int16),
+        loopback=np.full(size, -i, dtype=np.int16),
+        timestamp=10.0 + i,
+    )
+
+
+@pytest.fixture
+def bus():
+    bus = AudioBus.create(slots=8, frame_size=64)
+    yield bus
+    bus.close()
+
+
+class TestAudioBus:
+    def test_subscriber_reads_frames_in_order(self, bus):
+        subscriber = BusSubscriber(bus)
+        for i in range(3):
+            bus.publish(_frame(i))
+
+        frames = [subscriber.read(timeout=0.1) for _ in range(3)]
+
+        assert [int(f.mic[0]) for f in frames] == [0, 1, 2]
+        assert [f.timestamp for f in frames] == [10.0, 11.0, 12.0]
+        assert subscriber.read(timeout=0.01) is None
+
+    def test_frames_are_views_into_shared_memory(self, bus):
+        subscriber = BusSubscriber(bus)
+        bus.publish(_frame(1))
+
+        frame = subscriber.read(timeout=0.1)
+
+        assert frame.mic.base is not None
+        assert not frame.mic.flags.owndata
+
+    def test_second_mapping_sees_published_frames(self, bus):
+        other = AudioBus(bus.handle)
+        bus.publish(_frame(5))
+
+        frame = BusSubscriber(other, from_start=True).read(timeout=0.1)
+        value = int(frame.loopback[0])
+        del frame
+        other.close()
+
+        assert value == -5
+
+    def test_lapped_subscriber_skips_and_counts(self, bus):
+        subscriber = BusSubscriber(bus)
+        for i in range(20):
+            bus.publish(_frame(i))
+
+        frame = subscriber.read(timeout=0.1)
+
+        # 8 slots: frames 0..11 were overwritten
+        assert int(frame.mic[0]) == 12
+        assert subscriber.missed_frames == 12
+
+
+    def test_view_reports_being_lapped(self, bus):
+        subscriber = BusSubscriber(bus)
+        bus.publish(_frame(1))
+        subscriber.read(timeout=0.1)
+        assert subscriber.intact()
+
+        for i in range(8):
+            bus.publish(_frame(i))
+
+        assert not subscriber.intact()
+
+    def test_frame_lapped_mid_copy_is_missed(self, bus):
+        subscriber = BusSubscriber(bus)
+        for i in range(2):
+            bus.publish(_frame(i))
+        # The publisher starts rewriting slot 0 right after the first check
+        bus._seqs = _LappedAfterFirstCheck(bus._seqs, slot=0)
+
+        frame = subscriber.read(timeout=0.1, copy=True)
+
+        assert int(frame.mic[0]) == 1
+        assert frame.mic.flags.owndata
+        assert subscriber.missed_frames == 1
+
+
+class _LappedAfterFirstCheck:
+    """Slot sequence numbers whose ``slot`` turns torn (-1) once it is read."""
+
+    def __init__(self, seqs: np.ndarray, slot: int):
+        self._seqs = seqs
+        self._slot = slot
+        self._checked = False
+
+    def __getitem__(self, slot: int) -> int:
+        if slot != self._slot:
+            return self._seqs[slot]
+        if self._checked:
+            return -1
+        self._checked = True
+        return self._seqs[slot]
+
+
+class TestBusAudioCapture:
+    def test_read_frame_delivers_bus_frames(self, bus):
+        capture = BusAudioCapture(bus.handle)
+        capture.start()
+        try:
+            for i in range(4):
+                bus.publish(_frame(i))
+            values = [int(capture.read_frame(timeout=1.0).mic[0]) for _ in range(4)]
+        finally:
+            capture.stop()
+
+        assert values == [0, 1, 2, 3]
+        assert capture.stats.dropped_frames == 0
+
+    def test_recent_audio_reads_from_bus(self, bus):
+        capture = BusAudioCapture(bus.handle)
+        capture.start()
+        try:
+            for i in range(3):
+                bus.publish(_frame(i))
+            mic, loopback = capture.recent_audio(8)  # 128 samples at 16 kHz
+        finally:
+            capture.stop()
+
+        np.testing.assert_array_equal(mic, np.repeat([1, 2], 64))
+        np.testing.assert_array_equal(loopback[-64:], -2)
+
+
+class TestProcessAudioCapture:
+    def test_synthetic_backend_in_child_process(self):
+        config = AudioConfig(
+            frame_size=512,
+            backend="synthetic",
+            replay_realtime=True,
+            separate_process=True,
+            bus_slots=64,
+        )
+        capture = ProcessAudioCapture(config)
+        capture.start()
+        try:
+            frames = [capture.read_frame(timeout=10.0) for _ in range(3)]
+            shapes = [f.mic.shape for f in frames]
+            timestamps = [f.timestamp for f in frames]
+            del frames
+        finally:
+            capture.stop()
+
+        assert shapes == [(512,)] * 3
+        assert timestamps[0] < timestamps[1] < timestamps[2]
@@ -1,5 +1,6 @@
 """Tests for AudioCapture with mocked PyAudioWPatch."""
 
+import asyncio
 import time
 import threading
 from unittest.mock import MagicMock, patch, PropertyMock
@@ -92,6 +93,11 @@ class TestAudioCaptureStartStop:
         assert not capture.is_running
 
 
+def _callbacks(mock_pa) -> tuple:
+    """The (mic, loopback) stream callbacks AudioCapture.start() registered."""
+    return tuple(call.kwargs["stream_callback"] for call in mock_pa.open.call_args_list)
+
+
 class TestReadFrame:
     @patch("media_assistant.audio.capture.pyaudio")
     def test_read_frame_returns_synchronized_data(self, mock_pyaudio):
@@ -104,26 +110,20 @@ class TestReadFrame:
             "maxInputChannels": 1,
         }
 
+        mock_pyaudio.paInputOverflow = 2
+
         # Prepare mic and loopback data (mono 16kHz int16)
         mic_data = np.ones(512, dtype=np.int16) * 100
         loopback_data = np.ones(512, dtype=np.int16) * 200
 
-        mic_bytes = mic_data.tobytes()
-        loopback_bytes = loopback_data.tobytes()
-
-        mock_mic_stream = MagicMock()
-        mock_loopback_stream = MagicMock()
-
-        mock_mic_stream.read.return_value = mic_bytes
-        mock_loopback_stream.read.return_value = loopback_bytes
-
-        mock_pa.open.side_effect = [mock_mic_stream, mock_loopback_stream]
-
         capture = AudioCapture(sample_rate=16000, frame_size=512)
         capture.start()
+        on_mic, on_loopback = _callbacks(mock_pa)
 
-        # Give callback threads time to process
-        time.sleep(0.2)
+        # PortAudio delivers blocks on both streams
+        for _ in range(3):
+            on_loopback(loopback_data.tobytes(), 512, {}, 0)
+            on_mic(mic_data.tobytes(), 512, {}, 0)
 
         frame = capture.read_frame(timeout=1.0)
         assert frame is not None
@@ -147,13 +147,7 @@ class TestReadFrame:
             "maxInputChannels": 1,
         }
 
-        # Streams that never produce data
-        mock_mic_stream = MagicMock()
-        mock_loopback_stream = MagicMock()
-        mock_mic_stream.read.side_effect = lambda *a, **kw: time.sleep(10)
-        mock_loopback_stream.read.side_effect = lambda *a, **kw: time.sleep(10)
-        mock_pa.open.side_effect = [mock_mic_stream, mock_loopback_stream]
-
+        # Streams that never invoke their callbacks
         capture = AudioCapture(sample_rate=16000, frame_size=512)
         capture.start()
 
@@ -178,23 +172,16 @@ class TestLoopbackResampling:
         }
 
         # Stereo 48kHz data: frame_size * (48000/16000) * 2 channels = 512 * 3 * 2 = 3072 samples
+        mock_pyaudio.paInputOverflow = 2
         stereo_48k = np.ones(3072, dtype=np.int16) * 300
-        stereo_48k_bytes = stereo_48k.tobytes()
-
         mic_data = np.ones(512, dtype=np.int16) * 100
-        mic_bytes = mic_data.tobytes()
-
-        mock_mic_stream = MagicMock()
-        mock_loopback_stream = MagicMock()
-        mock_mic_stream.read.return_value = mic_bytes
-        mock_loopback_stream.read.return_value = stereo_48k_bytes
-
-        mock_pa.open.side_effect = [mock_mic_stream, mock_loopback_stream]
 
         capture = AudioCapture(sample_rate=16000, frame_size=512)
         capture.start()
-
-        time.sleep(0.2)
+        on_mic, on_loopback = _callbacks(mock_pa)
+        for i in range(4):  # enough to cover the resampler's group delay
+            on_loopback(stereo_48k.tobytes(), 1536, {}, 0)
+            on_mic(mic_data.tobytes(), 512, {}, 0)
 
         frame = capture.read_frame(timeout=1.0)
         assert frame is not None
@@ -203,3 +190,288 @@ class TestLoopbackResampling:
         assert frame.loopback.dtype == np.int16
 
         capture.stop()
+
+
+class TestSynchronizer:
+    def test_pushes_wake_synchronizer(self):
+        capture = AudioCapture(sample_rate=16000, frame_size=512)
+        capture._running = True
+        sync = threading.Thread(target=capture._synchronizer, daemon=True)
+        sync.start()
+
+        capture._push_mic(np.ones(512, dtype=np.int16), captured_at=100.0)
+        assert capture.read_frame(timeout=0.05) is None
+
+        capture._push_loopback(np.zeros(512, dtype=np.int16), captured_at=100.0)
+        frame = capture.read_frame(timeout=1.0)
+        assert frame is not None
+        np.testing.assert_array_equal(frame.mic, np.ones(512, dtype=np.int16))
+
+        capture.stop()
+        sync.join(timeout=1.0)
+        assert not sync.is_alive()
+
+    def test_stop_releases_idle_synchronizer(self):
+        capture = AudioCapture()
+        capture._running = True
+        sync = threading.Thread(target=capture._synchronizer, daemon=True)
+        sync.start()
+
+        capture.stop()
+        sync.join(timeout=1.0)
+        assert not sync.is_alive()
+
+
+class TestFrameOwnership:
+    @pytest.mark.parametrize("drift_compensation", [True, False])
+    def test_held_frame_survives_ring_wraparound(self, drift_compensation):
+        capture = AudioCapture(
+            frame_size=512, buffer_seconds=0.5, drift_compensation=drift_compensation
+        )
+        frames = []
+        for i in range(100):  # 3.2 s through a 0.5 s ring
+            block = np.full(512, i, dtype=np.int16)
+            capture._push_loopback(block, captured_at=1.0 + (i + 1) * 0.032)
+            capture._push_mic(block, captured_at=1.0 + (i + 1) * 0.032)
+            frames.append(capture._take_frame())
+
+        np.testing.assert_array_equal(frames[0].mic, 0)
+        np.testing.assert_array_equal(frames[0].loopback, 0)
+
+
+class TestCaptureTimeAlignment:
+    def _run(self, capture, mic_blocks, loopback_blocks):
+        capture._running = True
+        sync = threading.Thread(target=capture._synchronizer, daemon=True)
+        sync.start()
+        for (mic, t_mic), (lb, t_lb) in zip(mic_blocks, loopback_blocks):
+            capture._push_loopback(lb, captured_at=t_lb)
+            capture._push_mic(mic, captured_at=t_mic)
+        frames = []
+        while (frame := capture.read_frame(timeout=0.2)) is not None:
+            frames.append(frame)
+        capture.stop()
+        sync.join(timeout=1.0)
+        return frames
+
+    def test_timestamp_is_capture_time_of_first_mic_sample(self):
+        capture = AudioCapture(sample_rate=16000, frame_size=512)
+        block = np.zeros(512, dtype=np.int16)
+
+        frames = self._run(capture, [(block, 50.032)], [(block, 50.032)])
+
+        assert len(frames) == 1
+        assert frames[0].timestamp == pytest.approx(50.0 + capture._wall_offset)
+
+    def test_loopback_aligned_by_capture_time(self):
+        """Loopback started 10 ms before the mic → frame skips those samples."""
+        capture = AudioCapture(sample_rate=16000, frame_size=512)
+        ramp = np.arange(4096, dtype=np.int16)
+        mic_blocks = [(np.zeros(512, dtype=np.int16), 10.032 + i * 0.032) for i in range(4)]
+        lb_blocks = [(ramp[i * 512 : (i + 1) * 512], 10.022 + i * 0.032) for i in range(8)]
+
+        frames = self._run(capture, mic_blocks, lb_blocks)
+
+        assert frames
+        assert frames[0].loopback[0] == 160
+        np.testing.assert_array_equal(np.diff(frames[0].loopback), 1)
+
+    def test_mic_frame_without_loopback_is_counted(self):
+        capture = AudioCapture(sample_rate=16000, frame_size=512)
+        block = np.zeros(512, dtype=np.int16)
+        # Loopback capture started long after this mic frame
+        capture._push_loopback(np.concatenate([block, block]), captured_at=20.064)
+        capture._push_mic(block, captured_at=10.032)
+
+        assert capture._take_frame() is None
+        assert capture.stats.unpaired_frames == 1
+        assert capture.stats.dropped_frames == 0
+
+    def test_drift_is_estimated_and_compensated(self):
+        """Loopback clock 1000 ppm fast → reference is resampled to match."""
+        capture = AudioCapture(sample_rate=16000, frame_size=512)
+        capture._mic_clock._min_span = 1.0
+        capture._loopback_clock._min_span = 1.0
+        ratio = 1.001
+        n_blocks = 80
+        ramp = (np.arange(512 * n_blocks * 2) % 30000).astype(np.int16)
+        mic_blocks = [
+            (np.zeros(512, dtype=np.int16), 1.0 + (i + 1) * 0.032) for i in range(n_blocks)
+        ]
+        lb_blocks = [
+            (ramp[i * 512 : (i + 1) * 512], 1.0 + (i + 1) * 0.032 / ratio)
+            for i in range(n_blocks)
+        ]
+
+        frames = self._run(capture, mic_blocks, lb_blocks)
+
+        assert capture.drift_ppm == pytest.approx(1000, rel=0.05)
+        # Late frames advance the reference by 512 * ratio samples per frame
+        advance = (int(frames[-1].loopback[0]) - int(frames[-11].loopback[0])) / 10
+        assert advance == pytest.approx(512 * ratio, abs=0.2)
+
+
+class TestAsyncFrames:
+    @pytest.mark.asyncio
+    async def test_frames_yields_without_blocking_loop(self):
+        capture = AudioCapture(sample_rate=16000, frame_size=512)
+        capture._running = True
+        sync = threading.Thread(target=capture._synchronizer, daemon=True)
+        sync.start()
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        def produce():
+            time.sleep(0.1)
+            capture._push_mic(np.full(512, 7, dtype=np.int16), captured_at=5.0)
+            capture._push_loopback(np.zeros(512, dtype=np.int16), captured_at=5.0)
+
+        tick_task = asyncio.create_task(ticker())
+        threading.Thread(target=produce, daemon=True).start()
+        async for frame in capture.frames():
+            break
+        tick_task.cancel()
+
+        assert frame.mic[0] == 7
+        # The loop kept running while waiting for the frame
+        assert ticks >= 5
+
+        capture.stop()
+        sync.join(timeout=1.0)
+
+    @pytest.mark.asyncio
+    async def test_stop_ends_iteration(self):
+        capture = AudioCapture()
+        capture._running = True
+
+        async def consume():
+            return [frame async for frame in capture.frames()]
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        capture.stop()
+
+        assert await asyncio.wait_for(task, timeout=1.0) == []
+
+    @pytest.mark.asyncio
+    async def test_frame_racing_the_consumer_attach_is_not_lost(self):
+        capture = AudioCapture()
+        capture._running = True
+        routed = threading.Event()
+        enqueue = capture._enqueue
+
+        def slow_enqueue(queue, frame):
+            routed.set()
+            time.sleep(0.05)  # frames() attaches while the frame is in flight
+            enqueue(queue, frame)
+
+        capture._enqueue = slow_enqueue
+        frame = AudioFrame(np.ones(512, dtype=np.int16), np.zeros(512, dtype=np.int16), 1.0)
+        sender = threading.Thread(target=capture._deliver, args=(frame,), daemon=True)
+        sender.start()
+        await asyncio.to_thread(routed.wait, 1.0)
+
+        frames = capture.frames()
+        received = await asyncio.wait_for(frames.__anext__(), timeout=1.0)
+
+        assert received is frame
+        await frames.aclose()
+        sender.join(timeout=1.0)
+
+
+class TestDropPolicy:
+    def _frame(self, value: int) -> AudioFrame:
+        return AudioFrame(
+            mic=np.full(512, value, dtype=np.int16),
+            loopback=np.zeros(512, dtype=np.int16),
+            timestamp=float(value),
+        )
+
+    def test_full_queue_drops_oldest_when_allowed(self):
+        capture = AudioCapture(max_queued_frames=3)
+        for i in range(5):
+            capture._deliver(self._frame(i))
+
+        assert capture.read_frame(timeout=0).timestamp == 2.0
+        assert capture.stats.queue_overflows == 2
+        assert capture.stats.dropped_frames == 2
+        assert capture.stats.max_queue_depth == 3
+
+    def test_full_queue_keeps_everything_when_drops_disallowed(self):
+        capture = AudioCapture(max_queued_frames=3)
+        capture.set_drop_allowed(False)
+        for i in range(5):
+            capture._deliver(self._frame(i))
+
+        assert capture.read_frame(timeout=0).timestamp == 0.0
+        assert capture.stats.queue_overflows == 2
+        assert capture.stats.dropped_frames == 0
+        assert capture.stats.max_queue_depth == 5
+
+    def test_allowing_drops_trims_backlog(self):
+        capture = AudioCapture(max_queued_frames=3)
+        capture.set_drop_allowed(False)
+        for i in range(6):
+            capture._deliver(self._frame(i))
+
+        capture.set_drop_allowed(True)
+
+        assert capture._frame_queue.qsize() == 3
+        assert capture.stats.dropped_frames == 3
+        assert capture.read_frame(timeout=0).timestamp == 3.0
+
+    @pytest.mark.asyncio
+    async def test_async_consumer_uses_same_policy(self):
+        capture = AudioCapture(max_queued_frames=2)
+        capture._running = True
+
+        frames = capture.frames()
+        first = asyncio.ensure_future(frames.__anext__())
+        await asyncio.sleep(0)
+        for i in range(5):
+            capture._deliver(self._frame(i))
+        await asyncio.sleep(0.01)
+
+        # Callbacks ran before the consumer resumed: only the newest 2 remain
+        assert (await first).timestamp == 3.0
+        assert capture.stats.dropped_frames == 3
+        await frames.aclose()
+
+
+class TestInputOverflow:
+    @patch("media_assistant.audio.capture.pyaudio")
+    def test_overflow_flag_is_counted_and_the_block_kept(self, mock_pyaudio):
+        mock_pyaudio.paInputOverflow = 2
+        capture = AudioCapture(sample_rate=16000, frame_size=512)
+
+        capture._mic_callback(np.ones(512, dtype=np.int16).tobytes(), 512, {}, 2)
+        result = capture._mic_callback(np.ones(512, dtype=np.int16).tobytes(), 512, {}, 0)
+
+        assert capture.stats.input_overflows == 1
+        assert capture.stats.overflows_by_stream["mic"] == 1
+        assert capture._mic_buffer.write_pos == 1024
+        np.testing.assert_array_equal(capture._mic_buffer.window(0, 1024), 1)
+        assert result == (None, mock_pyaudio.paContinue)
+
+    @patch("media_assistant.audio.capture.pyaudio")
+    def test_streams_open_in_callback_mode(self, mock_pyaudio):
+        mock_pa = mock_pyaudio.PyAudio.return_value
+        mock_pa.get_wasapi_loopback.return_value = {
+            "index": 5,
+            "name": "Speakers (loopback)",
+            "defaultSampleRate": 48000.0,
+            "maxInputChannels": 2,
+        }
+        capture = AudioCapture(sample_rate=16000, frame_size=512)
+
+        capture.start()
+
+        assert _callbacks(mock_pa) == (capture._mic_callback, capture._loopback_callback)
+        mock_pa.open.return_value.start_stream.assert_called()
+        capture.stop()
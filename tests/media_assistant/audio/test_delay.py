@@ -0,0 +1,108 @@
+"""Tests for GCC-PHAT delay estimation and the reference delay line."""
+
+import time
+
+import numpy as np
+import pytest
+
+from media_assistant.audio.delay import DelayEstimator, DelayLine, gcc_phat
+
+
+def _music(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / 16000
+    tones = sum(np.sin(2 * np.pi * f * t) for f in (220.0, 440.0, 660.0))
+    return 2000 * tones + 1000 * rng.standard_normal(n)
+
+
+def _echo(ref: np.ndarray, delay: int, gain: float = 0.5, noise: float = 200.0) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    mic = noise * rng.standard_normal(len(ref))
+    mic[delay:] += gain * ref[: len(ref) - delay]
+    return mic
+
+
+class TestGccPhat:
+    def test_finds_echo_delay(self):
+        ref = _music(32000)
+
+        lag, peak = gcc_phat(_echo(ref, 640), ref, max_delay=4000)
+
+        assert lag == 640
+        assert peak > 0.1
+
+    def test_uncorrelated_signals_have_low_peak(self):
+        rng = np.random.default_rng(2)
+        _, peak = gcc_phat(rng.standard_normal(32000), rng.standard_normal(32000), 4000)
+
+        assert peak < 0.05
+
+
+class TestDelayEstimator:
+    def _fill(self, estimator, mic, ref):
+        for start in range(0, len(mic), 512):
+            estimator.push(
+                np.clip(mic[start : start + 512], -32768, 32767).astype(np.int16),
+                np.clip(ref[start : start + 512], -32768, 32767).astype(np.int16),
+            )
+
+    def test_estimate_updates_delay(self):
+        estimator = DelayEstimator(history_seconds=2.0)
+        ref = _music(32000)
+        self._fill(estimator, _echo(ref, 480), ref)
+
+        assert estimator.estimate()
+        assert estimator.delay_samples == 480
+        assert estimator.delay_ms == pytest.approx(30.0)
+        assert estimator.estimates == 1
+
+    def test_needs_full_history(self):
+        estimator = DelayEstimator(history_seconds=2.0)
+        ref = _music(16000)
+        self._fill(estimator, _echo(ref, 480), ref)
+
+        assert not estimator.estimate()
+
+    def test_silent_loopback_is_skipped(self):
+        estimator = DelayEstimator(history_seconds=1.0)
+        rng = np.random.default_rng(3)
+        self._fill(estimator, 300 * rng.standard_normal(16000), np.zeros(16000))
+
+        assert not estimator.estimate()
+        assert estimator.delay_samples == 0
+
+    def test_background_thread_runs(self):
+        estimator = DelayEstimator(history_seconds=1.0, interval_seconds=0.01)
+        ref = _music(16000)
+        self._fill(estimator, _echo(ref, 160), ref)
+
+        estimator.start()
+        try:
+            for _ in range(200):
+                if estimator.estimates:
+                    break
+                time.sleep(0.01)
+        finally:
+            estimator.stop()
+
+        assert estimator.delay_samples == 160
+
+
+class TestDelayLine:
+    def test_delays_across_blocks(self):
+        line = DelayLine(max_delay=100)
+        signal = np.arange(1, 1001, dtype=np.int16)
+
+        out = np.concatenate([line.process(b, 70) for b in signal.reshape(-1, 250)])
+
+        np.testing.assert_array_equal(out[:70], 0)
+        np.testing.assert_array_equal(out[70:], signal[:-70])
+
+    def test_delay_is_clamped(self):
+        line = DelayLine(max_delay=10)
+        block = np.ones(32, dtype=np.int16)
+
+        out = line.process(block, 500)
+
+        np.testing.assert_array_equal(out[:10], 0)
+        np.testing.assert_array_equal(out[10:], 1)
@@ -0,0 +1,39 @@
+"""Tests for StreamClock capture-time tracking."""
+
+import pytest
+
+from media_assistant.audio.drift import StreamClock, drift_ratio
+
+
+class TestStreamClock:
+    def test_uses_nominal_rate_until_span_is_long_enough(self):
+        clock = StreamClock(16000, min_span_seconds=5.0)
+        clock.observe(16000, 1.0)
+        clock.observe(32016, 2.0)
+
+        assert clock.rate == 16000
+
+    def test_measures_rate_over_span(self):
+        clock = StreamClock(16000, min_span_seconds=5.0)
+        for i in range(11):
+            clock.observe(16000 + i * 16016, 1.0 + i)
+
+        assert clock.rate == pytest.approx(16016)
+        assert clock.time_of(16000 + 16016) == pytest.approx(2.0)
+        assert clock.index_at(2.0) == pytest.approx(16000 + 16016)
+
+    def test_jump_reanchors_clock(self):
+        clock = StreamClock(16000, resync_seconds=0.1)
+        clock.observe(512, 1.0)
+        clock.observe(1024, 5.0)  # a 4 s hole in the stream
+
+        assert clock.time_of(1024) == 5.0
+
+    def test_drift_ratio(self):
+        mic = StreamClock(16000, min_span_seconds=1.0)
+        loopback = StreamClock(16000, min_span_seconds=1.0)
+        for i in range(3):
+            mic.observe(i * 16000, float(i))
+            loopback.observe(i * 16032, float(i))
+
+        assert drift_ratio(mic, loopback) == pytest.approx(1.002)
@@ -0,0 +1,42 @@
+"""Tests for FrameFeatures."""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from media_assistant.audio.features import FrameFeatures
+
+
+class TestFrameFeatures:
+    def test_values(self):
+        mic = np.array([3000, -4000] * 256, dtype=np.int16)
+        features = FrameFeatures(mic, np.full(512, 1000, dtype=np.int16))
+
+        assert features.float32.dtype == np.float32
+        np.testing.assert_allclose(features.float32[:2], [3000 / 32768, -4000 / 32768])
+        assert features.rms == pytest.approx(np.sqrt((3000**2 + 4000**2) / 2), rel=1e-5)
+        assert features.peak == 4000
+        assert features.reference_rms == pytest.approx(1000.0, rel=1e-5)
+        assert features.energy_ratio == pytest.approx(features.rms / 1000.0, rel=1e-5)
+
+    def test_full_scale_negative_peak(self):
+        assert FrameFeatures(np.array([-32768, 5], dtype=np.int16)).peak == 32768
+
+    def test_without_reference(self):
+        features = FrameFeatures(np.full(512, 100, dtype=np.int16))
+        assert features.reference_rms == 0.0
+        assert features.energy_ratio > 1e9
+
+    def test_each_feature_is_computed_once(self):
+        features = FrameFeatures(np.full(512, 100, dtype=np.int16))
+        with patch("media_assistant.audio.features.np.multiply", wraps=np.multiply) as multiply:
+            features.float32
+            features.rms
+            features.energy_ratio
+        assert multiply.call_count == 1
+
+    def test_of_reuses_existing_features(self):
+        features = FrameFeatures(np.zeros(4, dtype=np.int16))
+        assert FrameFeatures.of(features) is features
+        assert FrameFeatures.of(features.pcm).pcm is features.pcm
@@ -0,0 +1,77 @@
+"""Tests for the EnergyGate VAD pre-gate."""
+
+import numpy as np
+
+from media_assistant.audio.gate import EnergyGate
+
+
+def _noise(rms: float, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(0, rms, 512).astype(np.int16)
+
+
+def _tone(rms: float, freq: float = 200.0) -> np.ndarray:
+    t = np.arange(512) / 16000
+    return (rms * np.sqrt(2) * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+def _learn_floor(gate: EnergyGate, rms: float = 200.0, frames: int = 200) -> None:
+    for i in range(frames):
+        gate.passes(_noise(rms, seed=i))
+
+
+class TestEnergyGate:
+    def test_digital_silence_is_rejected(self):
+        gate = EnergyGate()
+        assert gate.passes(np.zeros(512, dtype=np.int16)) is False
+
+    def test_floor_follows_room_noise(self):
+        gate = EnergyGate()
+        _learn_floor(gate, rms=200.0)
+
+        assert 150 < gate.floor_rms < 210
+        assert gate.passes(_noise(200.0, seed=99)) is False
+
+    def test_loud_frame_opens_and_hangover_holds(self):
+        gate = EnergyGate(hangover_frames=3)
+        _learn_floor(gate)
+
+        assert gate.passes(_noise(2000.0)) is True
+        held = [gate.passes(_noise(200.0, seed=i)) for i in range(5)]
+
+        assert held == [True, True, True, False, False]
+
+    def test_hysteresis_keeps_open_gate_open_between_thresholds(self):
+        gate = EnergyGate(hangover_frames=0)
+        _learn_floor(gate)
+        between = _noise(200.0 * 10 ** (7 / 20), seed=50)  # 7 dB: between close and open
+
+        assert gate.passes(between) is False  # closed gate, noise-like ZCR
+        gate.passes(_noise(2000.0))
+        assert gate.passes(between) is True
+
+    def test_low_zcr_onset_between_thresholds_opens(self):
+        gate = EnergyGate(hangover_frames=0)
+        _learn_floor(gate)
+
+        assert gate.passes(_tone(200.0 * 10 ** (7 / 20))) is True
+
+    def test_reset_closes_but_keeps_floor(self):
+        gate = EnergyGate()
+        _learn_floor(gate)
+        gate.passes(_noise(2000.0))
+        floor = gate.floor_rms
+
+        gate.reset()
+
+        assert gate.floor_rms == floor
+        assert gate.passes(_noise(200.0, seed=7)) is False
+
+    def test_hit_rate_counts_rejected_frames(self):
+        gate = EnergyGate(hangover_frames=0)
+        assert gate.hit_rate == 0.0
+        gate.passes(np.zeros(512, dtype=np.int16))
+        gate.passes(_noise(5000.0))
+
+        assert gate.frames == 2
+        assert gate.rejected == 1
+        assert gate.hit_rate == 0.5
@@ -4,7 +4,8 @@ from unittest.mock import MagicMock, patch
 import numpy as np
 import pytest
 
-from media_assistant.audio.noise import NoiseSuppressor
+from media_assistant.audio.noise import NoiseSuppressor, SpectralGate, create_noise_suppressor
+from media_assistant.config import NoiseConfig
 
 
 class TestNoiseSuppressorReducesNoise:
@@ -53,3 +54,218 @@ class TestNoiseSuppressorPassesSilence:
         clean = ns.process(silence)
 
         np.testing.assert_array_equal(clean, silence)
+
+
+class TestWarm:
+    @patch("media_assistant.audio.noise.df_mod")
+    def test_warm_runs_model_once(self, mock_df):
+        mock_df.init_df.return_value = (MagicMock(), MagicMock(), 16000)
+        mock_df.enhance.side_effect = lambda model, state, audio: audio
+
+        ns = NoiseSuppressor()
+        ns.warm()
+        ns.warm()
+
+        assert mock_df.enhance.call_count == 1
+
+
+class _FakeDfState:
+    """Non-overlapping 'STFT' (one hop per frame) with a one-hop synthesis delay."""
+
+    def __init__(self):
+        self._memory = np.zeros(480, dtype=np.float32)
+        self.synthesized_hops = 0
+
+    def sr(self):
+        return 48000
+
+    def hop_size(self):
+        return 480
+
+    def fft_size(self):
+        return 960
+
+    def erb_widths(self):
+        return np.full(32, 15)
+
+    def analysis(self, audio):
+        return np.asarray(audio).reshape(1, -1, 480).astype(np.complex64)
+
+    def synthesis(self, spectrum):
+        self.synthesized_hops += spectrum.shape[1]
+        audio = np.concatenate((self._memory, spectrum.real.reshape(-1)))
+        self._memory = audio[-480:]
+        return audio[None, :-480]
+
+
+def _streaming(mock_df, mock_torch, **kwargs):
+    df_state = _FakeDfState()
+    model = MagicMock(spec=["__call__", "nb_df"], nb_df=96)
+    model.side_effect = lambda spec, erb, spec_feat: (spec,)
+    mock_df.init_df.return_value = (model, df_state, 16000)
+    mock_df.get_norm_alpha.return_value = 0.99
+    mock_df.erb.side_effect = lambda spec, widths: np.zeros((*spec.shape[:2], len(widths)), np.float32)
+    mock_df.erb_norm.side_effect = lambda erb, alpha, state: erb
+    mock_df.unit_norm.side_effect = lambda spec, alpha, state: spec
+    mock_torch.as_tensor.side_effect = lambda x: x
+    return NoiseSuppressor(streaming=True, **kwargs), model, df_state
+
+
+class TestStreamingMode:
+    @patch("media_assistant.audio.noise.torch")
+    @patch("media_assistant.audio.noise.df_mod")
+    def test_any_frame_size_gives_aligned_output(self, mock_df, mock_torch):
+        ns, _, _ = _streaming(mock_df, mock_torch)
+        t = np.arange(16000) / 16000
+        signal = (8000 * np.sin(2 * np.pi * 100 * t)).astype(np.int16)
+
+        outputs, pos = [], 0
+        for size in [512, 100, 777, 160, 1500] * 4:
+            chunk = signal[pos : pos + size]
+            out = ns.process(chunk)
+            assert len(out) == len(chunk)
+            outputs.append(out)
+            pos += size
+        out = np.concatenate(outputs).astype(float)
+
+        lat = ns.latency_samples
+        expected = signal[: pos - lat].astype(float)
+        error = np.abs(out[lat:][2000:] - expected[2000:]).max()
+        # Identity model: only resampling and sub-sample rounding of the latency remain
+        assert error < 200
+
+    @patch("media_assistant.audio.noise.torch")
+    @patch("media_assistant.audio.noise.df_mod")
+    def test_model_sees_context_and_every_hop_is_synthesized_once(self, mock_df, mock_torch):
+        ns, model, df_state = _streaming(mock_df, mock_torch, context_hops=4, lookahead_hops=2)
+
+        for _ in range(20):
+            ns.process(np.zeros(480, dtype=np.int16))  # 1440 samples = 3 hops at 48 kHz
+
+        lengths = [call.args[0].shape[2] for call in model.call_args_list]
+        assert max(lengths) == 4 + 2 + 3
+        # All hops but the held-back lookahead reach synthesis
+        assert df_state.synthesized_hops == model.call_count * 3 - 2
+
+    @patch("media_assistant.audio.noise.torch")
+    @patch("media_assistant.audio.noise.df_mod")
+    def test_feature_normalization_continues_across_calls(self, mock_df, mock_torch):
+        ns, _, _ = _streaming(mock_df, mock_torch)
+        for _ in range(3):
+            ns.process(np.zeros(480, dtype=np.int16))
+
+        # One running-mean state per normalization, threaded through every call
+        erb_states = {id(call.args[2]) for call in mock_df.erb_norm.call_args_list}
+        unit_states = {id(call.args[2]) for call in mock_df.unit_norm.call_args_list}
+        assert mock_df.erb_norm.call_count == 3
+        assert len(erb_states) == 1 and len(unit_states) == 1
+        state = mock_df.erb_norm.call_args.args[2]
+        assert state.shape == (1, 32)
+        assert state[0, 0] == -60.0
+
+        ns.warm()
+        ns.process(np.zeros(480, dtype=np.int16))
+        assert mock_df.erb_norm.call_args.args[2] is not state
+
+    @patch("media_assistant.audio.noise.torch")
+    @patch("media_assistant.audio.noise.df_mod")
+    def test_warm_drops_queued_output(self, mock_df, mock_torch):
+        ns, _, _ = _streaming(mock_df, mock_torch)
+        ns.process(np.full(1600, 5000, dtype=np.int16))
+
+        ns.warm()
+        out = ns.process(np.zeros(512, dtype=np.int16))
+
+        # The FIFO restarts with silence instead of the queued loud audio
+        np.testing.assert_array_equal(out[:480], 0)
+
+
+def _gate_scene(seconds: float, tone: tuple[float, float] | None = None):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * 16000)) / 16000
+    signal = rng.normal(0, 300, len(t))
+    clean = np.zeros_like(t)
+    if tone is not None:
+        clean = np.where((t >= tone[0]) & (t < tone[1]), 3000 * np.sin(2 * np.pi * 440 * t), 0)
+    return np.clip(signal + clean, -32768, 32767).astype(np.int16), clean
+
+
+def _run_gate(gate, audio, size=512):
+    out = np.concatenate([gate.process(audio[i : i + size]) for i in range(0, len(audio), size)])
+    return out[gate.latency_samples :].astype(float)
+
+
+def _rms(x) -> float:
+    return float(np.sqrt(np.mean(np.asarray(x, dtype=float) ** 2)))
+
+
+class TestSpectralGate:
+    def test_attenuates_steady_noise(self):
+        noisy, _ = _gate_scene(4.0)
+        out = _run_gate(SpectralGate(), noisy)
+        assert _rms(out[32000:]) < _rms(noisy[32000:]) / 2
+
+    def test_keeps_tone_above_the_noise_floor(self):
+        noisy, tone = _gate_scene(4.0, tone=(2.0, 3.0))
+        out = _run_gate(SpectralGate(), noisy)
+        seg = slice(33600, 46400)
+        # Output stays close to the clean tone: the residual is roughly the noise in its bins
+        assert _rms(out[seg] - tone[seg]) < _rms(tone[seg]) / 5
+
+    @pytest.mark.parametrize("size", [512, 160, 777])
+    def test_output_length_and_latency_for_any_frame_size(self, size):
+        gate = SpectralGate(frame_size=size, reduction_db=0.0)
+        t = np.arange(20 * size) / 16000
+        signal = (8000 * np.sin(2 * np.pi * 300 * t)).astype(np.int16)
+
+        outputs = [gate.process(signal[i : i + size]) for i in range(0, len(signal), size)]
+        assert all(len(o) == size for o in outputs)
+        out = np.concatenate(outputs).astype(float)[gate.latency_samples :]
+        # No attenuation: overlap-add reconstructs the input, delayed by latency_samples
+        np.testing.assert_allclose(out[512:], signal[512 : len(out)], atol=2)
+
+    @pytest.mark.parametrize("size", [160, 400, 480])
+    def test_frame_size_guess_does_not_change_output_length(self, size):
+        gate = SpectralGate()  # primed for 512-sample frames
+        audio = np.random.default_rng(0).normal(0, 1000, 20 * size).astype(np.int16)
+
+        assert all(len(gate.process(audio[i : i + size])) == size for i in range(0, len(audio), size))
+        assert gate.latency_samples == 511
+
+    def test_silence_stays_silent(self):
+        out = SpectralGate().process(np.zeros(512, dtype=np.int16))
+        np.testing.assert_array_equal(out, 0)
+
+    def test_warm_keeps_noise_floor_and_drops_queued_audio(self):
+        gate = SpectralGate(frame_size=160)
+        noisy, _ = _gate_scene(2.0)
+        _run_gate(gate, noisy)
+        floor = gate._floor.copy()
+        gate.process(np.full(160, 20000, dtype=np.int16))
+
+        gate.warm()
+
+        np.testing.assert_array_equal(gate._floor, floor)
+        np.testing.assert_array_equal(gate.process(np.zeros(160, dtype=np.int16)), 0)
+
+
+class TestCreateNoiseSuppressor:
+    def test_spectral_gate_backend(self):
+        gate = create_noise_suppressor(
+            NoiseConfig(backend="spectral_gate", gate_threshold_db=9.0, gate_reduction_db=12.0)
+        )
+        assert isinstance(gate, SpectralGate)
+        assert gate._min_gain == pytest.approx(10 ** (-12 / 20))
+
+    def test_spectral_gate_primes_for_the_frame_size(self):
+        gate = create_noise_suppressor(NoiseConfig(backend="spectral_gate"), frame_size=160)
+        assert gate.latency_samples == 511
+
+    @patch("media_assistant.audio.noise.df_mod")
+    def test_deepfilternet_backend(self, mock_df):
+        mock_df.init_df.return_value = (MagicMock(), MagicMock(), 16000)
+        assert isinstance(create_noise_suppressor(NoiseConfig()), NoiseSuppressor)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="rnnoise"):
+            create_noise_suppressor(NoiseConfig(backend="rnnoise"))
@@ -0,0 +1,58 @@
+"""Tests for Rechunker."""
+
+import numpy as np
+import pytest
+
+from media_assistant.audio.rechunk import Rechunker
+
+
+def _push_frames(chunker, total, frame=512, t0=100.0):
+    chunks = []
+    for start in range(0, total, frame):
+        samples = np.arange(start, start + frame, dtype=np.int16)
+        chunks += chunker.push(samples, t0 + start / 16000)
+    return chunks
+
+
+class TestRechunker:
+    def test_hops_across_frame_boundaries(self):
+        chunks = _push_frames(Rechunker(1280), 512 * 10)
+
+        assert len(chunks) == 4  # 5120 samples = 4 whole 1280-sample chunks
+        for i, chunk in enumerate(chunks):
+            np.testing.assert_array_equal(chunk.samples, np.arange(i * 1280, (i + 1) * 1280))
+
+    def test_timestamps_follow_first_sample(self):
+        chunks = _push_frames(Rechunker(1280), 512 * 10)
+
+        for i, chunk in enumerate(chunks):
+            assert chunk.timestamp == pytest.approx(100.0 + i * 1280 / 16000)
+
+    def test_overlapping_windows(self):
+        chunker = Rechunker(hop=160, window=400)
+        chunks = _push_frames(chunker, 512 * 2)
+
+        assert len(chunks) == (1024 - 400) // 160 + 1
+        np.testing.assert_array_equal(chunks[1].samples, np.arange(160, 560))
+
+    def test_chunks_are_views_not_copies(self):
+        chunker = Rechunker(256)
+        chunks = chunker.push(np.zeros(512, dtype=np.int16), 0.0)
+
+        assert all(not chunk.samples.flags.owndata for chunk in chunks)
+        assert not chunks[0].samples.flags.writeable
+
+    def test_reset_restarts_windows(self):
+        chunker = Rechunker(1280)
+        chunker.push(np.ones(1000, dtype=np.int16), 0.0)
+
+        chunker.reset()
+        chunks = chunker.push(np.zeros(1280, dtype=np.int16), 5.0)
+
+        assert len(chunks) == 1
+        np.testing.assert_array_equal(chunks[0].samples, 0)
+        assert chunks[0].timestamp == 5.0
+
+    def test_rejects_oversized_push(self):
+        with pytest.raises(ValueError, match="max_push"):
+            Rechunker(256, max_push=512).push(np.zeros(1024, dtype=np.int16), 0.0)
@@ -0,0 +1,91 @@
+"""Tests for SessionRecorder segment files and replay."""
+
+import json
+
+import numpy as np
+import pytest
+
+from media_assistant.audio.capture import AudioFrame
+from media_assistant.audio.recorder import SessionRecorder, create_session_recorder, load_session
+from media_assistant.audio.replay import FileAudioCapture
+from media_assistant.config import RecorderConfig
+
+
+def _frame(i: int) -> AudioFrame:
+    return AudioFrame(
+        mic=np.full(512, i, dtype=np.int16),
+        loopback=np.full(512, -i, dtype=np.int16),
+        timestamp=100.0 + i * 0.032,
+    )
+
+
+def _record(recorder: SessionRecorder, count: int) -> None:
+    recorder.start()
+    for i in range(count):
+        recorder.record(_frame(i), np.full(512, 2 * i, dtype=np.int16), "idle", 0.1 * i, 0.5)
+    recorder.stop()
+
+
+class TestSegments:
+    def test_writes_audio_and_metadata(self, tmp_path):
+        recorder = SessionRecorder(str(tmp_path), segment_seconds=1.0)
+        _record(recorder, 10)
+
+        session = load_session(str(tmp_path))
+
+        assert recorder.recorded_frames == 10
+        np.testing.assert_array_equal(session["mic"][512 * 3 : 512 * 4], 3)
+        np.testing.assert_array_equal(session["loopback"][:512], 0)
+        np.testing.assert_array_equal(session["clean"][-512:], 18)
+        assert session["meta"]["wake_score"][4] == pytest.approx(0.4)
+        assert session["meta"]["timestamp"][1] == pytest.approx(100.032)
+
+    def test_rotates_segments(self, tmp_path):
+        # 1 s segments hold 31 frames; 100 frames -> 4 segments, keep 2
+        recorder = SessionRecorder(str(tmp_path), segment_seconds=1.0, max_segments=2)
+        _record(recorder, 100)
+
+        segments = sorted(tmp_path.glob("seg-*"))
+
+        assert [s.name for s in segments] == ["seg-00002", "seg-00003"]
+        manifest = json.loads((segments[-1] / "segment.json").read_text())
+        assert manifest["frames"] == 100 - 3 * 31
+        assert manifest["states"] == ["idle"]
+
+    def test_full_staging_drops_instead_of_blocking(self, tmp_path):
+        recorder = SessionRecorder(str(tmp_path), pending_frames=4)
+        # Writer not started: nothing drains the staging slots
+        for i in range(10):
+            recorder.record(_frame(i), None, "idle")
+
+        assert recorder.dropped_frames == 7
+
+
+class TestReplay:
+    def test_recording_replays_through_file_capture(self, tmp_path):
+        recorder = SessionRecorder(str(tmp_path), segment_seconds=1.0)
+        _record(recorder, 40)
+
+        capture = FileAudioCapture(str(tmp_path))
+        capture.start()
+        frames = []
+        while (frame := capture.read_frame()) is not None:
+            frames.append(frame)
+
+        assert len(frames) == 40
+        assert frames[35].mic[0] == 35
+        assert frames[35].loopback[0] == -35
+
+
+class TestCreateSessionRecorder:
+    def test_disabled_by_default(self):
+        assert create_session_recorder(RecorderConfig()) is None
+
+    def test_follows_config(self, tmp_path):
+        config = RecorderConfig(enabled=True, directory=str(tmp_path), segment_seconds=1.0, max_segments=2)
+
+        recorder = create_session_recorder(config, frame_size=160)
+
+        assert recorder._segment_frames == 100
+        assert recorder._max_segments == 2
+        assert recorder._audio.shape[2] == 160
@@ -0,0 +1,180 @@
+"""Tests for file-backed and synthetic capture backends."""
+
+import asyncio
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from media_assistant.audio.capture import AudioFrame, create_audio_capture
+from media_assistant.audio.replay import (
+    ArrayAudioCapture,
+    FileAudioCapture,
+    SyntheticAudioCapture,
+    _load_wav,
+)
+from media_assistant.audio.resample import StreamingResampler
+from media_assistant.config import AudioConfig
+
+
+def _write_wav(path, samples: np.ndarray, rate: int = 16000, channels: int = 1):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+
+
+class TestArrayAudioCapture:
+    def test_read_frame_serves_consecutive_frames(self):
+        mic = np.arange(2048, dtype=np.int16)
+        capture = ArrayAudioCapture(mic, -mic, frame_size=512)
+        capture.start()
+
+        first = capture.read_frame()
+        second = capture.read_frame()
+
+        assert isinstance(first, AudioFrame)
+        np.testing.assert_array_equal(first.mic, mic[:512])
+        np.testing.assert_array_equal(second.loopback, -mic[512:1024])
+        assert second.timestamp - first.timestamp == pytest.approx(0.032, abs=1e-6)
+
+    def test_end_of_data_stops_capture(self):
+        capture = ArrayAudioCapture(np.zeros(1000, dtype=np.int16), frame_size=512)
+        capture.start()
+
+        assert capture.read_frame() is not None
+        assert capture.read_frame() is None
+        assert not capture.is_running
+
+    def test_loop_wraps_around(self):
+        capture = ArrayAudioCapture(np.arange(1024, dtype=np.int16), frame_size=512, loop=True)
+        capture.start()
+
+        frames = [capture.read_frame() for _ in range(3)]
+
+        assert frames[2].mic[0] == 0
+        assert frames[2].timestamp > frames[1].timestamp
+
+    def test_realtime_paces_frames(self):
+        capture = ArrayAudioCapture(
+            np.zeros(16000, dtype=np.int16), frame_size=512, realtime=True
+        )
+        capture.start()
+
+        t0 = time.monotonic()
+        for _ in range(3):
+            capture.read_frame()
+
+        assert time.monotonic() - t0 >= 3 * 0.032 - 0.005
+
+    @pytest.mark.asyncio
+    async def test_async_frames_match_sync_stream(self):
+        mic = np.arange(4096, dtype=np.int16)
+        capture = ArrayAudioCapture(mic, frame_size=512)
+        capture.start()
+
+        frames = [frame async for frame in capture.frames()]
+
+        assert len(frames) == 8
+        np.testing.assert_array_equal(np.concatenate([f.mic for f in frames]), mic)
+
+    @pytest.mark.asyncio
+    async def test_fast_replay_yields_to_the_loop(self):
+        capture = ArrayAudioCapture(np.zeros(512 * 20, dtype=np.int16), frame_size=512)
+        capture.start()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.ensure_future(ticker())
+        seen = []
+        async for _ in capture.frames():
+            seen.append(ticks)
+        task.cancel()
+
+        assert seen[-1] >= 10  # the other task kept running during the replay
+
+
+class TestFileAudioCapture:
+    def test_npz_pair(self, tmp_path):
+        path = tmp_path / "session.npz"
+        mic = np.full(1024, 5, dtype=np.int16)
+        np.savez(path, mic=mic, loopback=np.full(1024, 9, dtype=np.int16))
+
+        capture = FileAudioCapture(str(path))
+        capture.start()
+        frame = capture.read_frame()
+
+        assert frame.mic[0] == 5
+        assert frame.loopback[0] == 9
+
+    def test_wav_pair_is_converted_to_mono_16k(self, tmp_path):
+        mic_path = tmp_path / "mic.wav"
+        lb_path = tmp_path / "loopback.wav"
+        _write_wav(mic_path, np.full(16000, 100))
+        _write_wav(lb_path, np.full(48000 * 2, 200), rate=48000, channels=2)
+
+        capture = FileAudioCapture(str(mic_path), str(lb_path))
+        capture.start()
+        frames = []
+        while (frame := capture.read_frame()) is not None:
+            frames.append(frame)
+
+        assert len(frames) == 16000 // 512
+        assert frames[-1].loopback[-1] == 200
+
+    def test_long_wav_is_resampled_in_blocks_without_changing_the_result(self, tmp_path):
+        path = tmp_path / "loopback.wav"
+        samples = np.random.default_rng(0).integers(-8000, 8000, 44100 * 2 * 3)
+        _write_wav(path, samples, rate=44100, channels=2)
+
+        whole = StreamingResampler(44100, 16000, 2).process(samples.astype(np.int16))
+
+        np.testing.assert_array_equal(_load_wav(str(path), 16000), whole)
+
+
+class TestSyntheticAudioCapture:
+    def test_is_reproducible(self):
+        a = SyntheticAudioCapture(seconds=1.0, speech_rms=1000, loopback_rms=500)
+        b = SyntheticAudioCapture(seconds=1.0, speech_rms=1000, loopback_rms=500)
+        a.start()
+        b.start()
+
+        np.testing.assert_array_equal(a.read_frame().mic, b.read_frame().mic)
+
+    def test_silent_room_has_only_noise(self):
+        capture = SyntheticAudioCapture(seconds=1.0, noise_rms=30)
+        capture.start()
+        frame = capture.read_frame()
+
+        assert np.sqrt(np.mean(frame.mic.astype(float) ** 2)) == pytest.approx(30, rel=0.2)
+        assert not frame.loopback.any()
+
+    def test_mic_contains_delayed_echo_of_loopback(self):
+        capture = SyntheticAudioCapture(
+            seconds=1.0, noise_rms=0, loopback_rms=1000, echo_gain=0.5, echo_delay_ms=10
+        )
+
+        np.testing.assert_allclose(
+            capture._mic[160:].astype(float), 0.5 * capture._loopback[:-160], atol=1
+        )
+
+
+class TestCreateAudioCapture:
+    def test_synthetic_backend(self):
+        capture = create_audio_capture(AudioConfig(backend="synthetic"))
+        assert isinstance(capture, SyntheticAudioCapture)
+
+    def test_file_backend_requires_path(self):
+        with pytest.raises(ValueError):
+            create_audio_capture(AudioConfig(backend="file"))
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_audio_capture(AudioConfig(backend="alsa"))
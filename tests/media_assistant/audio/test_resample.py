@@ -0,0 +1,79 @@
+"""Tests for the streaming polyphase resampler."""
+
+import numpy as np
+import pytest
+
+from media_assistant.audio.resample import StreamingResampler
+
+
+def _tone(freq: float, rate: int, seconds: float = 1.0, channels: int = 2) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    mono = (8000 * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+    return np.repeat(mono, channels)
+
+
+class TestRateConversion:
+    @pytest.mark.parametrize("in_rate", [48000, 44100, 32000])
+    def test_output_length_matches_rate_ratio(self, in_rate):
+        resampler = StreamingResampler(in_rate, 16000, channels=2)
+
+        out = resampler.process(_tone(1000, in_rate))
+
+        assert out.dtype == np.int16
+        assert len(out) == 16000
+
+    def test_48k_block_gives_one_16k_frame(self):
+        resampler = StreamingResampler(48000, 16000, channels=2)
+
+        out = resampler.process(np.ones(3072, dtype=np.int16))
+
+        assert len(out) == 512
+
+    @pytest.mark.parametrize("in_rate", [48000, 44100])
+    def test_passband_tone_keeps_amplitude(self, in_rate):
+        resampler = StreamingResampler(in_rate, 16000, channels=2)
+
+        out = resampler.process(_tone(1000, in_rate))
+
+        assert np.abs(out[2000:]).max() == pytest.approx(8000, rel=0.01)
+
+    @pytest.mark.parametrize("in_rate", [48000, 44100])
+    def test_tone_above_nyquist_is_rejected(self, in_rate):
+        resampler = StreamingResampler(in_rate, 16000, channels=2)
+
+        out = resampler.process(_tone(10000, in_rate))
+
+        assert np.abs(out[2000:]).max() < 10
+
+
+class TestStreaming:
+    @pytest.mark.parametrize("in_rate", [48000, 44100])
+    def test_chunking_does_not_change_output(self, in_rate):
+        signal = _tone(440, in_rate)
+        whole = StreamingResampler(in_rate, 16000, channels=2).process(signal)
+
+        resampler = StreamingResampler(in_rate, 16000, channels=2)
+        blocks = np.array_split(signal.reshape(-1, 2), 37)
+        chunked = np.concatenate([resampler.process(b.ravel()) for b in blocks])
+
+        np.testing.assert_array_equal(chunked, whole)
+
+    def test_reset_clears_history(self):
+        resampler = StreamingResampler(48000, 16000, channels=1)
+        first = resampler.process(_tone(440, 48000, 0.1, channels=1))
+        resampler.process(_tone(3000, 48000, 0.1, channels=1))
+        resampler.reset()
+
+        again = resampler.process(_tone(440, 48000, 0.1, channels=1))
+
+        np.testing.assert_array_equal(again, first)
+
+
+class TestDownmix:
+    def test_averages_any_channel_count(self):
+        resampler = StreamingResampler(16000, 16000, channels=6)
+        frames = np.tile(np.array([600, 0, 0, 0, 0, 0], dtype=np.int16), 10)
+
+        out = resampler.process(frames)
+
+        np.testing.assert_array_equal(out, np.full(10, 100, dtype=np.int16))
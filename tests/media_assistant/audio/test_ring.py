@@ -0,0 +1,67 @@
+"""Tests for the zero-copy audio RingBuffer."""
+
+import numpy as np
+import pytest
+
+from media_assistant.audio.ring import RingBuffer
+
+
+class TestWriteRead:
+    def test_read_returns_written_samples_in_order(self):
+        ring = RingBuffer(capacity=8)
+        ring.write(np.arange(5, dtype=np.int16))
+
+        np.testing.assert_array_equal(ring.read(3), [0, 1, 2])
+        np.testing.assert_array_equal(ring.read(2), [3, 4])
+        assert ring.read(1) is None
+
+    def test_read_across_wraparound_is_contiguous_view(self):
+        ring = RingBuffer(capacity=8)
+        ring.write(np.arange(6, dtype=np.int16))
+        ring.read(6)
+        ring.write(np.arange(6, 12, dtype=np.int16))
+
+        window = ring.read(6)
+
+        np.testing.assert_array_equal(window, np.arange(6, 12))
+        assert window.base is not None  # a view, not a copy
+        assert not window.flags.writeable
+
+    def test_overrun_skips_lost_samples(self):
+        ring = RingBuffer(capacity=4)
+        ring.write(np.arange(10, dtype=np.int16))
+
+        assert ring.available == 4
+        np.testing.assert_array_equal(ring.read(4), [6, 7, 8, 9])
+        assert ring.overrun_samples == 6
+
+
+class TestRandomAccess:
+    def test_window_by_absolute_position(self):
+        ring = RingBuffer(capacity=8)
+        ring.write(np.arange(12, dtype=np.int16))
+
+        np.testing.assert_array_equal(ring.window(5, 3), [5, 6, 7])
+
+    def test_window_outside_held_range_raises(self):
+        ring = RingBuffer(capacity=8)
+        ring.write(np.arange(12, dtype=np.int16))
+
+        with pytest.raises(IndexError):
+            ring.window(2, 3)
+        with pytest.raises(IndexError):
+            ring.window(10, 4)
+
+    def test_last_ms_returns_newest_samples(self):
+        ring = RingBuffer(capacity=16000, sample_rate=16000)
+        ring.write(np.arange(8000, dtype=np.int16))
+
+        recent = ring.last_ms(10)
+
+        np.testing.assert_array_equal(recent, np.arange(7840, 8000))
+
+    def test_last_ms_clips_to_held_samples(self):
+        ring = RingBuffer(capacity=100, sample_rate=16000)
+        ring.write(np.ones(50, dtype=np.int16))
+
+        assert len(ring.last_ms(1000)) == 50
@@ -1,23 +1,39 @@
 """Tests for VoiceActivityDetector with mocked Silero VAD."""
 
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 import numpy as np
 import pytest
 
-from media_assistant.audio.vad import VoiceActivityDetector
+from media_assistant.audio.gate import EnergyGate
+from media_assistant.audio.vad import (
+    GatedVoiceActivityDetector,
+    OnnxVoiceActivityDetector,
+    VoiceActivityDetector,
+    create_voice_activity_detector,
+)
+from media_assistant.config import VADConfig
+from media_assistant.models import file_sha256
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / "silero_vad.jit"
+    path.write_bytes(b"silero")
+    return str(path)
 
 
 class TestVADDetectsSpeech:
     @patch("media_assistant.audio.vad.torch")
-    def test_vad_detects_speech(self, mock_torch):
+    def test_vad_detects_speech(self, mock_torch, model_file):
         """Frame with speech → True."""
         mock_model = MagicMock()
-        mock_torch.hub.load.return_value = (mock_model, None)
+        mock_torch.jit.load.return_value = mock_model
 
         # Model returns high confidence for speech
         mock_model.return_value = MagicMock(item=MagicMock(return_value=0.9))
 
-        vad = VoiceActivityDetector(threshold=0.5)
+        vad = VoiceActivityDetector(model_file, threshold=0.5)
 
         speech = np.random.randint(-5000, 5000, 512, dtype=np.int16)
         assert vad.is_speech(speech) is True
@@ -25,15 +41,15 @@ class TestVADDetectsSpeech:
 
 class TestVADRejectsSilence:
     @patch("media_assistant.audio.vad.torch")
-    def test_vad_rejects_silence(self, mock_torch):
+    def test_vad_rejects_silence(self, mock_torch, model_file):
         """Silent frame → False."""
         mock_model = MagicMock()
-        mock_torch.hub.load.return_value = (mock_model, None)
+        mock_torch.jit.load.return_value = mock_model
 
         # Model returns low confidence for silence
         mock_model.return_value = MagicMock(item=MagicMock(return_value=0.05))
 
-        vad = VoiceActivityDetector(threshold=0.5)
+        vad = VoiceActivityDetector(model_file, threshold=0.5)
 
         silence = np.zeros(512, dtype=np.int16)
         assert vad.is_speech(silence) is False
@@ -41,15 +57,15 @@ class TestVADRejectsSilence:
 
 class TestVADRejectsNoise:
     @patch("media_assistant.audio.vad.torch")
-    def test_vad_rejects_noise(self, mock_torch):
+    def test_vad_rejects_noise(self, mock_torch, model_file):
         """Noise-only frame → False."""
         mock_model = MagicMock()
-        mock_torch.hub.load.return_value = (mock_model, None)
+        mock_torch.jit.load.return_value = mock_model
 
         # Model returns below-threshold for noise
         mock_model.return_value = MagicMock(item=MagicMock(return_value=0.3))
 
-        vad = VoiceActivityDetector(threshold=0.5)
+        vad = VoiceActivityDetector(model_file, threshold=0.5)
 
         noise = np.random.randint(-100, 100, 512, dtype=np.int16)
         assert vad.is_speech(noise) is False
@@ -57,12 +73,196 @@ class TestVADRejectsNoise:
 
 class TestVADReset:
     @patch("media_assistant.audio.vad.torch")
-    def test_reset_clears_model_state(self, mock_torch):
+    def test_reset_clears_model_state(self, mock_torch, model_file):
         """Reset should call model.reset_states()."""
         mock_model = MagicMock()
-        mock_torch.hub.load.return_value = (mock_model, None)
+        mock_torch.jit.load.return_value = mock_model
 
-        vad = VoiceActivityDetector(threshold=0.5)
+        vad = VoiceActivityDetector(model_file, threshold=0.5)
         vad.reset()
 
         mock_model.reset_states.assert_called_once()
+
+
+def _onnx_vad(mock_ort, probs=(0.9,), path=None, **kwargs):
+    """OnnxVoiceActivityDetector over a fake session returning ``probs`` in turn."""
+    session = MagicMock()
+    calls = []
+
+    def run(outputs, feeds):
+        calls.append({k: np.array(v, copy=True) for k, v in feeds.items()})
+        prob = probs[min(len(calls) - 1, len(probs) - 1)]
+        return np.array([[prob]], dtype=np.float32), feeds["state"] + 1
+
+    session.run.side_effect = run
+    mock_ort.InferenceSession.return_value = session
+    return OnnxVoiceActivityDetector(path or __file__, **kwargs), session, calls
+
+
+class TestModelCache:
+    @patch("media_assistant.audio.vad.torch")
+    def test_loads_from_cache_without_torch_hub(self, mock_torch, model_file):
+        VoiceActivityDetector(model_file)
+
+        mock_torch.jit.load.assert_called_once_with(model_file)
+        mock_torch.hub.load.assert_not_called()
+
+    @patch("media_assistant.audio.vad.torch")
+    def test_missing_model_names_the_cache_path(self, mock_torch, tmp_path):
+        missing = str(tmp_path / "silero_vad.jit")
+        with pytest.raises(FileNotFoundError, match="silero_vad.jit"):
+            VoiceActivityDetector(missing)
+
+    @patch("media_assistant.audio.vad.torch")
+    def test_checksum_verified(self, mock_torch, model_file):
+        VoiceActivityDetector(model_file, sha256=file_sha256(model_file))
+
+        with pytest.raises(ValueError, match="sha256"):
+            VoiceActivityDetector(model_file, sha256="0" * 64)
+        assert mock_torch.jit.load.call_count == 1
+
+    @patch("media_assistant.audio.vad.torch")
+    def test_lazy_load_still_verifies_at_construction(self, mock_torch, model_file, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            VoiceActivityDetector(str(tmp_path / "missing.jit"), lazy=True)
+        with pytest.raises(ValueError, match="sha256"):
+            VoiceActivityDetector(model_file, sha256="0" * 64, lazy=True)
+        mock_torch.jit.load.assert_not_called()
+
+    @patch("media_assistant.audio.vad.torch")
+    def test_lazy_load_waits_for_first_use(self, mock_torch, model_file):
+        mock_torch.jit.load.return_value.return_value.item.return_value = 0.9
+        vad = VoiceActivityDetector(model_file, lazy=True)
+        vad.reset()  # nothing loaded yet, nothing to reset
+        mock_torch.jit.load.assert_not_called()
+
+        assert vad.is_speech(np.zeros(512, dtype=np.int16)) is True
+        vad.load()
+
+        mock_torch.jit.load.assert_called_once()
+
+    @patch("media_assistant.audio.vad.ort")
+    def test_onnx_lazy_load(self, mock_ort):
+        vad, _, _ = _onnx_vad(mock_ort, lazy=True)
+        mock_ort.InferenceSession.assert_not_called()
+
+        vad.load()
+        vad.is_speech(np.zeros(512, dtype=np.int16))
+
+        mock_ort.InferenceSession.assert_called_once()
+
+
+class TestOnnxVAD:
+    @patch("media_assistant.audio.vad.ort")
+    def test_threshold_and_confidence(self, mock_ort):
+        vad, _, _ = _onnx_vad(mock_ort, probs=(0.9, 0.2))
+
+        assert vad.is_speech(np.zeros(512, dtype=np.int16)) is True
+        assert vad.last_confidence == pytest.approx(0.9)
+        assert vad.is_speech(np.zeros(512, dtype=np.int16)) is False
+
+    @patch("media_assistant.audio.vad.ort")
+    def test_single_thread_session(self, mock_ort):
+        _onnx_vad(mock_ort)
+
+        options = mock_ort.InferenceSession.call_args.kwargs["sess_options"]
+        assert options.intra_op_num_threads == 1
+
+    @patch("media_assistant.audio.vad.ort")
+    def test_state_and_context_carry_between_frames(self, mock_ort):
+        vad, session, calls = _onnx_vad(mock_ort)
+        first = np.arange(512, dtype=np.int16)
+
+        vad.is_speech(first)
+        vad.is_speech(np.zeros(512, dtype=np.int16))
+
+        assert calls[0]["input"].shape == (1, 576)
+        np.testing.assert_allclose(calls[0]["input"][0, 64:], first / 32768.0)
+        # The second frame is preceded by the last 64 samples of the first
+        np.testing.assert_allclose(calls[1]["input"][0, :64], first[-64:] / 32768.0)
+        np.testing.assert_array_equal(calls[1]["state"], 1.0)
+        assert calls[1]["sr"] == 16000
+        # One preallocated buffer is reused for every frame
+        first_buffer = session.run.call_args_list[0].args[1]["input"]
+        assert session.run.call_args_list[1].args[1]["input"] is first_buffer
+
+    @patch("media_assistant.audio.vad.ort")
+    def test_reset_clears_state_and_context(self, mock_ort):
+        vad, _, calls = _onnx_vad(mock_ort)
+        vad.is_speech(np.full(512, 1000, dtype=np.int16))
+
+        vad.reset()
+        vad.is_speech(np.zeros(512, dtype=np.int16))
+
+        np.testing.assert_array_equal(calls[1]["state"], 0.0)
+        np.testing.assert_array_equal(calls[1]["input"], 0.0)
+
+    @patch("media_assistant.audio.vad.ort")
+    def test_rejects_wrong_frame_size(self, mock_ort):
+        vad, _, _ = _onnx_vad(mock_ort)
+        with pytest.raises(ValueError, match="512"):
+            vad.is_speech(np.zeros(480, dtype=np.int16))
+
+
+class TestGatedVAD:
+    def test_silence_skips_the_model(self):
+        model = MagicMock(last_confidence=0.9)
+        vad = GatedVoiceActivityDetector(model, EnergyGate())
+
+        assert vad.is_speech(np.zeros(512, dtype=np.int16)) is False
+        assert vad.last_confidence == 0.0
+        model.is_speech.assert_not_called()
+        assert vad.gate.hit_rate == 1.0
+
+    def test_ambiguous_frame_reaches_the_model(self):
+        model = MagicMock(last_confidence=0.9)
+        model.is_speech.return_value = True
+        vad = GatedVoiceActivityDetector(model, EnergyGate())
+        loud = np.random.default_rng(0).normal(0, 3000, 512).astype(np.int16)
+
+        assert vad.is_speech(loud) is True
+        assert vad.last_confidence == 0.9
+        # The model gets the gate's features, float32 conversion included
+        features = model.is_speech.call_args.args[0]
+        assert features.pcm is loud
+        assert "float32" in vars(features)
+
+    def test_load_and_reset_reach_the_model(self):
+        model = MagicMock()
+        vad = GatedVoiceActivityDetector(model, EnergyGate())
+
+        vad.load()
+        vad.reset()
+
+        model.load.assert_called_once()
+        model.reset.assert_called_once()
+
+
+class TestCreateVAD:
+    @patch("media_assistant.audio.vad.ort")
+    def test_onnx_backend_loads_from_cache(self, mock_ort, tmp_path):
+        (tmp_path / "silero_vad.onnx").write_bytes(b"onnx")
+        config = VADConfig(
+            backend="onnx", threshold=0.7, cache_dir=str(tmp_path), lazy_load=False, energy_gate=False
+        )
+
+        vad = create_voice_activity_detector(config)
+
+        assert isinstance(vad, OnnxVoiceActivityDetector)
+        assert vad.threshold == 0.7
+        assert mock_ort.InferenceSession.call_args.args[0] == str(tmp_path / "silero_vad.onnx")
+
+    @patch("media_assistant.audio.vad.torch")
+    def test_torch_backend_is_lazy_by_default(self, mock_torch, model_file):
+        config = VADConfig(cache_dir=str(Path(model_file).parent))
+
+        vad = create_voice_activity_detector(config)
+
+        assert isinstance(vad, GatedVoiceActivityDetector)
+        assert isinstance(vad.vad, VoiceActivityDetector)
+        assert not vad.vad.loaded
+        mock_torch.jit.load.assert_not_called()
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="webrtc"):
+            create_voice_activity_detector(VADConfig(backend="webrtc"))
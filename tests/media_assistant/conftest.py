@@ -8,7 +8,7 @@ import pytest
 from media_assistant.audio.capture import AudioFrame
 from media_assistant.intents.regex_router import RegexIntentRouter
 from media_assistant.intents.types import Intent, IntentType
-from media_assistant.orchestrator import Orchestrator, State, _SILENCE_THRESHOLD
+from media_assistant.orchestrator import DEFAULT_PIPELINE, Orchestrator, State, _SILENCE_THRESHOLD
 
 
 def make_frame(mic_energy: float = 1000.0, loopback_energy: float = 100.0, size: int = 512):
@@ -39,6 +39,11 @@ def integration_orch():
     o.llm_fallback = MagicMock()
     o.media = MagicMock()
     o.feedback = MagicMock()
+    o.recorder = None
+    o.preroll = None
+    o.wake_scorer = None
+    o._drop_states = frozenset({State.IDLE})
+    o._pipeline = DEFAULT_PIPELINE
 
     # Real intent router — tests the actual regex matching
     o.intent_router = RegexIntentRouter()
@@ -49,7 +54,8 @@ def integration_orch():
     o.noise.process.return_value = clean
     o.vad.is_speech.return_value = False
     o.wake_word.process_frame.return_value = 0.0
-    o.wake_verifier.verify.return_value = False
+    o.wake_verifier.verify_frame.return_value = False
+    o.wake_verifier.coherence_window_ms = 0.0
     o.llm_fallback.is_available.return_value = False
 
     # Internal state
@@ -60,6 +66,10 @@ def integration_orch():
     o._config_max_listen_seconds = 5.0
     o._config_frame_size = 512
     o._config_sample_rate = 16000
+    o._last_wake_score = 0.0
+    o._last_vad_prob = 0.0
+    o._wake_chunker = None
+    o._wake_fired = False
 
     return o
 
@@ -67,7 +77,7 @@ def integration_orch():
 async def simulate_wake(orch):
     """Trigger wake word detection on the orchestrator."""
     orch.wake_word.process_frame.return_value = 0.95
-    orch.wake_verifier.verify.return_value = True
+    orch.wake_verifier.verify_frame.return_value = True
 
     frame = make_frame(mic_energy=5000, loopback_energy=100)
     with patch("media_assistant.orchestrator.volume_get", return_value=0.5), \
@@ -78,7 +88,7 @@ async def simulate_wake(orch):
 
     # Reset wake word so further frames don't re-trigger
     orch.wake_word.process_frame.return_value = 0.0
-    orch.wake_verifier.verify.return_value = False
+    orch.wake_verifier.verify_frame.return_value = False
 
 
 async def simulate_speech_then_silence(orch, stt_text: str):
@@ -199,7 +199,7 @@ class TestE2EAECFiltersEcho:
 
         # Wake word detected even with high loopback (verifier checks energy ratio)
         orch.wake_word.process_frame.return_value = 0.95
-        orch.wake_verifier.verify.return_value = True
+        orch.wake_verifier.verify_frame.return_value = True
 
         with patch("media_assistant.orchestrator.volume_get", return_value=0.5), \
              patch("media_assistant.orchestrator.volume_set"):
@@ -211,7 +211,10 @@ class TestE2EAECFiltersEcho:
         np.testing.assert_array_equal(call_args[0], high_loopback.mic)
         np.testing.assert_array_equal(call_args[1], high_loopback.loopback)
 
-        # After AEC, noise suppressor gets the clean signal
-        orch.noise.process.assert_called_once_with(clean_signal)
-
+        # IDLE only feeds the wake word: no noise suppression yet
+        orch.noise.process.assert_not_called()
         assert orch.state == State.LISTENING
+
+        # While listening, the noise suppressor gets the AEC output
+        await orch._process_frame(high_loopback)
+        orch.noise.process.assert_called_once_with(clean_signal)
@@ -1,14 +1,24 @@
 """Tests for Orchestrator state machine."""
 
 import asyncio
+from dataclasses import replace
 from unittest.mock import MagicMock, AsyncMock, patch
 
 import numpy as np
 import pytest
 
 from media_assistant.audio.capture import AudioFrame
+from media_assistant.config import WakeWordConfig
 from media_assistant.intents.types import Intent, IntentType
-from media_assistant.orchestrator import Orchestrator, State, _SILENCE_THRESHOLD
+from media_assistant.audio.rechunk import Rechunker
+from media_assistant.wakeword.scorer import WakeScorer, create_wake_scorer
+from media_assistant.orchestrator import (
+    DEFAULT_PIPELINE,
+    Orchestrator,
+    State,
+    _SILENCE_THRESHOLD,
+    _chunker_for,
+)
 
 
 def _make_frame(mic_energy: float = 1000.0, loopback_energy: float = 100.0):
@@ -36,6 +46,11 @@ def orch():
     o.llm_fallback = MagicMock()
     o.media = MagicMock()
     o.feedback = MagicMock()
+    o.recorder = None
+    o.preroll = None
+    o.wake_scorer = None
+    o._drop_states = frozenset({State.IDLE})
+    o._pipeline = DEFAULT_PIPELINE
 
     # Default returns
     clean = np.zeros(512, dtype=np.int16)
@@ -43,7 +58,8 @@ def orch():
     o.noise.process.return_value = clean
     o.vad.is_speech.return_value = False
     o.wake_word.process_frame.return_value = 0.0
-    o.wake_verifier.verify.return_value = False
+    o.wake_verifier.verify_frame.return_value = False
+    o.wake_verifier.coherence_window_ms = 0.0
     o.llm_fallback.is_available.return_value = False
 
     o._saved_volume = None
@@ -52,6 +68,10 @@ def orch():
     o._config_max_listen_seconds = 5.0
     o._config_frame_size = 512
     o._config_sample_rate = 16000
+    o._last_wake_score = 0.0
+    o._last_vad_prob = 0.0
+    o._wake_chunker = None
+    o._wake_fired = False
 
     return o
 
@@ -60,7 +80,7 @@ class TestStateTransitionsIdleToListening:
     @pytest.mark.asyncio
     async def test_wake_word_detected_transitions_to_listening(self, orch):
         orch.wake_word.process_frame.return_value = 0.95
-        orch.wake_verifier.verify.return_value = True
+        orch.wake_verifier.verify_frame.return_value = True
 
         frame = _make_frame(mic_energy=5000, loopback_energy=100)
         await orch._process_frame(frame)
@@ -71,7 +91,7 @@ class TestStateTransitionsIdleToListening:
     @pytest.mark.asyncio
     async def test_no_wake_word_stays_idle(self, orch):
         orch.wake_word.process_frame.return_value = 0.1
-        orch.wake_verifier.verify.return_value = False
+        orch.wake_verifier.verify_frame.return_value = False
 
         frame = _make_frame()
         await orch._process_frame(frame)
@@ -112,7 +132,7 @@ class TestAutoMute:
     @pytest.mark.asyncio
     async def test_auto_mute_on_wake(self, orch):
         orch.wake_word.process_frame.return_value = 0.95
-        orch.wake_verifier.verify.return_value = True
+        orch.wake_verifier.verify_frame.return_value = True
 
         with patch("media_assistant.orchestrator.volume_get", return_value=0.8), \
              patch("media_assistant.orchestrator.volume_set") as mock_set:
@@ -263,3 +283,301 @@ class TestConfirmation:
             await orch._handle_confirming(np.zeros(512, dtype=np.int16))
 
         assert orch.state == State.IDLE
+
+
+class TestRun:
+    @pytest.mark.asyncio
+    async def test_run_consumes_async_frames_and_stops_capture(self, orch):
+        frames = [_make_frame(), _make_frame()]
+
+        async def fake_frames():
+            for frame in frames:
+                yield frame
+
+        orch.audio.frames = fake_frames
+        orch._process_frame = AsyncMock()
+
+        await orch.run()
+
+        orch.audio.start.assert_called_once()
+        assert orch._process_frame.await_count == 2
+        orch.audio.stop.assert_called_once()
+        orch.audio.read_frame.assert_not_called()
+
+
+class TestRecorderTap:
+    @pytest.mark.asyncio
+    async def test_frames_are_recorded_with_state_and_scores(self, orch):
+        orch.recorder = MagicMock()
+        orch.wake_word.process_frame.return_value = 0.3
+        frame = _make_frame()
+
+        await orch._process_frame(frame)
+
+        args = orch.recorder.record.call_args[0]
+        assert args[0] is frame
+        assert args[2] == "idle"
+        assert args[3] == 0.3
+
+
+class TestDropPolicyByState:
+    @pytest.mark.asyncio
+    async def test_drops_disallowed_while_listening(self, orch):
+        orch.wake_word.process_frame.return_value = 0.95
+        orch.wake_verifier.verify_frame.return_value = True
+
+        with patch("media_assistant.orchestrator.volume_get", return_value=0.5), \
+             patch("media_assistant.orchestrator.volume_set"):
+            await orch._process_frame(_make_frame(mic_energy=5000))
+
+        assert orch.state == State.LISTENING
+        orch.audio.set_drop_allowed.assert_called_with(False)
+
+    def test_drops_allowed_back_in_idle(self, orch):
+        orch._set_state(State.IDLE)
+        orch.audio.set_drop_allowed.assert_called_with(True)
+
+
+class TestPreRoll:
+    @pytest.mark.asyncio
+    async def test_speech_after_wake_word_starts_the_utterance(self, orch):
+        from media_assistant.wakeword.preroll import PreRollBuffer
+
+        orch.preroll = PreRollBuffer(seconds=1.0, onset_score=0.4)
+        for i, score in enumerate([0.0, 0.5, 0.7]):
+            orch.aec.process.return_value = np.full(512, i, dtype=np.int16)
+            orch.wake_word.process_frame.return_value = score
+            await orch._process_frame(_make_frame())
+
+        orch.aec.process.return_value = np.full(512, 3, dtype=np.int16)
+        orch.wake_word.process_frame.return_value = 0.95
+        orch.wake_verifier.verify_frame.return_value = True
+        await orch._process_frame(_make_frame(mic_energy=5000))
+
+        assert orch.state == State.LISTENING
+        assert [int(f[0]) for f in orch._speech_buffer] == [2, 3]
+        assert len(orch.preroll) == 0
+
+    @pytest.mark.asyncio
+    async def test_scorer_activation_keeps_the_preroll(self, orch):
+        from media_assistant.wakeword.preroll import PreRollBuffer
+
+        orch.preroll = PreRollBuffer(seconds=1.0, onset_score=0.4)
+        orch.wake_scorer = WakeScorer(threshold=0.8)
+        orch.wake_verifier.verify_frame.return_value = True
+        # The scorer fires on the hop after the peak, below the onset
+        with patch("media_assistant.orchestrator.volume_get", return_value=0.5), \
+             patch("media_assistant.orchestrator.volume_set"):
+            for i, score in enumerate([0.0, 0.5, 0.9, 0.95, 0.3]):
+                orch.aec.process.return_value = np.full(512, i, dtype=np.int16)
+                orch.wake_word.process_frame.return_value = score
+                await orch._process_frame(replace(_make_frame(), timestamp=i * 0.032))
+
+        assert orch.state == State.LISTENING
+        assert [int(f[0]) for f in orch._speech_buffer] == [2, 3, 4]
+
+
+class TestWakeCascade:
+    @pytest.mark.asyncio
+    async def test_reopening_after_a_command_does_not_replay_the_old_wake(self, orch):
+        from media_assistant.audio.gate import EnergyGate
+        from media_assistant.wakeword.detector import WakeWordDetector
+
+        wake = np.full(1280, 7777, dtype=np.int16)
+        with patch("media_assistant.wakeword.detector.openwakeword") as mock_oww:
+            mock_oww.Model.return_value.predict.side_effect = lambda audio: {
+                "jarvis": 0.95 if (audio == 7777).any() else 0.1
+            }
+            orch.wake_word = WakeWordDetector("jarvis.onnx", gate=EnergyGate(frame_size=1280))
+        orch.wake_verifier.verify_frame.side_effect = lambda features, confidence: confidence >= 0.8
+
+        with patch("media_assistant.orchestrator.volume_get", return_value=0.5), \
+             patch("media_assistant.orchestrator.volume_set"):
+            orch.aec.process.return_value = wake
+            await orch._process_frame(_make_frame())
+            assert orch.state == State.LISTENING
+
+            orch._set_state(State.IDLE)  # command done
+            orch.aec.process.return_value = np.ones(1280, dtype=np.int16)
+            for _ in range(10):
+                await orch._process_frame(_make_frame())
+            orch.aec.process.return_value = np.random.default_rng(0).normal(0, 5000, 1280).astype(np.int16)
+            await orch._process_frame(_make_frame())  # unrelated sound reopens the gate
+
+        assert orch.wake_word.replays == 1
+        assert orch.state == State.IDLE
+
+
+class TestPipelinePerState:
+    @pytest.mark.asyncio
+    async def test_idle_skips_noise_suppression(self, orch):
+        await orch._process_frame(_make_frame())
+
+        orch.aec.process.assert_called_once()
+        orch.noise.process.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_listening_runs_aec_then_noise(self, orch):
+        orch.state = State.LISTENING
+        after_aec = np.ones(512, dtype=np.int16)
+        orch.aec.process.return_value = after_aec
+
+        await orch._process_frame(_make_frame())
+
+        orch.noise.process.assert_called_once_with(after_aec)
+        orch.vad.is_speech.assert_called_once_with(orch.noise.process.return_value)
+
+    @pytest.mark.asyncio
+    async def test_processing_runs_no_stages(self, orch):
+        orch.state = State.PROCESSING
+
+        await orch._process_frame(_make_frame())
+
+        orch.aec.process.assert_not_called()
+        orch.noise.process.assert_not_called()
+
+    def test_entering_a_state_warms_only_new_stages(self, orch):
+        orch._set_state(State.LISTENING)
+
+        orch.noise.warm.assert_called_once()
+        orch.aec.warm.assert_not_called()
+
+        orch._set_state(State.PROCESSING)
+        orch._set_state(State.IDLE)
+
+        orch.aec.warm.assert_called_once()
+        orch.noise.warm.assert_called_once()
+
+    def test_vad_is_loaded_on_entering_listening(self, orch):
+        orch.vad.load.assert_not_called()
+
+        orch._set_state(State.LISTENING)
+
+        orch.vad.load.assert_called_once()
+
+    def test_pipeline_from_config(self):
+        from media_assistant.config import PipelineConfig
+        from media_assistant.orchestrator import pipeline_from_config
+
+        pipeline = pipeline_from_config(PipelineConfig(idle=["aec", "noise"]))
+
+        assert pipeline[State.IDLE] == ("aec", "noise")
+        assert pipeline[State.PROCESSING] == ()
+        with pytest.raises(ValueError, match="dfn"):
+            pipeline_from_config(PipelineConfig(listening=["dfn"]))
+
+    def test_drop_states_from_config(self):
+        from media_assistant.config import AudioConfig
+        from media_assistant.orchestrator import drop_states_from_config
+
+        assert drop_states_from_config(AudioConfig()) == frozenset({State.IDLE})
+        assert drop_states_from_config(AudioConfig(drop_states=["idle", "responding"])) == {
+            State.IDLE,
+            State.RESPONDING,
+        }
+        with pytest.raises(ValueError, match="asleep"):
+            drop_states_from_config(AudioConfig(drop_states=["asleep"]))
+
+
+class TestWakeRechunking:
+    @pytest.mark.asyncio
+    async def test_wake_word_runs_once_per_native_chunk(self, orch):
+        orch._wake_chunker = Rechunker(1280)
+        orch.wake_word.process_frame.return_value = 0.3
+
+        for _ in range(5):  # 2560 samples = 2 chunks of 1280
+            await orch._process_frame(_make_frame())
+
+        assert orch.wake_word.process_frame.call_count == 2
+        assert all(len(c.args[0]) == 1280 for c in orch.wake_word.process_frame.call_args_list)
+        assert orch._last_wake_score == 0.3
+
+    @pytest.mark.asyncio
+    async def test_score_holds_until_next_chunk_and_clears_on_idle(self, orch):
+        orch._wake_chunker = Rechunker(1280)
+        orch.wake_word.process_frame.return_value = 0.4
+        for _ in range(3):
+            await orch._process_frame(_make_frame())
+
+        orch._set_state(State.LISTENING)
+        orch._set_state(State.IDLE)
+
+        assert orch._last_wake_score == 0.0
+        orch.wake_word.process_frame.reset_mock()
+        await orch._process_frame(_make_frame())
+        orch.wake_word.process_frame.assert_not_called()  # buffered audio was dropped
+
+    def test_chunker_only_for_stages_with_another_native_hop(self):
+        assert _chunker_for(MagicMock(), 512, 16000) is None
+        assert _chunker_for(MagicMock(hop=512, window=512), 512, 16000) is None
+        chunker = _chunker_for(MagicMock(hop=1280, window=1280), 512, 16000)
+        assert (chunker.hop, chunker.window) == (1280, 1280)
+
+
+class TestWakeScorer:
+    @pytest.mark.asyncio
+    async def test_wake_only_on_scorer_activation(self, orch):
+        orch.wake_scorer = WakeScorer(threshold=0.8, refractory_seconds=10.0)
+        orch.wake_verifier.verify_frame.return_value = True
+        scores = [0.9, 0.95, 0.5]
+
+        with patch("media_assistant.orchestrator.volume_get", return_value=0.5), \
+             patch("media_assistant.orchestrator.volume_set"):
+            for score in scores[:2]:
+                orch.wake_word.process_frame.return_value = score
+                await orch._process_frame(_make_frame())
+                assert orch.state == State.IDLE  # high, but not yet a confirmed peak
+            orch.wake_word.process_frame.return_value = scores[2]
+            await orch._process_frame(_make_frame())
+
+        assert orch.state == State.LISTENING
+        orch.wake_verifier.verify_frame.assert_called_once()
+        assert orch.wake_verifier.verify_frame.call_args.args[1] == pytest.approx(0.95)
+
+    @pytest.mark.asyncio
+    async def test_refractory_blocks_retrigger_after_command(self, orch):
+        orch.wake_scorer = create_wake_scorer(WakeWordConfig())
+        orch.wake_verifier.verify_frame.return_value = True
+        with patch("media_assistant.orchestrator.volume_get", return_value=0.5), \
+             patch("media_assistant.orchestrator.volume_set"):
+            for t, score in ((0.0, 0.95), (0.032, 0.1)):
+                orch.wake_word.process_frame.return_value = score
+                await orch._process_frame(replace(_make_frame(), timestamp=t))
+            assert orch.state == State.LISTENING
+
+            # The command outlasts the refractory period; stale model buffers
+            # still score the old wake word right after returning to IDLE
+            orch.wake_word.reset.reset_mock()
+            orch._set_state(State.IDLE)
+            for t, score in ((6.0, 0.95), (6.032, 0.1)):
+                orch.wake_word.process_frame.return_value = score
+                await orch._process_frame(replace(_make_frame(), timestamp=t))
+
+        assert orch.state == State.IDLE
+        orch.wake_word.reset.assert_called_once()
+
+
+class TestCoherenceStage:
+    @pytest.mark.asyncio
+    async def test_coherent_echo_blocks_wake(self, orch):
+        orch.wake_word.process_frame.return_value = 0.95
+        orch.wake_verifier.verify_frame.return_value = True
+        orch.wake_verifier.coherence_window_ms = 1500.0
+        orch.wake_verifier.verify_coherence.return_value = False
+        mic, loopback = np.ones(24000, np.int16), np.ones(24000, np.int16)
+        orch.audio.recent_audio.return_value = (mic, loopback)
+
+        await orch._process_frame(_make_frame())
+
+        assert orch.state == State.IDLE
+        orch.audio.recent_audio.assert_called_once_with(1500.0)
+        orch.wake_verifier.verify_coherence.assert_called_once_with(mic, loopback)
+
+    @pytest.mark.asyncio
+    async def test_energy_ratio_runs_first(self, orch):
+        orch.wake_word.process_frame.return_value = 0.95
+        orch.wake_verifier.coherence_window_ms = 1500.0
+
+        await orch._process_frame(_make_frame())  # verify_frame -> False
+
+        orch.wake_verifier.verify_coherence.assert_not_called()
@@ -4,7 +4,9 @@ from unittest.mock import MagicMock, patch
 import numpy as np
 import pytest
 
-from media_assistant.wakeword.detector import WakeWordDetector
+from media_assistant.audio.gate import EnergyGate
+from media_assistant.config import WakeWordConfig
+from media_assistant.wakeword.detector import WakeWordDetector, create_wake_word_detector
 
 
 class TestDetectorReturnsConfidence:
@@ -63,3 +65,94 @@ class TestDetectorReset:
         detector.reset()
 
         mock_model.reset.assert_called_once()
+
+
+class TestDetectorBank:
+    @patch("media_assistant.wakeword.detector.openwakeword")
+    def test_one_model_serves_every_word(self, mock_oww):
+        WakeWordDetector(model_path=["jarvis.onnx", "alisa.onnx"])
+
+        mock_oww.Model.assert_called_once_with(wakeword_models=["jarvis.onnx", "alisa.onnx"])
+
+    @patch("media_assistant.wakeword.detector.openwakeword")
+    def test_reports_which_word_fired(self, mock_oww):
+        mock_oww.Model.return_value.predict.return_value = {"jarvis": 0.1, "alisa": 0.92}
+        detector = WakeWordDetector(model_path=["jarvis.onnx", "alisa.onnx"])
+
+        assert detector.process_frame(np.zeros(1280, dtype=np.int16)) == 0.92
+        assert detector.last_word == "alisa"
+        assert detector.last_scores == {"jarvis": 0.1, "alisa": 0.92}
+
+    @patch("media_assistant.wakeword.detector.openwakeword")
+    def test_factory_adds_extra_words(self, mock_oww):
+        config = WakeWordConfig(model_path="jarvis.onnx", extra_model_paths=["alisa.onnx"], threshold=0.7)
+
+        detector = create_wake_word_detector(config)
+
+        mock_oww.Model.assert_called_once_with(wakeword_models=["jarvis.onnx", "alisa.onnx"])
+        assert detector.threshold == 0.7
+
+
+def _loud(seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(0, 5000, 1280).astype(np.int16)
+
+
+class TestGatedDetector:
+    @patch("media_assistant.wakeword.detector.openwakeword")
+    def test_silence_skips_the_model(self, mock_oww):
+        mock_oww.Model.return_value.predict.return_value = {"jarvis": 0.9}
+        detector = WakeWordDetector("jarvis.onnx", gate=EnergyGate(frame_size=1280))
+
+        scores = [detector.process_frame(np.zeros(1280, dtype=np.int16)) for _ in range(10)]
+
+        assert scores == [0.0] * 10
+        mock_oww.Model.return_value.predict.assert_not_called()
+        assert detector.gate.hit_rate == 1.0
+
+    @patch("media_assistant.wakeword.detector.openwakeword")
+    def test_reopening_resets_and_replays_history(self, mock_oww):
+        model = mock_oww.Model.return_value
+        model.predict.return_value = {"jarvis": 0.2}
+        detector = WakeWordDetector("jarvis.onnx", gate=EnergyGate(frame_size=1280), replay_seconds=0.4)
+        for _ in range(10):
+            detector.process_frame(np.ones(1280, dtype=np.int16))  # digital near-silence
+
+        loud = _loud()
+        detector.process_frame(loud)
+
+        model.reset.assert_called_once()
+        replayed = model.predict.call_args.args[0]
+        assert len(replayed) == 5 * 1280  # 0.4 s of history, in whole hops
+        np.testing.assert_array_equal(replayed[-1280:], loud)
+        assert detector.replays == 1
+
+    @patch("media_assistant.wakeword.detector.openwakeword")
+    def test_replay_stops_at_reset(self, mock_oww):
+        model = mock_oww.Model.return_value
+        model.predict.return_value = {"jarvis": 0.2}
+        detector = WakeWordDetector("jarvis.onnx", gate=EnergyGate(frame_size=1280))
+        detector.process_frame(_loud(1))  # the wake word that was acted on
+        detector.reset()
+        for _ in range(3):
+            detector.process_frame(np.ones(1280, dtype=np.int16))
+
+        detector.process_frame(_loud(2))
+
+        assert len(model.predict.call_args.args[0]) == 4 * 1280  # nothing before the reset
+
+    @patch("media_assistant.wakeword.detector.openwakeword")
+    def test_open_gate_streams_frame_by_frame(self, mock_oww):
+        model = mock_oww.Model.return_value
+        model.predict.return_value = {"jarvis": 0.2}
+        detector = WakeWordDetector("jarvis.onnx", gate=EnergyGate(frame_size=1280))
+
+        for i in range(3):
+            detector.process_frame(_loud(i))
+
+        assert [len(c.args[0]) for c in model.predict.call_args_list] == [1280] * 3
+        model.reset.assert_not_called()
+
+    @patch("media_assistant.wakeword.detector.openwakeword")
+    def test_factory_gate_follows_config(self, mock_oww):
+        assert create_wake_word_detector(WakeWordConfig()).gate is not None
+        assert create_wake_word_detector(WakeWordConfig(energy_gate=False)).gate is None
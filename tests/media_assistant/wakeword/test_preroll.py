@@ -0,0 +1,71 @@
+"""Tests for the wake-word pre-roll buffer."""
+
+import numpy as np
+import pytest
+
+from media_assistant.config import WakeWordConfig
+from media_assistant.wakeword.preroll import PreRollBuffer, create_preroll
+
+
+def _push(buffer: PreRollBuffer, scores: list[float]) -> None:
+    for i, score in enumerate(scores):
+        buffer.push(np.full(512, i, dtype=np.int16), score)
+
+
+class TestPreRollBuffer:
+    def test_trims_frames_up_to_the_onset(self):
+        buffer = PreRollBuffer(seconds=1.0, onset_score=0.4)
+        _push(buffer, [0.0, 0.1, 0.2, 0.5, 0.7, 0.9])
+
+        head = buffer.take()
+
+        # Frame 3 first reaches the onset: frames 4 and 5 follow the wake word
+        assert [int(f[0]) for f in head] == [4, 5]
+
+    def test_only_the_latest_run_counts(self):
+        buffer = PreRollBuffer(seconds=1.0, onset_score=0.4)
+        _push(buffer, [0.6, 0.0, 0.0, 0.5, 0.9])
+
+        assert [int(f[0]) for f in buffer.take()] == [4]
+
+    def test_skips_frames_after_the_peak(self):
+        # A peak-picking scorer fires once the score has already fallen
+        buffer = PreRollBuffer(seconds=1.0, onset_score=0.4)
+        _push(buffer, [0.0, 0.5, 0.9, 0.95, 0.3])
+
+        assert [int(f[0]) for f in buffer.take()] == [2, 3, 4]
+
+    def test_keeps_only_the_newest_window(self):
+        # 0.1 s at 512 samples per frame -> 3 frames
+        buffer = PreRollBuffer(seconds=0.1, onset_score=0.4)
+        _push(buffer, [0.0] * 10 + [0.5, 0.6])
+
+        assert len(buffer) == 3
+        assert [int(f[0]) for f in buffer.take()] == [11]
+
+    def test_onset_outside_window_keeps_nothing(self):
+        buffer = PreRollBuffer(seconds=0.1, onset_score=0.4)
+        _push(buffer, [0.5] * 6)
+
+        assert buffer.take() == []
+
+    def test_take_copies_and_clears(self):
+        buffer = PreRollBuffer(seconds=1.0, onset_score=0.4)
+        _push(buffer, [0.0, 0.5, 0.9])
+
+        head = buffer.take()
+        _push(buffer, [0.0, 0.0])
+
+        assert int(head[0][0]) == 2
+        assert len(buffer) == 2
+
+
+class TestCreatePreroll:
+    def test_onset_is_a_fraction_of_the_threshold(self):
+        buffer = create_preroll(WakeWordConfig(threshold=0.8, preroll_onset=0.5), frame_size=160)
+
+        assert buffer._onset == pytest.approx(0.4)
+        assert buffer._frames.shape == (80, 160)  # 0.8 s of 160-sample frames
+
+    def test_zero_seconds_disables(self):
+        assert create_preroll(WakeWordConfig(preroll_seconds=0.0)) is None
@@ -0,0 +1,83 @@
+"""Tests for WakeScorer — smoothing, peak picking and refractory period."""
+
+import numpy as np
+import pytest
+
+from media_assistant.config import WakeWordConfig
+from media_assistant.wakeword.scorer import WakeScorer, create_wake_scorer
+
+
+def _fire_times(scorer: WakeScorer, scores: list[float], hop: float = 0.08) -> list[float]:
+    return [round(i * hop, 2) for i, s in enumerate(scores) if scorer.push(s, i * hop)]
+
+
+class TestPeakPicking:
+    def test_fires_once_per_peak_one_hop_late(self):
+        scorer = WakeScorer(threshold=0.8, refractory_seconds=0.0)
+
+        fired = _fire_times(scorer, [0.1, 0.85, 0.95, 0.9, 0.2])
+
+        assert fired == [0.24]  # peak at 0.16 is confirmed when 0.24 is lower
+        assert scorer.peak == pytest.approx(0.95)
+
+    def test_plateau_fires_once(self):
+        scorer = WakeScorer(threshold=0.8, refractory_seconds=0.0)
+        assert len(_fire_times(scorer, [0.1, 0.9, 0.9, 0.9, 0.1])) == 1
+
+    def test_below_threshold_never_fires(self):
+        scorer = WakeScorer(threshold=0.8)
+        assert _fire_times(scorer, [0.1, 0.7, 0.79, 0.5]) == []
+
+
+class TestRefractory:
+    def test_second_peak_inside_refractory_is_ignored(self):
+        scorer = WakeScorer(threshold=0.8, refractory_seconds=1.0)
+        scores = [0.1, 0.9, 0.2, 0.9, 0.2] + [0.0] * 12 + [0.9, 0.2]
+
+        fired = _fire_times(scorer, scores)
+
+        assert fired == [0.16, 1.44]
+
+    def test_reset_restarts_refractory(self):
+        scorer = WakeScorer(threshold=0.8, refractory_seconds=1.0)
+        scorer.push(0.9, 0.0)
+        assert scorer.push(0.1, 0.08)
+
+        scorer.reset()  # back in IDLE after a command that outlasted the period
+
+        assert not scorer.push(0.9, 5.0)
+        assert not scorer.push(0.1, 5.08)
+        assert not scorer.push(0.9, 6.0)
+        assert scorer.push(0.1, 6.08)
+
+
+class TestSmoothing:
+    def test_mean_window_suppresses_single_hop_spike(self):
+        scorer = WakeScorer(threshold=0.8, window_hops=3, refractory_seconds=0.0)
+        assert _fire_times(scorer, [0.0, 0.0, 0.95, 0.0, 0.0]) == []
+
+    def test_max_window_keeps_spike(self):
+        scorer = WakeScorer(threshold=0.8, window_hops=3, mode="max", refractory_seconds=0.0)
+        assert len(_fire_times(scorer, [0.0, 0.0, 0.95, 0.0, 0.0, 0.0, 0.0])) == 1
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError, match="median"):
+            WakeScorer(mode="median")
+
+
+class TestHistory:
+    def test_time_series_oldest_first_and_bounded(self):
+        scorer = WakeScorer(threshold=0.8, history_hops=4, refractory_seconds=0.0)
+        _fire_times(scorer, [0.1, 0.2, 0.9, 0.3, 0.4, 0.5])
+
+        history = scorer.history()
+
+        np.testing.assert_allclose(history["raw"], [0.9, 0.3, 0.4, 0.5])
+        np.testing.assert_allclose(history["timestamp"], [0.16, 0.24, 0.32, 0.40])
+        assert history["fired"].tolist() == [False, True, False, False]
+
+
+def test_create_from_config():
+    config = WakeWordConfig(threshold=0.7, score_window_hops=2, refractory_seconds=3.0)
+    scorer = create_wake_scorer(config)
+    assert scorer.threshold == 0.7
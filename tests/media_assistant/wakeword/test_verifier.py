@@ -1,8 +1,16 @@
 """Tests for WakeWordVerifier — energy-based false positive rejection."""
 
+import numpy as np
 import pytest
 
-from media_assistant.wakeword.verifier import WakeWordVerifier
+from media_assistant.audio.features import FrameFeatures
+from media_assistant.audio.replay import SyntheticAudioCapture
+from media_assistant.config import WakeWordConfig
+from media_assistant.wakeword.verifier import (
+    CoherenceVerifier,
+    WakeWordVerifier,
+    create_wake_word_verifier,
+)
 
 
 class TestVerifierAcceptsRealVoice:
@@ -52,3 +60,71 @@ class TestVerifierEdgeCases:
         assert verifier.verify(mic_energy=1.49, loopback_energy=1.0, oww_confidence=0.81) is False
         # Just below confidence threshold
         assert verifier.verify(mic_energy=1.51, loopback_energy=1.0, oww_confidence=0.79) is False
+
+
+class TestVerifyFrame:
+    def test_uses_mic_over_loopback_energy(self):
+        verifier = WakeWordVerifier(energy_ratio_threshold=1.5, confidence_threshold=0.8)
+        voice = FrameFeatures(np.full(512, 500, np.int16), np.full(512, 100, np.int16))
+        echo = FrameFeatures(np.full(512, 100, np.int16), np.full(512, 100, np.int16))
+
+        assert verifier.verify_frame(voice, oww_confidence=0.95) is True
+        assert verifier.verify_frame(echo, oww_confidence=0.95) is False
+        assert verifier.verify_frame(voice, oww_confidence=0.5) is False
+
+
+def _scene(burst_seconds: float = 1.5, **kwargs) -> tuple[np.ndarray, np.ndarray]:
+    capture = SyntheticAudioCapture(
+        seconds=1.5, noise_rms=100, burst_seconds=burst_seconds, **kwargs
+    )
+    capture.start()
+    frames = []
+    while (frame := capture.read_frame()) is not None:
+        frames.append(frame)
+    return np.concatenate([f.mic for f in frames]), np.concatenate([f.loopback for f in frames])
+
+
+class TestCoherenceVerifier:
+    def test_rejects_loud_echo_that_passes_the_energy_ratio(self):
+        # Mic right next to the speakers: echo louder than the loopback itself
+        mic, loopback = _scene(loopback_rms=3000, echo_gain=2.0, echo_delay_ms=40)
+        assert FrameFeatures(mic, loopback).energy_ratio > 1.5
+
+        verifier = CoherenceVerifier()
+        assert verifier.verify(mic, loopback) is False
+        assert verifier.last_echo_fraction > 0.9
+
+    def test_accepts_voice_over_playback(self):
+        mic, loopback = _scene(loopback_rms=3000, echo_gain=0.3, speech_rms=3000)
+        assert CoherenceVerifier().verify(mic, loopback) is True
+
+    def test_accepts_short_wake_word_over_loud_echo(self):
+        # 0.6 s of voice louder than the echo; the rest of the window is TV
+        mic, loopback = _scene(loopback_rms=3000, echo_gain=2.0, speech_rms=8000, burst_seconds=0.6)
+        assert FrameFeatures(mic, loopback).energy_ratio > 1.5
+
+        verifier = CoherenceVerifier()
+        assert verifier.verify(mic, loopback) is True
+        assert verifier.last_echo_fraction < 0.45
+
+    def test_rejects_voice_drowned_by_loud_echo(self):
+        mic, loopback = _scene(loopback_rms=3000, echo_gain=2.0, speech_rms=3000, burst_seconds=0.6)
+        assert CoherenceVerifier().verify(mic, loopback) is False
+
+    def test_silent_loopback_explains_nothing(self):
+        mic, _ = _scene(speech_rms=3000)
+        assert CoherenceVerifier().echo_fraction(mic, np.zeros_like(mic)) == 0.0
+
+
+class TestTwoStageVerification:
+    def test_coherence_stage_is_optional(self):
+        verifier = WakeWordVerifier()
+        assert verifier.coherence_window_ms == 0.0
+        assert verifier.verify_coherence(np.zeros(10), np.zeros(10)) is True
+
+    def test_factory_enables_coherence(self):
+        verifier = create_wake_word_verifier(WakeWordConfig(coherence_window_seconds=1.0))
+        assert verifier.coherence_window_ms == 1000.0
+
+        off = create_wake_word_verifier(WakeWordConfig(coherence_window_seconds=0.0))
+        assert off.coherence is None